@@ -0,0 +1,625 @@
+import os
+import re
+import json
+import shutil
+import tempfile
+import logging
+import threading
+import subprocess
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+
+# 변환 방식
+CONVERT_PASSTHROUGH = "passthrough"  # 원본 그대로 업로드
+CONVERT_REMUX = "remux"  # 디코딩 없이 컨테이너만 변경
+CONVERT_TRANSCODE = "transcode"  # 경량 MP3로 다시 인코딩
+
+# Gemini가 그대로 받을 수 있는 (코덱, 출력 확장자) 조합
+# 컨테이너가 맞지 않으면 디코딩 없이 해당 확장자로 리먹스합니다
+UPLOADABLE_CODECS = {
+    'mp3': 'mp3',
+    'vorbis': 'ogg',
+    'opus': 'ogg',
+    'aac': 'aac'
+}
+
+# 출력 확장자별 Gemini 업로드 MIME 타입
+MIME_TYPES = {
+    'mp3': 'audio/mpeg',
+    'ogg': 'audio/ogg',
+    'aac': 'audio/aac',
+    'wav': 'audio/wav',
+    'flac': 'audio/flac'
+}
+
+# 리먹스 시 ffmpeg 출력 포맷
+REMUX_FORMATS = {
+    'mp3': 'mp3',
+    'ogg': 'ogg',
+    'aac': 'adts'
+}
+
+# ffmpeg가 입력을 탐색(seek)해야 해서 stdin 파이프로 읽을 수 없는 컨테이너
+SEEKABLE_INPUT_EXTENSIONS = {'m4a', 'mp4', 'mov', '3gp'}
+
+# 파이프로 주고받을 때 한 번에 읽고 쓸 크기
+PIPE_CHUNK_SIZE = 256 * 1024
+
+DEFAULT_AUDIO_OPTIONS = {
+    'transcoder': 'ffmpeg',  # 다시 인코딩할 때 사용할 방식: ffmpeg (스트리밍), pydub (메모리 디코딩)
+    'bitrate': '32k',  # 경량 MP3 비트레이트
+    'passthrough': True,  # 이미 가벼운 파일은 변환하지 않음
+    'passthrough_max_bitrate': 64000,  # 그대로 업로드할 수 있는 최대 비트레이트 (bps)
+    'min_size_reduction': 0.2  # 변환으로 이 비율 이상 줄어들 때만 다시 인코딩
+}
+
+DEFAULT_PREPROCESS_OPTIONS = {
+    'enabled': False,  # 인코딩 전 전처리 사용 여부
+    'remove_silence': True,  # 긴 무음을 짧게 줄임
+    'silence_threshold_db': -40,  # 무음으로 판단할 음량 기준 (dB)
+    'silence_min_seconds': 1.0,  # 이 길이 이상인 무음만 줄임 (초)
+    'silence_keep_seconds': 0.3,  # 줄인 무음 자리에 남길 길이 (초)
+    'speed': 1.0,  # 재생 속도 (음높이 유지, 1.0~2.0)
+    'sample_rate': 16000  # 출력 샘플링 레이트 (Hz, 0이면 유지)
+}
+
+# 전처리 재생 속도 허용 범위 (ffmpeg atempo 필터 하나로 처리 가능한 범위)
+MIN_PREPROCESS_SPEED = 1.0
+MAX_PREPROCESS_SPEED = 2.0
+
+
+def get_mime_type(file_path: str) -> Optional[str]:
+    """파일 확장자에 맞는 업로드 MIME 타입을 반환합니다."""
+    return MIME_TYPES.get(Path(file_path).suffix.lower().replace('.', ''))
+
+
+def parse_bitrate(bitrate: str) -> int:
+    """'32k' 형식의 비트레이트를 bps 정수로 변환합니다."""
+    bitrate = str(bitrate).strip().lower()
+    if bitrate.endswith('k'):
+        return int(float(bitrate[:-1]) * 1000)
+    return int(bitrate)
+
+
+def _probe_with_ffmpeg(input_file_path: str) -> Optional[dict]:
+    """
+    ffprobe가 없을 때 ffmpeg -i 출력에서 오디오 메타데이터를 읽습니다.
+    (예: "Duration: 00:01:02.50, start: 0.000000, bitrate: 24 kb/s", "Stream #0:0: Audio: opus, 48000 Hz, mono, fltp")
+    """
+    try:
+        completed = subprocess.run(
+            ['ffmpeg', '-hide_banner', '-i', input_file_path],
+            capture_output=True,
+            timeout=30
+        )
+    except Exception as e:
+        logging.warning(f"[분석] 오디오 메타데이터 확인 실패: {e}")
+        return None
+
+    output = completed.stderr.decode('utf-8', errors='replace')
+    stream = re.search(r'Stream #\d+:\d+[^:]*: Audio: ([^\n]*)', output)
+    if not stream:
+        return None
+
+    stream_info = stream.group(1)
+    codec = re.match(r'([\w-]+)', stream_info)
+    sample_rate = re.search(r'(\d+) Hz', stream_info)
+    stream_bit_rate = re.search(r'(\d+) kb/s', stream_info)
+    channels = 0
+    channel_match = re.search(r'Hz, ([^,]+)', stream_info)
+    if channel_match:
+        layout = channel_match.group(1).strip()
+        count = re.match(r'(\d+) channels', layout)
+        channels = int(count.group(1)) if count else {'mono': 1, 'stereo': 2}.get(layout.split('(')[0], 0)
+
+    duration = 0.0
+    duration_match = re.search(r'Duration: (\d+):(\d+):(\d+(?:\.\d+)?)', output)
+    if duration_match:
+        hours, minutes, seconds = duration_match.groups()
+        duration = int(hours) * 3600 + int(minutes) * 60 + float(seconds)
+    format_bit_rate = re.search(r'Duration:[^\n]*bitrate: (\d+) kb/s', output)
+    format_name = re.search(r'Input #\d+, ([^ ]+), from', output)
+
+    size = os.path.getsize(input_file_path)
+    bit_rate = int((stream_bit_rate or format_bit_rate).group(1)) * 1000 if (stream_bit_rate or format_bit_rate) else 0
+    if not bit_rate and duration:
+        bit_rate = int(size * 8 / duration)
+
+    return {
+        "codec": codec.group(1) if codec else None,
+        "channels": channels,
+        "sample_rate": int(sample_rate.group(1)) if sample_rate else 0,
+        "bit_rate": bit_rate,
+        "duration": duration,
+        "format_name": format_name.group(1).rstrip(',') if format_name else '',
+        "size": size
+    }
+
+
+def probe_audio(input_file_path: str) -> Optional[dict]:
+    """
+    ffprobe로 오디오 파일의 메타데이터를 확인합니다.
+    ffprobe가 없으면 ffmpeg 출력을 읽어 같은 형식으로 반환하므로,
+    브라우저에서 미리 압축한 파일처럼 이미 가벼운 입력은 어느 환경에서든 다시 인코딩하지 않습니다.
+
+    Args:
+        input_file_path: 오디오 파일 경로
+
+    Returns:
+        {"codec", "channels", "sample_rate", "bit_rate", "duration", "format_name", "size"} 딕셔너리
+        (오디오 스트림을 찾지 못하면 None)
+    """
+    if shutil.which('ffprobe') is None:
+        return _probe_with_ffmpeg(input_file_path)
+
+    try:
+        completed = subprocess.run(
+            [
+                'ffprobe', '-v', 'error',
+                '-select_streams', 'a:0',
+                '-show_entries', 'stream=codec_name,channels,sample_rate,bit_rate:format=format_name,duration,bit_rate',
+                '-of', 'json',
+                input_file_path
+            ],
+            capture_output=True,
+            timeout=30,
+            check=True
+        )
+        data = json.loads(completed.stdout or b'{}')
+    except Exception as e:
+        logging.warning(f"[분석] 오디오 메타데이터 확인 실패: {e}")
+        return None
+
+    streams = data.get('streams') or []
+    if not streams:
+        return None
+
+    stream = streams[0]
+    fmt = data.get('format', {})
+    size = os.path.getsize(input_file_path)
+    duration = float(fmt.get('duration') or 0)
+    bit_rate = int(stream.get('bit_rate') or fmt.get('bit_rate') or 0)
+    if not bit_rate and duration:
+        bit_rate = int(size * 8 / duration)
+
+    return {
+        "codec": stream.get('codec_name'),
+        "channels": int(stream.get('channels') or 0),
+        "sample_rate": int(stream.get('sample_rate') or 0),
+        "bit_rate": bit_rate,
+        "duration": duration,
+        "format_name": fmt.get('format_name', ''),
+        "size": size
+    }
+
+
+def build_preprocess_filter(options: dict) -> Optional[str]:
+    """
+    audio.preprocess 설정으로 인코딩 전에 적용할 ffmpeg 오디오 필터를 만듭니다.
+    긴 무음 줄이기(silenceremove), 음높이를 유지한 속도 변경(atempo), 샘플링 레이트 변경(aresample) 순서로 적용합니다.
+
+    Args:
+        options: 오디오 변환 옵션 (config.yaml의 audio 섹션)
+
+    Returns:
+        ffmpeg -af 필터 문자열 (전처리를 사용하지 않으면 None)
+
+    Raises:
+        ValueError: 재생 속도가 허용 범위를 벗어난 경우
+    """
+    preprocess = {**DEFAULT_PREPROCESS_OPTIONS, **(options.get('preprocess') or {})}
+    if not preprocess['enabled']:
+        return None
+
+    filters = []
+    if preprocess['remove_silence']:
+        threshold = preprocess['silence_threshold_db']
+        # 앞부분 무음은 모두 제거하고, 중간/끝의 긴 무음은 silence_keep_seconds만 남김
+        filters.append(
+            f"silenceremove=start_periods=1:start_threshold={threshold}dB"
+            f":stop_periods=-1:stop_duration={preprocess['silence_min_seconds']}"
+            f":stop_threshold={threshold}dB:stop_silence={preprocess['silence_keep_seconds']}"
+        )
+
+    speed = float(preprocess['speed'])
+    if not MIN_PREPROCESS_SPEED <= speed <= MAX_PREPROCESS_SPEED:
+        raise ValueError(
+            f"audio.preprocess.speed는 {MIN_PREPROCESS_SPEED}~{MAX_PREPROCESS_SPEED} 사이여야 합니다: {speed}"
+        )
+    if speed != 1.0:
+        filters.append(f"atempo={speed:g}")
+
+    if preprocess['sample_rate']:
+        filters.append(f"aresample={int(preprocess['sample_rate'])}")
+
+    return ",".join(filters) or None
+
+
+def plan_conversion(info: Optional[dict], file_extension: str, options: dict) -> str:
+    """
+    오디오 메타데이터를 보고 변환 방식을 결정합니다.
+
+    - 코덱을 Gemini가 그대로 받을 수 있고, 다시 인코딩해도 크기가 충분히 줄지 않으면 변환하지 않습니다.
+    - 코덱은 맞지만 컨테이너가 다르면(m4a, webm 등) 디코딩 없이 리먹스합니다.
+    - 그 외에는 경량 MP3로 다시 인코딩합니다. 전처리를 사용하면 항상 다시 인코딩합니다.
+
+    Args:
+        info: probe_audio 결과 (None이면 항상 다시 인코딩)
+        file_extension: 입력 파일 확장자
+        options: 오디오 변환 옵션
+
+    Returns:
+        CONVERT_PASSTHROUGH, CONVERT_REMUX, CONVERT_TRANSCODE 중 하나
+    """
+    if not options.get('passthrough', True) or not info or not info.get('duration'):
+        return CONVERT_TRANSCODE
+
+    if build_preprocess_filter(options):
+        return CONVERT_TRANSCODE
+
+    target_extension = UPLOADABLE_CODECS.get(info['codec'])
+    if target_extension is None:
+        return CONVERT_TRANSCODE
+
+    if info['bit_rate'] > options.get('passthrough_max_bitrate', 64000):
+        return CONVERT_TRANSCODE
+
+    # 다시 인코딩했을 때 예상 크기와 비교
+    transcoded_size = info['duration'] * parse_bitrate(options.get('bitrate', '32k')) / 8
+    if transcoded_size < info['size'] * (1 - options.get('min_size_reduction', 0.2)):
+        return CONVERT_TRANSCODE
+
+    if target_extension == file_extension:
+        return CONVERT_PASSTHROUGH
+    return CONVERT_REMUX
+
+
+def remux_audio(input_file_path: str, output_file_path: str, output_format: str):
+    """
+    오디오 스트림을 디코딩하지 않고 다른 컨테이너로 옮깁니다.
+
+    Args:
+        input_file_path: 입력 파일 경로
+        output_file_path: 출력 파일 경로
+        output_format: ffmpeg 출력 포맷 (mp3, ogg, adts)
+    """
+    subprocess.run(
+        [
+            'ffmpeg', '-v', 'error', '-y',
+            '-i', input_file_path,
+            '-map', '0:a:0', '-vn',
+            '-c:a', 'copy',
+            '-f', output_format,
+            output_file_path
+        ],
+        capture_output=True,
+        check=True
+    )
+
+
+def transcode_with_pydub(input_file_path: str, output_file_path: str, file_extension: str, bitrate: str,
+                         audio_filter: Optional[str] = None):
+    """
+    pydub으로 오디오를 경량 모노 MP3로 다시 인코딩합니다.
+
+    Args:
+        input_file_path: 입력 파일 경로
+        output_file_path: 출력 MP3 파일 경로
+        file_extension: 입력 파일 확장자
+        bitrate: 출력 비트레이트 (예: '32k')
+        audio_filter: 인코딩 전에 적용할 ffmpeg 오디오 필터 (선택)
+    """
+    from pydub import AudioSegment
+
+    # 오디오 파일 로드
+    audio = AudioSegment.from_file(input_file_path, format=file_extension)
+
+    # 경량 MP3로 변환 (모노로 변환하여 용량 절감)
+    audio = audio.set_channels(1)  # 모노로 변환
+    parameters = ["-ac", "1"]  # 모노 채널 강제
+    if audio_filter:
+        parameters += ["-af", audio_filter]
+    audio.export(
+        output_file_path,
+        format='mp3',
+        bitrate=bitrate,
+        parameters=parameters
+    )
+
+
+def transcode_with_ffmpeg(input_file_path: str, output_file_path: str, file_extension: str, bitrate: str,
+                          audio_filter: Optional[str] = None):
+    """
+    ffmpeg 프로세스 하나로 오디오를 경량 모노 MP3로 다시 인코딩합니다.
+    입력은 stdin으로, 출력은 stdout으로 청크 단위로 주고받으므로 파일 길이와 관계없이 메모리 사용량이 일정합니다.
+    m4a처럼 입력 탐색이 필요한 컨테이너는 파일 경로로 직접 읽습니다.
+
+    Args:
+        input_file_path: 입력 파일 경로
+        output_file_path: 출력 MP3 파일 경로
+        file_extension: 입력 파일 확장자
+        bitrate: 출력 비트레이트 (예: '32k')
+        audio_filter: 인코딩 전에 적용할 ffmpeg 오디오 필터 (선택)
+
+    Raises:
+        RuntimeError: ffmpeg가 실패한 경우
+    """
+    use_stdin = file_extension not in SEEKABLE_INPUT_EXTENSIONS
+    command = [
+        'ffmpeg', '-v', 'error', '-y',
+        '-i', 'pipe:0' if use_stdin else input_file_path,
+        '-vn', '-ac', '1'
+    ]
+    if audio_filter:
+        command += ['-af', audio_filter]
+    command += ['-b:a', bitrate, '-f', 'mp3', 'pipe:1']
+
+    with tempfile.TemporaryFile() as stderr_file:
+        process = subprocess.Popen(
+            command,
+            stdin=subprocess.PIPE if use_stdin else subprocess.DEVNULL,
+            stdout=subprocess.PIPE,
+            stderr=stderr_file
+        )
+
+        def feed_stdin():
+            try:
+                with open(input_file_path, 'rb') as f:
+                    for chunk in iter(lambda: f.read(PIPE_CHUNK_SIZE), b''):
+                        process.stdin.write(chunk)
+            except (BrokenPipeError, ValueError):
+                # ffmpeg가 먼저 종료된 경우 (오류는 종료 코드로 확인)
+                pass
+            finally:
+                try:
+                    process.stdin.close()
+                except BrokenPipeError:
+                    pass
+
+        writer = None
+        if use_stdin:
+            writer = threading.Thread(target=feed_stdin, daemon=True)
+            writer.start()
+
+        try:
+            with open(output_file_path, 'wb') as output:
+                for chunk in iter(lambda: process.stdout.read(PIPE_CHUNK_SIZE), b''):
+                    output.write(chunk)
+        finally:
+            process.stdout.close()
+            return_code = process.wait()
+            if writer:
+                writer.join()
+
+        if return_code != 0:
+            stderr_file.seek(0)
+            message = stderr_file.read().decode(errors='ignore').strip()
+            raise RuntimeError(f"ffmpeg 변환 실패 (코드 {return_code}): {message}")
+
+
+# 다시 인코딩 방식
+TRANSCODERS = {
+    'ffmpeg': transcode_with_ffmpeg,
+    'pydub': transcode_with_pydub
+}
+
+
+def convert_audio(input_file_path: str, options: Optional[dict] = None) -> str:
+    """
+    오디오 파일을 Gemini 업로드용 경량 파일로 준비합니다.
+    이미 가벼운 파일은 그대로 사용하고, 가능한 경우 디코딩 없이 리먹스하며,
+    크기가 실제로 줄어드는 경우에만 경량 MP3로 다시 인코딩합니다.
+    전처리(audio.preprocess)를 사용하면 무음 줄이기/속도 변경/샘플링 레이트 변경 후 다시 인코딩합니다.
+
+    Args:
+        input_file_path: 입력 오디오 파일 경로
+        options: 오디오 변환 옵션 (config.yaml의 audio 섹션)
+
+    Returns:
+        업로드할 파일 경로 (변환하지 않은 경우 입력 파일 경로 그대로, 그 외에는 임시 파일)
+    """
+    options = {**DEFAULT_AUDIO_OPTIONS, **(options or {})}
+    file_extension = Path(input_file_path).suffix.lower().replace('.', '')
+
+    info = probe_audio(input_file_path)
+    plan = plan_conversion(info, file_extension, options)
+    if info:
+        logging.info(
+            f"[변환] 입력: {info['codec']}, {info['channels']}ch, "
+            f"{info['bit_rate'] // 1000}kbps, {info['duration']:.1f}초 → {plan}"
+        )
+
+    if plan == CONVERT_PASSTHROUGH:
+        return input_file_path
+
+    if plan == CONVERT_REMUX:
+        output_extension = UPLOADABLE_CODECS[info['codec']]
+    else:
+        output_extension = 'mp3'
+
+    # 임시 파일 생성
+    temp_file = tempfile.NamedTemporaryFile(suffix=f'.{output_extension}', delete=False)
+    output_file_path = temp_file.name
+    temp_file.close()
+
+    try:
+        if plan == CONVERT_REMUX:
+            try:
+                remux_audio(input_file_path, output_file_path, REMUX_FORMATS[output_extension])
+                return output_file_path
+            except subprocess.CalledProcessError as e:
+                # 리먹스가 실패하면 다시 인코딩
+                logging.warning(f"[변환] 리먹스 실패, 다시 인코딩합니다: {e.stderr.decode(errors='ignore').strip()}")
+                os.remove(output_file_path)
+                output_file_path = os.path.splitext(output_file_path)[0] + '.mp3'
+
+        transcoder = TRANSCODERS.get(options['transcoder'])
+        if transcoder is None:
+            raise ValueError(f"지원하지 않는 변환 방식입니다: {options['transcoder']} (ffmpeg, pydub 중 선택)")
+        transcoder(
+            input_file_path, output_file_path, file_extension, options['bitrate'], build_preprocess_filter(options)
+        )
+        return output_file_path
+
+    except Exception:
+        # 변환 실패 시 임시 파일 삭제
+        if os.path.exists(output_file_path):
+            os.remove(output_file_path)
+        raise
+
+
+def get_audio_duration(file_path: str) -> float:
+    """
+    오디오 길이(초)를 확인합니다.
+    ffprobe가 없으면 ffmpeg 출력의 Duration 항목을 사용합니다.
+
+    Args:
+        file_path: 오디오 파일 경로
+
+    Returns:
+        오디오 길이 (초, 확인하지 못하면 0)
+    """
+    info = probe_audio(file_path)
+    if info and info['duration']:
+        return info['duration']
+
+    completed = subprocess.run(
+        ['ffmpeg', '-hide_banner', '-i', file_path],
+        capture_output=True
+    )
+    match = re.search(rb'Duration: (\d+):(\d+):(\d+(?:\.\d+)?)', completed.stderr)
+    if not match:
+        return 0.0
+    hours, minutes, seconds = match.groups()
+    return int(hours) * 3600 + int(minutes) * 60 + float(seconds)
+
+
+def measure_preprocessing(input_file_path: str, output_file_path: str) -> dict:
+    """
+    전처리 전후의 오디오 길이와 파일 크기를 확인합니다.
+
+    Args:
+        input_file_path: 원본 오디오 파일 경로
+        output_file_path: 전처리 후 변환된 파일 경로
+
+    Returns:
+        {"input_seconds", "output_seconds", "input_bytes", "output_bytes"} 딕셔너리
+    """
+    return {
+        "input_seconds": get_audio_duration(input_file_path),
+        "output_seconds": get_audio_duration(output_file_path),
+        "input_bytes": os.path.getsize(input_file_path),
+        "output_bytes": os.path.getsize(output_file_path)
+    }
+
+
+def detect_silences(file_path: str, threshold_db: float = -35, min_silence: float = 0.7) -> List[Tuple[float, float]]:
+    """
+    ffmpeg silencedetect 필터로 무음 구간을 찾습니다 (오디오를 메모리에 올리지 않습니다).
+
+    Args:
+        file_path: 오디오 파일 경로
+        threshold_db: 무음으로 판단할 음량 기준 (dB)
+        min_silence: 무음으로 판단할 최소 길이 (초)
+
+    Returns:
+        [(무음 시작, 무음 끝), ...] 목록 (초)
+    """
+    completed = subprocess.run(
+        [
+            'ffmpeg', '-hide_banner', '-nostats',
+            '-i', file_path,
+            '-af', f"silencedetect=noise={threshold_db}dB:d={min_silence}",
+            '-f', 'null', '-'
+        ],
+        capture_output=True
+    )
+    output = completed.stderr.decode(errors='ignore')
+    starts = [float(value) for value in re.findall(r'silence_start: (-?\d+(?:\.\d+)?)', output)]
+    ends = [float(value) for value in re.findall(r'silence_end: (\d+(?:\.\d+)?)', output)]
+    return list(zip(starts, ends))
+
+
+def plan_segments(duration: float, segment_seconds: float, overlap_seconds: float,
+                  silences: Optional[List[Tuple[float, float]]] = None,
+                  search_window: float = 0.2) -> List[Tuple[float, float]]:
+    """
+    긴 오디오를 나눌 구간을 계산합니다.
+    목표 지점 근처(구간 길이의 search_window 비율 이내)에 무음이 있으면 무음 중간에서 자르고,
+    없으면 목표 지점에서 자르되 다음 구간이 overlap_seconds만큼 겹치도록 합니다.
+
+    Args:
+        duration: 전체 길이 (초)
+        segment_seconds: 목표 구간 길이 (초)
+        overlap_seconds: 무음이 없을 때 겹칠 길이 (초)
+        silences: detect_silences 결과 (None이면 고정 길이로 자름)
+        search_window: 무음을 찾을 범위 (구간 길이 대비 비율)
+
+    Returns:
+        [(시작, 끝), ...] 구간 목록 (초)
+
+    Raises:
+        ValueError: overlap_seconds가 segment_seconds 이상인 경우 (다음 구간이 앞으로 나아가지 않음)
+    """
+    if overlap_seconds >= segment_seconds:
+        raise ValueError(f"겹칠 길이({overlap_seconds}초)는 구간 길이({segment_seconds}초)보다 작아야 합니다.")
+    silences = silences or []
+    segments = []
+    start = 0.0
+    window = segment_seconds * search_window
+
+    while duration - start > segment_seconds + window:
+        target = start + segment_seconds
+        candidates = [
+            (abs((silence_start + silence_end) / 2 - target), (silence_start + silence_end) / 2)
+            for silence_start, silence_end in silences
+            if abs((silence_start + silence_end) / 2 - target) <= window
+        ]
+        if candidates:
+            cut = min(candidates)[1]
+            segments.append((start, cut))
+            start = cut
+        else:
+            segments.append((start, target))
+            start = target - overlap_seconds
+
+    segments.append((start, duration))
+    return segments
+
+
+def split_audio(file_path: str, segments: List[Tuple[float, float]]) -> List[str]:
+    """
+    오디오를 구간별 임시 파일로 나눕니다 (다시 인코딩하지 않고 스트림 복사).
+
+    Args:
+        file_path: 오디오 파일 경로
+        segments: plan_segments 결과
+
+    Returns:
+        구간 파일 경로 목록 (순서대로, 호출한 쪽에서 삭제해야 합니다)
+    """
+    suffix = Path(file_path).suffix
+    segment_paths = []
+    try:
+        for start, end in segments:
+            temp_file = tempfile.NamedTemporaryFile(suffix=suffix, delete=False)
+            temp_file.close()
+            segment_paths.append(temp_file.name)
+            subprocess.run(
+                [
+                    'ffmpeg', '-v', 'error', '-y',
+                    '-ss', f"{start:.3f}", '-t', f"{end - start:.3f}",
+                    '-i', file_path,
+                    '-map', '0:a:0', '-c', 'copy',
+                    temp_file.name
+                ],
+                capture_output=True,
+                check=True
+            )
+    except Exception:
+        for path in segment_paths:
+            if os.path.exists(path):
+                os.remove(path)
+        raise
+    return segment_paths
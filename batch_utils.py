@@ -0,0 +1,121 @@
+import os
+import zipfile
+import hashlib
+import logging
+import tempfile
+from typing import List
+
+
+# 압축 파일에서 꺼낼 때 한 번에 읽을 크기
+EXTRACT_CHUNK_SIZE = 1024 * 1024  # 1MB
+
+
+class BatchLimitError(Exception):
+    """일괄 요청의 파일 수나 전체 크기가 제한을 넘었을 때 발생하는 예외"""
+
+
+def _is_hidden_entry(name: str) -> bool:
+    """macOS가 압축 시 추가하는 메타데이터 등 숨김 항목인지 확인합니다."""
+    return any(part.startswith(('.', '__MACOSX')) for part in name.split('/'))
+
+
+def extract_audio_from_zip(zip_path: str, allowed_extensions: set, max_files: int,
+                           max_file_bytes: int, max_total_bytes: int) -> List[dict]:
+    """
+    zip 파일에서 지원하는 형식의 오디오 파일을 임시 파일로 꺼냅니다.
+    압축 정보의 크기를 믿지 않고 실제로 꺼낸 바이트 수를 세어 제한을 확인하며,
+    꺼내면서 SHA-256 해시를 함께 계산합니다.
+
+    Args:
+        zip_path: zip 파일 경로
+        allowed_extensions: 지원하는 오디오 확장자 (점 제외, 소문자)
+        max_files: 꺼낼 수 있는 최대 파일 수
+        max_file_bytes: 파일당 최대 크기 (넘는 파일은 꺼내지 않고 오류로 표시)
+        max_total_bytes: 꺼낸 파일 전체의 최대 크기 (일괄 요청에서 앞의 파일들이 쓰고 남은 크기)
+
+    Returns:
+        {"filename", "path", "hash", "size", "error", "status_code"} 목록 (압축 안의 순서대로,
+        꺼내지 못한 파일은 path가 None이고 error에 이유가 담김)
+
+    Raises:
+        BatchLimitError: zip 파일이 아니거나 파일 수/전체 크기 제한을 넘는 경우
+    """
+    items = []
+    total = 0
+
+    try:
+        archive = zipfile.ZipFile(zip_path)
+    except zipfile.BadZipFile:
+        raise BatchLimitError("zip 파일을 읽을 수 없습니다.")
+
+    try:
+        with archive:
+            for info in archive.infolist():
+                if info.is_dir() or _is_hidden_entry(info.filename):
+                    continue
+                extension = info.filename.rsplit('.', 1)[-1].lower() if '.' in info.filename else ''
+                if extension not in allowed_extensions:
+                    logging.info(f"[일괄] 오디오가 아닌 항목 건너뜀: {info.filename}")
+                    continue
+                if len(items) >= max_files:
+                    raise BatchLimitError(f"한 번에 처리할 수 있는 파일은 {max_files}개 이하입니다.")
+
+                item = {"filename": info.filename, "path": None, "hash": None, "size": 0,
+                        "error": None, "status_code": None}
+                items.append(item)
+                if info.file_size > max_file_bytes:
+                    item["error"] = f"파일 크기는 {max_file_bytes // (1024 * 1024)}MB 이하여야 합니다."
+                    item["status_code"] = 413
+                    continue
+
+                temp_file = tempfile.NamedTemporaryFile(suffix=f'.{extension}', delete=False)
+                item["path"] = temp_file.name
+                digest = hashlib.sha256()
+                size = 0
+                try:
+                    with temp_file, archive.open(info) as source:
+                        for chunk in iter(lambda: source.read(EXTRACT_CHUNK_SIZE), b''):
+                            size += len(chunk)
+                            if size > max_file_bytes:
+                                break
+                            # 전체 크기에는 꺼내기를 마친 파일만 더함 (크기 초과로 건너뛴 파일은 제외)
+                            if total + size > max_total_bytes:
+                                raise BatchLimitError(
+                                    f"압축을 푼 파일이 요청 전체 크기 제한을 넘습니다 "
+                                    f"(남은 크기: {max_total_bytes // (1024 * 1024)}MB)."
+                                )
+                            digest.update(chunk)
+                            temp_file.write(chunk)
+                except (RuntimeError, NotImplementedError, zipfile.BadZipFile) as e:
+                    # 암호가 걸렸거나 지원하지 않는 압축 방식, 손상된 항목
+                    os.remove(item["path"])
+                    item["path"] = None
+                    item["error"] = f"압축을 풀 수 없는 파일입니다: {e}"
+                    item["status_code"] = 400
+                    continue
+
+                if size > max_file_bytes:
+                    # 압축 정보의 크기와 실제 크기가 다른 경우
+                    os.remove(item["path"])
+                    item["path"] = None
+                    item["error"] = f"파일 크기는 {max_file_bytes // (1024 * 1024)}MB 이하여야 합니다."
+                    item["status_code"] = 413
+                    continue
+                item["hash"] = digest.hexdigest()
+                item["size"] = size
+                total += size
+    except BaseException:
+        remove_extracted(items)
+        raise
+
+    return items
+
+
+def remove_extracted(items: List[dict]):
+    """꺼낸 임시 파일을 모두 삭제합니다."""
+    for item in items:
+        if item["path"] and os.path.exists(item["path"]):
+            try:
+                os.remove(item["path"])
+            except OSError as e:
+                logging.error(f"[오류] 임시 파일 삭제 실패: {e}")
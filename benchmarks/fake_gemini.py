@@ -0,0 +1,167 @@
+"""
+부하 테스트용 가짜 Gemini API로 server.py를 실행합니다.
+
+google.generativeai의 업로드/분석 함수를 실제 API 대신 지정한 지연 시간만큼 기다린 뒤
+고정된 응답을 돌려주는 함수로 바꿔서, API 할당량을 쓰지 않고 서버의 처리량과 응답 시간을 측정할 수 있습니다.
+일정 비율로 일시적인 오류(503)와 할당량 초과(429)를 발생시킬 수 있습니다.
+
+load_benchmark.py가 설정 파일을 준비한 작업 디렉토리에서 이 스크립트를 실행하며, 직접 실행할 수도 있습니다.
+
+사용법:
+    cd <config/config.yaml이 있는 디렉토리>
+    python <프로젝트>/benchmarks/fake_gemini.py --port 8100
+    python <프로젝트>/benchmarks/fake_gemini.py --port 8100 --workers 4
+
+환경 변수:
+    FAKE_GEMINI_LATENCY: 분석 호출 한 번의 평균 지연 시간 (초, 기본값: 1.0)
+    FAKE_GEMINI_UPLOAD_LATENCY: 파일 업로드 지연 시간 (초, 기본값: 0.2)
+    FAKE_GEMINI_JITTER: 지연 시간 변동 비율 (0.2 = ±20%, 기본값: 0.2)
+    FAKE_GEMINI_ERROR_RATE: 분석 호출이 503 오류로 실패할 비율 (기본값: 0)
+    FAKE_GEMINI_RATE_LIMIT_RATE: 분석 호출이 429 오류로 실패할 비율 (기본값: 0)
+    FAKE_GEMINI_SEED: 난수 시드 (같은 값이면 같은 순서로 오류 발생)
+"""
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import threading
+import types
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import google.generativeai as genai  # noqa: E402
+from google.api_core import exceptions as google_exceptions  # noqa: E402
+
+
+# 가짜 응답 텍스트
+FAKE_TRANSCRIPT = "부하 테스트용 가짜 변환 텍스트입니다. " * 20
+FAKE_SUMMARY = "## 주요 내용\n- 부하 테스트용 가짜 요약입니다."
+
+
+class FakeGeminiSettings:
+    """가짜 API의 지연 시간과 오류 비율 (환경 변수에서 읽음)"""
+
+    def __init__(self):
+        self.latency = float(os.environ.get('FAKE_GEMINI_LATENCY', '1.0'))
+        self.upload_latency = float(os.environ.get('FAKE_GEMINI_UPLOAD_LATENCY', '0.2'))
+        self.jitter = float(os.environ.get('FAKE_GEMINI_JITTER', '0.2'))
+        self.error_rate = float(os.environ.get('FAKE_GEMINI_ERROR_RATE', '0'))
+        self.rate_limit_rate = float(os.environ.get('FAKE_GEMINI_RATE_LIMIT_RATE', '0'))
+        seed = os.environ.get('FAKE_GEMINI_SEED')
+        self._random = random.Random(int(seed) if seed else None)
+        self._lock = threading.Lock()
+
+    def delay(self, base: float) -> float:
+        with self._lock:
+            return max(0.0, base * (1 + self._random.uniform(-self.jitter, self.jitter)))
+
+    def roll(self) -> float:
+        with self._lock:
+            return self._random.random()
+
+
+settings = FakeGeminiSettings()
+
+
+class FakeFile:
+    """genai.upload_file이 반환하는 파일 객체 대신 사용"""
+
+    def __init__(self, path: str, mime_type: str = None):
+        self.name = f"files/fake-{os.path.basename(path)}"
+        self.uri = f"https://example.invalid/{self.name}"
+        self.mime_type = mime_type
+        self.size_bytes = os.path.getsize(path)
+        self.state = types.SimpleNamespace(name="ACTIVE")
+
+
+class FakeResponse:
+    def __init__(self, text: str):
+        self.text = text
+
+
+class FakeGenerativeModel:
+    """genai.GenerativeModel 대신 사용 (지연 후 고정 응답, 설정한 비율로 오류 발생)"""
+
+    def __init__(self, model_name: str, generation_config: dict = None, **kwargs):
+        self.model_name = model_name
+        self.generation_config = generation_config or {}
+
+    def _response_text(self, contents) -> str:
+        if self.generation_config.get("response_mime_type") == "application/json":
+            return json.dumps({"original_text": FAKE_TRANSCRIPT, "summary": FAKE_SUMMARY}, ensure_ascii=False)
+        # 오디오 파일이 포함된 호출은 텍스트 변환, 나머지는 요약
+        if any(isinstance(part, FakeFile) for part in contents):
+            return FAKE_TRANSCRIPT
+        return FAKE_SUMMARY
+
+    def generate_content(self, contents, stream: bool = False, **kwargs):
+        time.sleep(settings.delay(settings.latency))
+        roll = settings.roll()
+        if roll < settings.rate_limit_rate:
+            raise google_exceptions.ResourceExhausted("429 Resource has been exhausted (e.g. check quota).")
+        if roll < settings.rate_limit_rate + settings.error_rate:
+            raise google_exceptions.ServiceUnavailable("503 The service is currently unavailable.")
+
+        text = self._response_text(contents)
+        if stream:
+            middle = len(text) // 2
+            return iter([FakeResponse(text[:middle]), FakeResponse(text[middle:])])
+        return FakeResponse(text)
+
+    def count_tokens(self, contents, **kwargs):
+        return types.SimpleNamespace(total_tokens=len(str(contents)) // 4)
+
+
+def fake_upload_file(path, mime_type: str = None, **kwargs):
+    time.sleep(settings.delay(settings.upload_latency))
+    return FakeFile(path, mime_type)
+
+
+def install():
+    """google.generativeai의 API 호출 함수를 가짜 함수로 바꿉니다 (server import 전에 호출)."""
+    genai.configure = lambda **kwargs: None
+    genai.upload_file = fake_upload_file
+    genai.get_file = lambda name, **kwargs: types.SimpleNamespace(name=name, state=types.SimpleNamespace(name="ACTIVE"))
+    genai.delete_file = lambda name, **kwargs: None
+    genai.list_models = lambda **kwargs: iter([types.SimpleNamespace(name="models/fake")])
+    genai.GenerativeModel = FakeGenerativeModel
+
+
+def create_app():
+    """워커 프로세스에서 가짜 함수를 설치한 뒤 서버 앱을 반환합니다 (--workers 2 이상일 때 uvicorn이 호출)."""
+    install()
+    import server
+    return server.create_app()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="가짜 Gemini API로 서버 실행")
+    parser.add_argument('--host', default='127.0.0.1', help="바인딩 주소 (기본값: 127.0.0.1)")
+    parser.add_argument('--port', type=int, default=8100, help="포트 (기본값: 8100)")
+    parser.add_argument('--workers', type=int, default=1,
+                        help="워커 프로세스 수 (기본값: 1, 설정 파일의 server.workers와 같게 지정)")
+    args = parser.parse_args()
+
+    os.environ.setdefault('GOOGLE_API_KEY', 'benchmark')
+
+    import uvicorn
+
+    if args.workers > 1:
+        # 워커 프로세스는 server 모듈을 새로 불러오므로 워커마다 가짜 함수를 설치
+        uvicorn.run(
+            "fake_gemini:create_app", factory=True, workers=args.workers, host=args.host, port=args.port,
+            log_level="warning", app_dir=str(Path(__file__).resolve().parent)
+        )
+        return
+
+    install()
+    import server
+
+    uvicorn.run(server.create_app(), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
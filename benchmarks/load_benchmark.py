@@ -0,0 +1,460 @@
+"""
+/summarize 부하 테스트
+
+가짜 Gemini API(fake_gemini.py)로 서버를 실행하고, 형식과 길이가 다른 합성 오디오를 동시에 요청하여
+처리량(요청/초), 응답 시간(p50/p95/p99), 서버 프로세스의 최대 메모리(RSS)와 CPU 사용 시간,
+단계별 처리 시간(/metrics)을 측정합니다. 실제 API를 호출하지 않으므로 할당량을 쓰지 않습니다.
+
+결과는 JSON으로 저장되어 변경 전후의 실행 결과를 비교할 수 있습니다.
+메모리와 CPU 측정은 /proc를 사용하므로 Linux에서만 기록됩니다.
+
+사용법:
+    python benchmarks/load_benchmark.py                                  # 기본 설정으로 측정
+    python benchmarks/load_benchmark.py --concurrency 1 4 8 --requests 40
+    python benchmarks/load_benchmark.py --formats wav m4a --durations 60 600
+    python benchmarks/load_benchmark.py --gemini-latency 2 --error-rate 0.05 --rate-limit-rate 0.01
+    python benchmarks/load_benchmark.py --output results/before.json
+    python benchmarks/load_benchmark.py --workers 4 --concurrency 4 16  # 여러 워커 처리량 비교
+"""
+import os
+import sys
+import json
+import time
+import uuid
+import socket
+import shutil
+import argparse
+import platform
+import tempfile
+import threading
+import subprocess
+import http.client
+from datetime import datetime, timezone
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import List, Optional
+
+import yaml
+
+PROJECT_DIR = Path(__file__).resolve().parent.parent
+FAKE_SERVER = Path(__file__).resolve().parent / "fake_gemini.py"
+
+# 측정할 처리 단계 (metrics.STAGE_*)
+STAGES = ("receive", "convert", "upload", "transcribe", "summarize", "cleanup")
+
+# 형식별 MIME 타입
+MIME_TYPES = {
+    "wav": "audio/wav", "mp3": "audio/mpeg", "m4a": "audio/mp4", "ogg": "audio/ogg",
+    "flac": "audio/flac", "aac": "audio/aac", "webm": "audio/webm"
+}
+
+# 서버 시작 대기 시간 (초)
+STARTUP_TIMEOUT = 60
+
+# 메모리/CPU 측정 주기 (초)
+SAMPLE_INTERVAL = 0.1
+
+
+def generate_synthetic_audio(audio_format: str, seconds: float, output_path: str):
+    """ffmpeg로 말소리 대역의 합성 오디오(스테레오 44.1kHz)를 지정한 형식으로 생성합니다."""
+    subprocess.run(
+        [
+            'ffmpeg', '-v', 'error', '-y',
+            '-f', 'lavfi', '-i', f"sine=frequency=220:sample_rate=44100:duration={seconds}",
+            '-f', 'lavfi', '-i', f"anoisesrc=color=pink:sample_rate=44100:amplitude=0.05:duration={seconds}",
+            '-filter_complex', 'amerge=inputs=2',
+            '-ac', '2',
+            output_path
+        ],
+        check=True
+    )
+
+
+def find_free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def write_server_config(work_dir: Path, port: int, mode: str, workers: int = 1):
+    """
+    예시 설정을 바탕으로 부하 테스트용 설정 파일을 만듭니다.
+    같은 파일을 반복해서 보내므로 결과 캐시를 끄고, 서버 처리량을 재기 위해 요청 한도 관리도 끕니다.
+    """
+    with open(PROJECT_DIR / "config" / "config.example.yaml", encoding='utf-8') as f:
+        config = yaml.safe_load(f)
+
+    config['server'] = {'host': '127.0.0.1', 'port': port, 'workers': workers}
+    config['gemini']['mode'] = mode
+    config['cache']['enabled'] = False
+    config['quota']['enabled'] = False
+    config['jobs']['store'] = 'memory'
+    config['logging'].update(log_dir=str(work_dir / "logs"), log_level='WARNING')
+    config['metrics'] = {'enabled': True}
+    config['tracing'] = {'enabled': False}
+    config.pop('https', None)
+
+    (work_dir / "config").mkdir(parents=True, exist_ok=True)
+    with open(work_dir / "config" / "config.yaml", 'w', encoding='utf-8') as f:
+        yaml.safe_dump(config, f, allow_unicode=True, sort_keys=False)
+
+
+def http_request(port: int, method: str, path: str, body: bytes = None, headers: dict = None,
+                 timeout: float = 600) -> tuple:
+    """(상태 코드, 응답 본문)"""
+    connection = http.client.HTTPConnection('127.0.0.1', port, timeout=timeout)
+    try:
+        connection.request(method, path, body=body, headers=headers or {})
+        response = connection.getresponse()
+        return response.status, response.read()
+    finally:
+        connection.close()
+
+
+def encode_multipart(filename: str, content: bytes, mime_type: str) -> tuple:
+    """(multipart/form-data 본문, Content-Type 헤더)"""
+    boundary = uuid.uuid4().hex
+    body = (
+        f"--{boundary}\r\n"
+        f'Content-Disposition: form-data; name="file"; filename="{filename}"\r\n'
+        f"Content-Type: {mime_type}\r\n\r\n"
+    ).encode() + content + f"\r\n--{boundary}--\r\n".encode()
+    return body, f"multipart/form-data; boundary={boundary}"
+
+
+def parse_metrics(text: str) -> dict:
+    """Prometheus 텍스트 형식에서 {(지표 이름, 레이블 문자열): 값}을 읽습니다."""
+    values = {}
+    for line in text.splitlines():
+        if not line or line.startswith('#'):
+            continue
+        name_labels, _, value = line.rpartition(' ')
+        name, _, labels = name_labels.partition('{')
+        values[(name, labels.rstrip('}'))] = float(value)
+    return values
+
+
+def metric_delta(before: dict, after: dict, name: str, labels: str = '') -> float:
+    key = (name, labels)
+    return after.get(key, 0.0) - before.get(key, 0.0)
+
+
+class ProcessTreeSampler:
+    """
+    서버 프로세스와 하위 프로세스(변환 워커, ffmpeg)의 메모리와 CPU 사용 시간을 주기적으로 측정합니다.
+    /proc가 없으면 아무것도 기록하지 않습니다.
+    """
+
+    def __init__(self, root_pid: int):
+        self.root_pid = root_pid
+        self.available = os.path.isdir('/proc')
+        self.page_size = os.sysconf('SC_PAGE_SIZE') if self.available else 4096
+        self.clock_ticks = os.sysconf('SC_CLK_TCK') if self.available else 100
+        self.peak_rss = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _read_stats(self) -> dict:
+        """{pid: (부모 pid, CPU 시간(초, 종료된 하위 프로세스 포함), RSS 바이트)}"""
+        stats = {}
+        for entry in os.listdir('/proc'):
+            if not entry.isdigit():
+                continue
+            try:
+                with open(f'/proc/{entry}/stat') as f:
+                    fields = f.read().rpartition(')')[2].split()
+            except OSError:
+                continue
+            # fields[0]은 stat의 세 번째 항목(state)
+            utime, stime, cutime, cstime = (int(value) for value in fields[11:15])
+            stats[int(entry)] = (
+                int(fields[1]),
+                (utime + stime + cutime + cstime) / self.clock_ticks,
+                int(fields[21]) * self.page_size
+            )
+        return stats
+
+    def snapshot(self) -> dict:
+        """{"rss_bytes", "cpu_seconds": {"server", "workers"}} (서버 프로세스와 하위 프로세스별)"""
+        if not self.available:
+            return {}
+        stats = self._read_stats()
+        tree = {self.root_pid}
+        changed = True
+        while changed:
+            changed = False
+            for pid, (parent, _, _) in stats.items():
+                if parent in tree and pid not in tree:
+                    tree.add(pid)
+                    changed = True
+        tree &= set(stats)
+        return {
+            "rss_bytes": sum(stats[pid][2] for pid in tree),
+            "cpu_seconds": {
+                "server": stats[self.root_pid][1] if self.root_pid in stats else 0.0,
+                "workers": sum(stats[pid][1] for pid in tree if stats[pid][0] == self.root_pid)
+            }
+        }
+
+    def _run(self):
+        while not self._stop.wait(SAMPLE_INTERVAL):
+            self.peak_rss = max(self.peak_rss, self.snapshot().get("rss_bytes", 0))
+
+    def start(self):
+        self.peak_rss = 0
+        if self.available:
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread.is_alive():
+            self._thread.join()
+        self._stop.clear()
+
+
+def percentile(values: List[float], percent: float) -> Optional[float]:
+    """정렬한 값에서 선형 보간한 백분위 값"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    position = (len(ordered) - 1) * percent / 100
+    lower = int(position)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+
+def latency_summary(values: List[float]) -> dict:
+    def rounded(value):
+        return round(value, 3) if value is not None else None
+    return {
+        "count": len(values),
+        "mean": rounded(sum(values) / len(values)) if values else None,
+        "p50": rounded(percentile(values, 50)),
+        "p95": rounded(percentile(values, 95)),
+        "p99": rounded(percentile(values, 99)),
+        "max": rounded(max(values)) if values else None
+    }
+
+
+def send_summarize(port: int, audio: dict) -> dict:
+    body, content_type = encode_multipart(audio["filename"], audio["content"], MIME_TYPES[audio["format"]])
+    start = time.perf_counter()
+    try:
+        status, _ = http_request(port, 'POST', '/summarize', body, {'Content-Type': content_type})
+    except OSError as e:
+        status = None
+        print(f"  [오류] 요청 실패: {e}")
+    return {"audio": audio["label"], "status": status, "latency": time.perf_counter() - start}
+
+
+def run_scenario(port: int, sampler: ProcessTreeSampler, audios: List[dict], concurrency: int,
+                 requests: int) -> dict:
+    """동시 요청 수 concurrency로 requests개 요청을 보내고 결과를 집계합니다."""
+    _, metrics_text = http_request(port, 'GET', '/metrics')
+    metrics_before = parse_metrics(metrics_text.decode())
+    usage_before = sampler.snapshot()
+
+    sampler.start()
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        results = list(executor.map(
+            lambda index: send_summarize(port, audios[index % len(audios)]), range(requests)
+        ))
+    elapsed = time.perf_counter() - start
+    sampler.stop()
+
+    _, metrics_text = http_request(port, 'GET', '/metrics')
+    metrics_after = parse_metrics(metrics_text.decode())
+    usage_after = sampler.snapshot()
+
+    succeeded = [result for result in results if result["status"] == 200]
+    status_counts = {}
+    for result in results:
+        status_counts[str(result["status"])] = status_counts.get(str(result["status"]), 0) + 1
+
+    stages = {}
+    for stage in STAGES:
+        labels = f'stage="{stage}"'
+        count = metric_delta(metrics_before, metrics_after, "audio_stage_duration_seconds_count", labels)
+        total = metric_delta(metrics_before, metrics_after, "audio_stage_duration_seconds_sum", labels)
+        stages[stage] = {
+            "count": int(count),
+            "total_seconds": round(total, 3),
+            "mean_seconds": round(total / count, 3) if count else None,
+            "failures": int(metric_delta(metrics_before, metrics_after, "audio_stage_failures_total", labels))
+        }
+
+    report = {
+        "concurrency": concurrency,
+        "requests": requests,
+        "succeeded": len(succeeded),
+        "status_counts": status_counts,
+        "duration_seconds": round(elapsed, 3),
+        "requests_per_second": round(len(succeeded) / elapsed, 3) if elapsed else None,
+        "latency_seconds": latency_summary([result["latency"] for result in succeeded]),
+        "latency_seconds_by_audio": {
+            audio["label"]: latency_summary([
+                result["latency"] for result in succeeded if result["audio"] == audio["label"]
+            ])
+            for audio in audios
+        },
+        "stages": stages
+    }
+    if usage_after:
+        report["peak_rss_mb"] = round(sampler.peak_rss / (1024 * 1024), 1)
+        report["cpu_seconds"] = {
+            role: round(usage_after["cpu_seconds"][role] - usage_before["cpu_seconds"][role], 3)
+            for role in ("server", "workers")
+        }
+    return report
+
+
+def wait_for_server(port: int, process: subprocess.Popen):
+    deadline = time.monotonic() + STARTUP_TIMEOUT
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"서버가 시작 중 종료되었습니다 (코드 {process.returncode})")
+        try:
+            status, _ = http_request(port, 'GET', '/health', timeout=2)
+            if status == 200:
+                return
+        except OSError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError(f"서버가 {STARTUP_TIMEOUT}초 안에 시작되지 않았습니다.")
+
+
+def git_revision() -> Optional[str]:
+    try:
+        completed = subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=PROJECT_DIR, capture_output=True, text=True, check=True
+        )
+        return completed.stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="/summarize 부하 테스트 (가짜 Gemini API 사용)")
+    parser.add_argument('--formats', nargs='+', default=['wav', 'mp3', 'm4a'], choices=sorted(MIME_TYPES),
+                        help="합성 오디오 형식 (기본값: wav mp3 m4a)")
+    parser.add_argument('--durations', nargs='+', type=float, default=[30, 300],
+                        help="합성 오디오 길이 (초, 기본값: 30 300)")
+    parser.add_argument('--concurrency', nargs='+', type=int, default=[1, 4],
+                        help="동시 요청 수 (여러 개를 지정하면 차례로 측정, 기본값: 1 4)")
+    parser.add_argument('--requests', type=int, default=20, help="측정마다 보낼 요청 수 (기본값: 20)")
+    parser.add_argument('--warmup', type=int, default=2, help="측정 전에 보낼 요청 수 (기본값: 2)")
+    parser.add_argument('--mode', default='two_step', choices=['two_step', 'single_call'],
+                        help="분석 방식 (기본값: two_step)")
+    parser.add_argument('--gemini-latency', type=float, default=1.0, help="가짜 분석 호출 지연 시간 (초, 기본값: 1.0)")
+    parser.add_argument('--upload-latency', type=float, default=0.2, help="가짜 업로드 지연 시간 (초, 기본값: 0.2)")
+    parser.add_argument('--jitter', type=float, default=0.2, help="지연 시간 변동 비율 (기본값: 0.2)")
+    parser.add_argument('--error-rate', type=float, default=0.0, help="분석 호출 503 오류 비율 (기본값: 0)")
+    parser.add_argument('--rate-limit-rate', type=float, default=0.0, help="분석 호출 429 오류 비율 (기본값: 0)")
+    parser.add_argument('--seed', type=int, default=1, help="가짜 API 난수 시드 (기본값: 1)")
+    parser.add_argument('--workers', type=int, default=1, help="서버 워커 프로세스 수 (기본값: 1)")
+    parser.add_argument('--output', help="결과를 저장할 JSON 파일 경로")
+    args = parser.parse_args()
+
+    if args.requests < 1 or args.warmup < 0 or min(args.concurrency) < 1 or args.workers < 1:
+        parser.error("--requests, --concurrency, --workers는 1 이상, --warmup은 0 이상이어야 합니다.")
+    return args
+
+
+def main():
+    args = parse_args()
+    if not shutil.which('ffmpeg'):
+        print("[오류] ffmpeg를 찾을 수 없습니다.")
+        sys.exit(1)
+
+    work_dir = Path(tempfile.mkdtemp(prefix="audio-benchmark-"))
+    process = None
+    try:
+        audios = []
+        print("합성 오디오 생성 중...")
+        for audio_format in args.formats:
+            for seconds in args.durations:
+                label = f"{audio_format}-{seconds:g}s"
+                path = work_dir / f"{label}.{audio_format}"
+                generate_synthetic_audio(audio_format, seconds, str(path))
+                content = path.read_bytes()
+                audios.append({
+                    "label": label, "format": audio_format, "duration_seconds": seconds,
+                    "filename": path.name, "content": content
+                })
+                print(f"  {label}: {len(content) / (1024 * 1024):.2f}MB")
+
+        port = find_free_port()
+        write_server_config(work_dir, port, args.mode, args.workers)
+        env = dict(
+            os.environ,
+            GOOGLE_API_KEY='benchmark',
+            FAKE_GEMINI_LATENCY=str(args.gemini_latency),
+            FAKE_GEMINI_UPLOAD_LATENCY=str(args.upload_latency),
+            FAKE_GEMINI_JITTER=str(args.jitter),
+            FAKE_GEMINI_ERROR_RATE=str(args.error_rate),
+            FAKE_GEMINI_RATE_LIMIT_RATE=str(args.rate_limit_rate),
+            FAKE_GEMINI_SEED=str(args.seed)
+        )
+        print(f"서버 시작 중... (포트 {port})")
+        process = subprocess.Popen(
+            [sys.executable, str(FAKE_SERVER), '--port', str(port), '--workers', str(args.workers)],
+            cwd=work_dir, env=env
+        )
+        wait_for_server(port, process)
+
+        for index in range(args.warmup):
+            send_summarize(port, audios[index % len(audios)])
+
+        sampler = ProcessTreeSampler(process.pid)
+        scenarios = []
+        for concurrency in args.concurrency:
+            print(f"측정 중: 동시 요청 {concurrency}, 요청 {args.requests}개")
+            scenario = run_scenario(port, sampler, audios, concurrency, args.requests)
+            scenarios.append(scenario)
+            latency = scenario["latency_seconds"]
+            print(
+                f"  성공 {scenario['succeeded']}/{args.requests}, {scenario['requests_per_second']}요청/초, "
+                f"p50 {latency['p50']}초, p95 {latency['p95']}초, p99 {latency['p99']}초"
+                + (f", 최대 RSS {scenario['peak_rss_mb']}MB" if 'peak_rss_mb' in scenario else "")
+            )
+
+        report = {
+            "created_at": datetime.now(timezone.utc).isoformat(timespec='seconds'),
+            "revision": git_revision(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "settings": {
+                key: value for key, value in vars(args).items() if key != 'output'
+            },
+            "audio": [
+                {
+                    "label": audio["label"], "format": audio["format"],
+                    "duration_seconds": audio["duration_seconds"], "bytes": len(audio["content"])
+                }
+                for audio in audios
+            ],
+            "scenarios": scenarios
+        }
+        if args.output:
+            output_dir = os.path.dirname(args.output)
+            if output_dir:
+                os.makedirs(output_dir, exist_ok=True)
+            with open(args.output, 'w', encoding='utf-8') as f:
+                json.dump(report, f, ensure_ascii=False, indent=2)
+            print(f"결과 저장: {args.output}")
+        else:
+            print(json.dumps(report, ensure_ascii=False, indent=2))
+    finally:
+        if process is not None:
+            process.terminate()
+            try:
+                process.wait(timeout=30)
+            except subprocess.TimeoutExpired:
+                process.kill()
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+"""
+오디오 변환 방식(ffmpeg 스트리밍 / pydub 메모리 디코딩) 벤치마크
+
+각 변환 방식을 별도 프로세스에서 실행하여 처리 시간과 최대 메모리 사용량(RSS)을 비교합니다.
+
+사용법:
+    python benchmarks/transcoder_benchmark.py                     # 합성 오디오(10분 스테레오 WAV)로 측정
+    python benchmarks/transcoder_benchmark.py --minutes 60        # 60분 합성 오디오로 측정
+    python benchmarks/transcoder_benchmark.py --input meeting.m4a # 실제 파일로 측정
+    python benchmarks/transcoder_benchmark.py --output result.json
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import resource
+import tempfile
+import subprocess
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from audio_utils import TRANSCODERS  # noqa: E402
+
+
+def generate_synthetic_audio(minutes: float, output_path: str):
+    """ffmpeg로 스테레오 44.1kHz WAV 합성 오디오를 생성합니다."""
+    subprocess.run(
+        [
+            'ffmpeg', '-v', 'error', '-y',
+            '-f', 'lavfi', '-i', f"sine=frequency=440:sample_rate=44100:duration={minutes * 60}",
+            '-f', 'lavfi', '-i', f"anoisesrc=color=pink:sample_rate=44100:amplitude=0.05:duration={minutes * 60}",
+            '-filter_complex', 'amerge=inputs=2',
+            '-ac', '2',
+            output_path
+        ],
+        check=True
+    )
+
+
+def run_worker(backend: str, input_path: str, bitrate: str):
+    """
+    (하위 프로세스) 변환을 한 번 실행하고 측정 결과를 JSON으로 출력합니다.
+    ru_maxrss는 Linux에서 KB, macOS에서 바이트 단위입니다.
+    """
+    file_extension = Path(input_path).suffix.lower().replace('.', '')
+    output_path = tempfile.NamedTemporaryFile(suffix='.mp3', delete=False).name
+
+    start = time.perf_counter()
+    try:
+        TRANSCODERS[backend](input_path, output_path, file_extension, bitrate)
+        elapsed = time.perf_counter() - start
+        output_size = os.path.getsize(output_path)
+    finally:
+        if os.path.exists(output_path):
+            os.remove(output_path)
+
+    scale = 1 if sys.platform == 'darwin' else 1024
+    self_usage = resource.getrusage(resource.RUSAGE_SELF)
+    child_usage = resource.getrusage(resource.RUSAGE_CHILDREN)
+    print(json.dumps({
+        "backend": backend,
+        "wall_time_sec": round(elapsed, 3),
+        "python_peak_rss_mb": round(self_usage.ru_maxrss * scale / (1024 * 1024), 1),
+        "ffmpeg_peak_rss_mb": round(child_usage.ru_maxrss * scale / (1024 * 1024), 1),
+        "cpu_time_sec": round(
+            self_usage.ru_utime + self_usage.ru_stime + child_usage.ru_utime + child_usage.ru_stime, 3
+        ),
+        "output_bytes": output_size
+    }))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="오디오 변환 방식 벤치마크")
+    parser.add_argument('--input', help="측정할 오디오 파일 (없으면 합성 오디오 생성)")
+    parser.add_argument('--minutes', type=float, default=10, help="합성 오디오 길이 (분, 기본값: 10)")
+    parser.add_argument('--backends', nargs='+', default=list(TRANSCODERS), help="측정할 변환 방식")
+    parser.add_argument('--bitrate', default='32k', help="출력 비트레이트 (기본값: 32k)")
+    parser.add_argument('--repeat', type=int, default=1, help="반복 횟수 (기본값: 1)")
+    parser.add_argument('--output', help="결과를 저장할 JSON 파일 경로")
+    parser.add_argument('--worker', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        run_worker(args.worker, args.input, args.bitrate)
+        return
+
+    generated_path = None
+    input_path = args.input
+    if not input_path:
+        generated_path = tempfile.NamedTemporaryFile(suffix='.wav', delete=False).name
+        print(f"합성 오디오 생성 중... ({args.minutes}분 스테레오 WAV)")
+        generate_synthetic_audio(args.minutes, generated_path)
+        input_path = generated_path
+
+    try:
+        input_size = os.path.getsize(input_path)
+        print(f"입력 파일: {input_path} ({input_size / (1024 * 1024):.2f}MB)")
+
+        runs = []
+        for backend in args.backends:
+            for _ in range(args.repeat):
+                completed = subprocess.run(
+                    [sys.executable, __file__, '--worker', backend, '--input', input_path, '--bitrate', args.bitrate],
+                    capture_output=True,
+                    text=True,
+                    check=True
+                )
+                run = json.loads(completed.stdout.strip().splitlines()[-1])
+                runs.append(run)
+                print(
+                    f"  {backend:>6}: {run['wall_time_sec']:.2f}초, "
+                    f"Python RSS {run['python_peak_rss_mb']}MB, ffmpeg RSS {run['ffmpeg_peak_rss_mb']}MB"
+                )
+
+        report = {
+            "input": input_path if not generated_path else f"synthetic-{args.minutes}min.wav",
+            "input_bytes": input_size,
+            "bitrate": args.bitrate,
+            "runs": runs
+        }
+        if args.output:
+            with open(args.output, 'w', encoding='utf-8') as f:
+                json.dump(report, f, ensure_ascii=False, indent=2)
+            print(f"결과 저장: {args.output}")
+    finally:
+        if generated_path and os.path.exists(generated_path):
+            os.remove(generated_path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,274 @@
+import json
+import time
+import logging
+import threading
+from contextlib import contextmanager
+from typing import Callable, Optional
+
+from result_cache import hash_file
+
+
+# Gemini에 업로드된 파일은 48시간 후 자동 삭제되므로 그보다 짧게 재사용합니다
+MAX_UPLOAD_REUSE_SECONDS = 47 * 3600
+
+# google.generativeai는 불러오는 데 1초 가까이 걸리므로 처음 사용할 때 불러옵니다 (서버 시작 시간 단축)
+_genai = None
+_genai_lock = threading.Lock()
+_api_key = None
+
+
+def configure_gemini(api_key: str):
+    """
+    Gemini API 키를 지정합니다. 모듈을 아직 불러오지 않았으면 처음 불러올 때 적용합니다.
+
+    Args:
+        api_key: Gemini API 키
+    """
+    global _api_key
+    with _genai_lock:
+        _api_key = api_key
+        if _genai is not None:
+            _genai.configure(api_key=api_key)
+
+
+def load_genai():
+    """
+    google.generativeai 모듈을 반환합니다. 처음 호출할 때 불러오고 API 키를 적용합니다.
+
+    Returns:
+        google.generativeai 모듈
+    """
+    global _genai
+    if _genai is not None:
+        return _genai
+    with _genai_lock:
+        if _genai is None:
+            started = time.perf_counter()
+            import google.generativeai as genai
+            if _api_key:
+                genai.configure(api_key=_api_key)
+            _genai = genai
+            logging.info(f"[Gemini] google.generativeai 불러오기 완료 ({time.perf_counter() - started:.2f}초)")
+    return _genai
+
+
+class ModelRegistry:
+    """
+    GenerativeModel 객체를 (모델 이름, 생성 설정)별로 한 번만 만들어 재사용합니다.
+    """
+
+    def __init__(self):
+        self._models = {}
+        self._lock = threading.Lock()
+
+    def get(self, model_name: str, generation_config: Optional[dict] = None):
+        """
+        모델 객체를 반환합니다. 처음 요청된 조합이면 새로 생성합니다.
+
+        Args:
+            model_name: Gemini 모델 이름
+            generation_config: 생성 설정 (선택)
+
+        Returns:
+            genai.GenerativeModel 객체
+        """
+        key = (model_name, json.dumps(generation_config, sort_keys=True) if generation_config else None)
+        with self._lock:
+            model = self._models.get(key)
+            if model is None:
+                model = load_genai().GenerativeModel(model_name, generation_config=generation_config)
+                self._models[key] = model
+                logging.info(f"[Gemini] 모델 준비: {model_name}")
+            return model
+
+    def __len__(self):
+        with self._lock:
+            return len(self._models)
+
+
+class UploadedFileRegistry:
+    """
+    변환된 오디오의 해시와 Gemini 업로드 파일을 연결하여 재시도 시 다시 업로드하지 않도록 합니다.
+    사용이 끝난 파일은 reuse_ttl이 0이면 바로, 그 외에는 보관 시간이 지나면 Gemini에서 삭제합니다.
+    업로드마다 별도의 키로 관리하므로, 재사용 기간이 지나 같은 내용을 다시 업로드해도
+    아직 사용 중인 이전 업로드는 사용이 끝날 때까지 유지됩니다.
+    """
+
+    def __init__(self, reuse_ttl: int = 0):
+        self.reuse_ttl = min(reuse_ttl, MAX_UPLOAD_REUSE_SECONDS)
+        # 업로드 키 -> 업로드 정보, 파일 해시 -> 재사용할 업로드 키
+        self._entries = {}
+        self._current = {}
+        # 파일 해시 -> [잠금, 사용 중인 스레드 수] (사용하는 스레드가 없을 때만 제거)
+        self._hash_locks = {}
+        self._lock = threading.Lock()
+        self.uploads = 0
+        self.reuses = 0
+
+    @contextmanager
+    def _hash_lock(self, file_hash: str):
+        """같은 내용의 파일은 한 번에 하나씩만 업로드하도록 해시별 잠금을 잡습니다."""
+        with self._lock:
+            slot = self._hash_locks.setdefault(file_hash, [threading.Lock(), 0])
+            slot[1] += 1
+        try:
+            with slot[0]:
+                yield
+        finally:
+            with self._lock:
+                slot[1] -= 1
+                if slot[1] == 0:
+                    del self._hash_locks[file_hash]
+
+    def acquire(self, file_path: str, upload: Callable[[str], object]):
+        """
+        파일을 Gemini에 업로드하거나, 같은 내용의 파일이 이미 업로드되어 있으면 재사용합니다.
+        사용 중인 업로드는 재사용 기간이 지났어도 (Gemini에서 삭제되기 전까지) 재사용하며 기간을 늘립니다.
+
+        Args:
+            file_path: 업로드할 파일 경로
+            upload: 실제 업로드 함수 (파일 경로를 받아 업로드된 파일 객체를 반환)
+
+        Returns:
+            (업로드된 파일 객체, 업로드 키) 튜플. 사용이 끝나면 release(업로드 키)를 호출해야 합니다.
+        """
+        file_hash = hash_file(file_path)
+        with self._hash_lock(file_hash):
+            with self._lock:
+                now = time.time()
+                upload_key = self._current.get(file_hash)
+                entry = self._entries.get(upload_key)
+                if entry and now < entry["uploaded_at"] + MAX_UPLOAD_REUSE_SECONDS and (
+                        entry["expires_at"] > now or entry["refs"] > 0):
+                    entry["refs"] += 1
+                    entry["expires_at"] = max(
+                        entry["expires_at"],
+                        min(now + self.reuse_ttl, entry["uploaded_at"] + MAX_UPLOAD_REUSE_SECONDS)
+                    )
+                    self.reuses += 1
+                    logging.info(f"[업로드] 이전 업로드 파일 재사용: {entry['file'].name}")
+                    return entry["file"], upload_key
+
+            uploaded_file = upload(file_path)
+            with self._lock:
+                now = time.time()
+                self.uploads += 1
+                upload_key = f"{file_hash}:{self.uploads}"
+                self._entries[upload_key] = {
+                    "file": uploaded_file,
+                    "file_hash": file_hash,
+                    "refs": 1,
+                    "uploaded_at": now,
+                    "expires_at": now + (self.reuse_ttl or MAX_UPLOAD_REUSE_SECONDS)
+                }
+                # 이전 업로드가 아직 사용 중이면 그대로 두고, 이후 요청은 새 업로드를 재사용
+                self._current[file_hash] = upload_key
+        return uploaded_file, upload_key
+
+    def _pop(self, upload_key: str) -> object:
+        """업로드 정보를 제거하고 업로드 파일 객체를 반환합니다 (self._lock 안에서 호출)."""
+        entry = self._entries.pop(upload_key)
+        if self._current.get(entry["file_hash"]) == upload_key:
+            del self._current[entry["file_hash"]]
+        return entry["file"]
+
+    def release(self, upload_key: str):
+        """
+        업로드 파일 사용이 끝났음을 알립니다.
+        더 사용하는 요청이 없고 reuse_ttl이 0이거나 새 업로드로 대체되었으면 Gemini에서 바로 삭제합니다.
+
+        Args:
+            upload_key: acquire가 반환한 업로드 키
+        """
+        to_delete = None
+        with self._lock:
+            entry = self._entries.get(upload_key)
+            if entry is None:
+                return
+            entry["refs"] -= 1
+            superseded = self._current.get(entry["file_hash"]) != upload_key
+            if entry["refs"] <= 0 and (self.reuse_ttl == 0 or superseded):
+                to_delete = self._pop(upload_key)
+        if to_delete is not None:
+            delete_remote_file(to_delete)
+
+    def evict_expired(self) -> int:
+        """
+        보관 시간이 지났고 사용 중이 아닌 업로드 파일을 Gemini에서 삭제합니다.
+
+        Returns:
+            삭제된 파일 수
+        """
+        now = time.time()
+        with self._lock:
+            expired = [
+                upload_key for upload_key, entry in self._entries.items()
+                if entry["refs"] <= 0 and entry["expires_at"] <= now
+            ]
+            files = [self._pop(upload_key) for upload_key in expired]
+        for uploaded_file in files:
+            delete_remote_file(uploaded_file)
+        return len(files)
+
+    def clear(self):
+        """사용 중이 아닌 모든 업로드 파일을 Gemini에서 삭제합니다 (서버 종료 시)."""
+        with self._lock:
+            idle = [upload_key for upload_key, entry in self._entries.items() if entry["refs"] <= 0]
+            files = [self._pop(upload_key) for upload_key in idle]
+        for uploaded_file in files:
+            delete_remote_file(uploaded_file)
+
+    def stats(self) -> dict:
+        """업로드/재사용 횟수와 보관 중인 파일 수를 반환합니다."""
+        with self._lock:
+            return {
+                "uploads": self.uploads,
+                "reuses": self.reuses,
+                "retained_files": len(self._entries)
+            }
+
+
+def generate_text(model, contents, on_text: Optional[Callable[[str], None]] = None,
+                  timeout: Optional[float] = None) -> str:
+    """
+    Gemini 응답 텍스트를 생성합니다.
+    on_text가 주어지면 스트리밍으로 요청하여 생성되는 조각마다 on_text를 호출합니다.
+
+    Args:
+        model: GenerativeModel 객체
+        contents: 프롬프트 (문자열 또는 [프롬프트, 업로드 파일] 목록)
+        on_text: 생성된 텍스트 조각을 받는 함수 (선택)
+        timeout: 요청 제한 시간 (초, 선택)
+
+    Returns:
+        전체 응답 텍스트
+    """
+    request_options = {"timeout": timeout} if timeout else None
+    if on_text is None:
+        return model.generate_content(contents, request_options=request_options).text
+
+    parts = []
+    for chunk in model.generate_content(contents, stream=True, request_options=request_options):
+        try:
+            text = chunk.text
+        except ValueError:
+            # 텍스트가 없는 조각 (종료 정보만 담긴 마지막 조각 등)
+            continue
+        if text:
+            parts.append(text)
+            on_text(text)
+    return "".join(parts)
+
+
+def delete_remote_file(uploaded_file):
+    """
+    Gemini에 업로드된 파일을 삭제합니다 (개인정보 보호).
+
+    Args:
+        uploaded_file: 업로드된 파일 객체
+    """
+    try:
+        load_genai().delete_file(uploaded_file.name)
+        logging.info(f"[삭제] Gemini 업로드 파일 삭제 완료: {uploaded_file.name}")
+    except Exception as e:
+        logging.error(f"[오류] Gemini 업로드 파일 삭제 실패: {e}")
@@ -106,6 +106,10 @@ Environment="PATH=$PATH"
 ExecStart=$PYTHON_PATH $INSTALL_DIR/server.py
 Restart=always
 RestartSec=10
+# 정상 종료 (처리 중인 요청/작업을 마친 뒤 종료, config.yaml의 server.drain_timeout_seconds x 2 + 여유)
+KillMode=mixed
+KillSignal=SIGTERM
+TimeoutStopSec=660
 StandardOutput=append:$INSTALL_DIR/logs/service.log
 StandardError=append:$INSTALL_DIR/logs/service-error.log
 
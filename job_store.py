@@ -0,0 +1,369 @@
+import os
+import json
+import time
+import uuid
+import sqlite3
+import logging
+import threading
+from typing import Optional
+
+
+# 작업 상태
+JOB_QUEUED = "queued"
+JOB_CONVERTING = "converting"
+JOB_UPLOADING = "uploading"
+JOB_TRANSCRIBING = "transcribing"
+JOB_SUMMARIZING = "summarizing"
+JOB_COMPLETED = "completed"
+JOB_FAILED = "failed"
+
+# 더 이상 진행되지 않는 상태
+FINISHED_STATES = {JOB_COMPLETED, JOB_FAILED}
+
+# 진행률 표시용 단계 순서
+JOB_STAGES = [JOB_QUEUED, JOB_CONVERTING, JOB_UPLOADING, JOB_TRANSCRIBING, JOB_SUMMARIZING, JOB_COMPLETED]
+
+# 처리하던 프로세스가 종료되어 중단된 작업의 오류 메시지
+ORPHANED_JOB_ERROR = "서버 재시작으로 작업이 중단되었습니다."
+
+# 조회 결과에 포함할 작업 열 (처리 프로세스 정보 등 내부 열은 제외)
+JOB_COLUMNS = "job_id, status, filename, created_at, updated_at, result, error, error_code"
+
+
+def _process_alive(pid: Optional[int]) -> bool:
+    """pid 프로세스가 실행 중인지 확인합니다 (pid가 없으면 False)."""
+    if not pid or pid == os.getpid():
+        return False
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def _new_job(filename: str) -> dict:
+    """새 작업 레코드를 생성합니다."""
+    now = time.time()
+    return {
+        "job_id": uuid.uuid4().hex,
+        "status": JOB_QUEUED,
+        "filename": filename,
+        "created_at": now,
+        "updated_at": now,
+        "result": None,
+        "error": None,
+        "error_code": None
+    }
+
+
+def stage_progress(status: str) -> float:
+    """
+    작업 상태를 0~1 사이의 진행률로 변환합니다.
+
+    Args:
+        status: 작업 상태
+
+    Returns:
+        진행률 (알 수 없는 상태는 0)
+    """
+    step = JOB_STAGES.index(status) if status in JOB_STAGES else 0
+    return round(step / (len(JOB_STAGES) - 1), 2)
+
+
+def job_progress(job: dict) -> dict:
+    """
+    작업 레코드를 API 응답용 상태 정보로 변환합니다 (결과 본문 제외).
+
+    Args:
+        job: 작업 레코드
+
+    Returns:
+        상태/진행률 딕셔너리
+    """
+    status = job["status"]
+    return {
+        "job_id": job["job_id"],
+        "status": status,
+        "filename": job["filename"],
+        "progress": stage_progress(status),
+        "created_at": job["created_at"],
+        "updated_at": job["updated_at"],
+        "error": job["error"]
+    }
+
+
+class JobStore:
+    """
+    메모리 기반 작업 저장소입니다.
+    완료/실패한 작업은 result_ttl 초가 지나면 자동으로 삭제됩니다.
+    """
+
+    def __init__(self, result_ttl: int = 3600):
+        self.result_ttl = result_ttl
+        self._jobs = {}
+        self._lock = threading.Lock()
+
+    def create(self, filename: str) -> dict:
+        """새 작업을 등록하고 작업 레코드를 반환합니다."""
+        job = _new_job(filename)
+        with self._lock:
+            self._jobs[job["job_id"]] = job
+        return dict(job)
+
+    def get(self, job_id: str) -> Optional[dict]:
+        """
+        작업 레코드를 조회합니다. 없거나 만료되었으면 None을 반환합니다.
+        만료된 작업의 삭제는 evict_expired(주기적인 정리 작업)에서 합니다.
+        """
+        deadline = time.time() - self.result_ttl
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None or (job["status"] in FINISHED_STATES and job["updated_at"] < deadline):
+                return None
+            return dict(job)
+
+    def update(self, job_id: str, **fields):
+        """작업 레코드의 필드를 갱신합니다."""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return
+            job.update(fields)
+            job["updated_at"] = time.time()
+
+    def set_status(self, job_id: str, status: str):
+        """작업 상태를 갱신합니다."""
+        self.update(job_id, status=status)
+
+    def complete(self, job_id: str, result: dict):
+        """작업을 완료 처리하고 결과를 저장합니다."""
+        self.update(job_id, status=JOB_COMPLETED, result=result)
+
+    def fail(self, job_id: str, error: str, error_code: int = 500):
+        """작업을 실패 처리합니다."""
+        self.update(job_id, status=JOB_FAILED, error=error, error_code=error_code)
+
+    def count_active(self) -> int:
+        """진행 중인 작업 수를 반환합니다."""
+        with self._lock:
+            return sum(1 for job in self._jobs.values() if job["status"] not in FINISHED_STATES)
+
+    def fail_orphaned(self) -> int:
+        """
+        처리하던 프로세스가 종료된 작업을 실패 처리합니다.
+        메모리 저장소의 작업은 프로세스와 함께 사라지므로 할 일이 없습니다.
+
+        Returns:
+            실패 처리한 작업 수
+        """
+        return 0
+
+    def evict_expired(self) -> int:
+        """만료된 작업을 삭제하고 삭제된 개수를 반환합니다."""
+        deadline = time.time() - self.result_ttl
+        with self._lock:
+            expired = [
+                job_id for job_id, job in self._jobs.items()
+                if job["status"] in FINISHED_STATES and job["updated_at"] < deadline
+            ]
+            for job_id in expired:
+                del self._jobs[job_id]
+        if expired:
+            logging.info(f"[작업] 만료된 작업 {len(expired)}개 삭제")
+        return len(expired)
+
+
+class SQLiteJobStore(JobStore):
+    """
+    SQLite 기반 작업 저장소입니다.
+    서버가 재시작되어도 완료된 작업 결과를 조회할 수 있으며,
+    여러 워커 프로세스가 같은 파일을 사용하면 어느 워커에서든 작업 상태를 조회할 수 있습니다.
+
+    작업마다 처리하는 프로세스의 토큰(시작할 때 만드는 임의 값)을 기록하고, 프로세스는 fail_orphaned가
+    호출될 때마다 job_owners 테이블의 확인 시각을 갱신합니다. PID는 재시작 후 다른 프로세스에 다시
+    쓰일 수 있으므로, 확인 시각이 heartbeat_timeout보다 오래되었거나 같은 PID로 나중에 시작한
+    프로세스가 있으면 종료된 것으로 보고 진행 중이던 작업을 실패 처리합니다.
+    """
+
+    def __init__(self, db_path: str, result_ttl: int = 3600, heartbeat_timeout: float = 180):
+        super().__init__(result_ttl)
+        self.owner_token = uuid.uuid4().hex
+        self.heartbeat_timeout = heartbeat_timeout
+        db_dir = os.path.dirname(db_path)
+        if db_dir:
+            os.makedirs(db_dir, exist_ok=True)
+        self.db_path = db_path
+        # 다른 워커가 쓰는 동안에는 잠금이 풀릴 때까지 기다림
+        self._conn = sqlite3.connect(db_path, timeout=30, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        with self._lock, self._conn:
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS jobs (
+                    job_id TEXT PRIMARY KEY,
+                    status TEXT NOT NULL,
+                    filename TEXT,
+                    created_at REAL NOT NULL,
+                    updated_at REAL NOT NULL,
+                    result TEXT,
+                    error TEXT,
+                    error_code INTEGER,
+                    owner_token TEXT
+                )
+                """
+            )
+            columns = {row["name"] for row in self._conn.execute("PRAGMA table_info(jobs)")}
+            if "owner_token" not in columns:
+                self._conn.execute("ALTER TABLE jobs ADD COLUMN owner_token TEXT")
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS job_owners (
+                    owner_token TEXT PRIMARY KEY,
+                    pid INTEGER NOT NULL,
+                    started_at REAL NOT NULL,
+                    heartbeat_at REAL NOT NULL
+                )
+                """
+            )
+            now = time.time()
+            self._conn.execute(
+                "INSERT INTO job_owners (owner_token, pid, started_at, heartbeat_at) VALUES (?, ?, ?, ?)",
+                (self.owner_token, os.getpid(), now, now)
+            )
+            # 종료된 프로세스가 진행 중이던 작업은 임시 파일이 사라졌으므로 실패 처리
+            # (다른 워커가 처리 중인 작업은 그대로 둠)
+            orphaned = self._fail_orphaned_locked(now)
+        logging.info(f"[작업] SQLite 작업 저장소 사용: {db_path}")
+        if orphaned:
+            logging.warning(f"[작업] 처리하던 프로세스가 종료되어 중단된 작업 {orphaned}개를 실패 처리했습니다.")
+
+    def _owner_alive(self, owner, now: float) -> bool:
+        """작업을 처리하는 프로세스가 아직 실행 중인지 확인합니다 (owner: job_owners 행, 없으면 None)."""
+        if owner["owner_token"] is None:
+            return False
+        if owner["owner_token"] == self.owner_token:
+            return True
+        if owner["heartbeat_at"] is None or now - owner["heartbeat_at"] > self.heartbeat_timeout:
+            return False
+        if owner["pid"] == os.getpid() or owner["newer_with_same_pid"]:
+            # 같은 PID로 나중에 시작한 프로세스가 있으면 이전 프로세스는 종료된 것
+            return False
+        return _process_alive(owner["pid"])
+
+    def _fail_orphaned_locked(self, now: float) -> int:
+        """fail_orphaned의 본체 (self._lock과 트랜잭션 안에서 호출)."""
+        rows = self._conn.execute(
+            """
+            SELECT j.job_id, o.owner_token, o.pid, o.heartbeat_at,
+                   EXISTS (
+                       SELECT 1 FROM job_owners newer WHERE newer.pid = o.pid AND newer.started_at > o.started_at
+                   ) AS newer_with_same_pid
+            FROM jobs j LEFT JOIN job_owners o ON o.owner_token = j.owner_token
+            WHERE j.status NOT IN (?, ?)
+            """,
+            (JOB_COMPLETED, JOB_FAILED)
+        ).fetchall()
+        orphaned = [row["job_id"] for row in rows if not self._owner_alive(row, now)]
+        self._conn.executemany(
+            "UPDATE jobs SET status = ?, error = ?, error_code = 500, updated_at = ? WHERE job_id = ?",
+            [(JOB_FAILED, ORPHANED_JOB_ERROR, now, job_id) for job_id in orphaned]
+        )
+        # 확인 시각이 오래된 프로세스 기록은 더 이상 필요 없음
+        self._conn.execute(
+            "DELETE FROM job_owners WHERE heartbeat_at < ? AND owner_token != ?",
+            (now - self.heartbeat_timeout, self.owner_token)
+        )
+        return len(orphaned)
+
+    def fail_orphaned(self) -> int:
+        """
+        이 프로세스의 확인 시각을 갱신하고, 처리하던 프로세스가 종료된 작업을 실패 처리합니다
+        (주기적인 정리 작업에서 호출, 다른 워커가 종료된 경우도 찾음).
+
+        Returns:
+            실패 처리한 작업 수
+        """
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE job_owners SET heartbeat_at = ? WHERE owner_token = ?", (now, self.owner_token)
+            )
+            orphaned = self._fail_orphaned_locked(now)
+        if orphaned:
+            logging.warning(f"[작업] 처리하던 프로세스가 종료되어 중단된 작업 {orphaned}개를 실패 처리했습니다.")
+        return orphaned
+
+    def _row_to_job(self, row) -> dict:
+        job = dict(row)
+        job["result"] = json.loads(job["result"]) if job["result"] else None
+        return job
+
+    def create(self, filename: str) -> dict:
+        job = _new_job(filename)
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT INTO jobs (job_id, status, filename, created_at, updated_at, owner_token) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (job["job_id"], job["status"], filename, job["created_at"], job["updated_at"], self.owner_token)
+            )
+        return job
+
+    def get(self, job_id: str) -> Optional[dict]:
+        deadline = time.time() - self.result_ttl
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT {JOB_COLUMNS} FROM jobs WHERE job_id = ? AND NOT (status IN (?, ?) AND updated_at < ?)",
+                (job_id, JOB_COMPLETED, JOB_FAILED, deadline)
+            ).fetchone()
+        return self._row_to_job(row) if row else None
+
+    def update(self, job_id: str, **fields):
+        if "result" in fields:
+            fields["result"] = json.dumps(fields["result"], ensure_ascii=False)
+        fields["updated_at"] = time.time()
+        columns = ", ".join(f"{name} = ?" for name in fields)
+        with self._lock, self._conn:
+            self._conn.execute(
+                f"UPDATE jobs SET {columns} WHERE job_id = ?",
+                (*fields.values(), job_id)
+            )
+
+    def count_active(self) -> int:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT COUNT(*) FROM jobs WHERE status NOT IN (?, ?)",
+                (JOB_COMPLETED, JOB_FAILED)
+            ).fetchone()
+        return row[0]
+
+    def evict_expired(self) -> int:
+        deadline = time.time() - self.result_ttl
+        with self._lock, self._conn:
+            cursor = self._conn.execute(
+                "DELETE FROM jobs WHERE status IN (?, ?) AND updated_at < ?",
+                (JOB_COMPLETED, JOB_FAILED, deadline)
+            )
+        if cursor.rowcount:
+            logging.info(f"[작업] 만료된 작업 {cursor.rowcount}개 삭제")
+        return cursor.rowcount
+
+
+def create_job_store(jobs_config: dict) -> JobStore:
+    """
+    설정에 따라 작업 저장소를 생성합니다.
+
+    Args:
+        jobs_config: config.yaml의 jobs 섹션
+
+    Returns:
+        JobStore 또는 SQLiteJobStore
+    """
+    result_ttl = jobs_config.get('result_ttl_seconds', 3600)
+    if jobs_config.get('store', 'memory') == 'sqlite':
+        # 프로세스 확인 시각은 정리 주기마다 갱신되므로 세 번 연속 갱신되지 않으면 종료된 것으로 봄
+        heartbeat_timeout = 3 * jobs_config.get('eviction_interval_seconds', 60)
+        return SQLiteJobStore(jobs_config.get('sqlite_path', 'data/jobs.db'), result_ttl, heartbeat_timeout)
+    return JobStore(result_ttl)
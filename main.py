@@ -1,9 +1,20 @@
 import os
-import tempfile
+import sys
+import glob
+import json
+import time
+import argparse
+import threading
+from datetime import datetime
 from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import List, Optional, Tuple
 from dotenv import load_dotenv
 import google.generativeai as genai
-from pydub import AudioSegment
+
+from audio_utils import convert_audio, get_mime_type
+from gemini_client import delete_remote_file
+from quota import RateLimiter, DailyUsage
 
 # 환경변수 로드
 load_dotenv()
@@ -15,51 +26,69 @@ if not api_key:
 
 genai.configure(api_key=api_key)
 
+# 사용할 Gemini 모델
+GEMINI_MODEL = 'gemini-1.5-flash-latest'
+
+# 일괄 처리 시 찾을 오디오 형식 (서버 업로드 지원 형식과 같음)
+AUDIO_EXTENSIONS = {'.mp3', '.wav', '.m4a', '.ogg', '.flac', '.aac', '.wma', '.webm'}
+
+# 일괄 처리 기본값
+DEFAULT_WORKERS = 4
+DEFAULT_RPM = 15  # Gemini 1.5 Flash 무료 등급의 분당 요청 한도
+DEFAULT_MANIFEST = "manifest.jsonl"
+
+# 일괄 처리 시 분당 요청 수 제한 (run_batch에서 설정)
+rate_limiter = None
+
+# 한도 초과 안내 메시지 (일일 한도 초과면 일괄 처리를 중단, 분당 한도 초과면 해당 파일만 실패)
+DAILY_QUOTA_MESSAGE = "일일 사용량이 초과되었습니다. 내일 다시 시도해주세요."
+RATE_LIMITED_MESSAGE = "Gemini 분당 요청 한도를 초과했습니다. 잠시 후 다시 시도해주세요."
+
+
+def raise_if_quota_exceeded(error: Exception):
+    """
+    API 한도 초과 오류이면 사용자 안내 메시지로 바꿔서 발생시킵니다.
+    Gemini 429 응답은 초과한 한도 이름(...PerDay... / ...PerMinute...)을 알려 주므로,
+    일일 한도라고 확인되지 않은 429는 분당 한도 초과로 안내합니다.
+    
+    Args:
+        error: Gemini API 호출 중 발생한 예외
+    """
+    error_message = str(error).lower()
+    if not any(keyword in error_message for keyword in ('quota', '429', 'exhausted', 'rate limit')):
+        return
+    compact_message = error_message.replace(" ", "")
+    if 'perday' in compact_message or 'daily' in compact_message:
+        raise Exception(DAILY_QUOTA_MESSAGE)
+    raise Exception(RATE_LIMITED_MESSAGE)
+
 
 def convert_audio_to_lightweight_mp3(input_file_path: str) -> str:
     """
     다양한 형식의 오디오 파일을 경량 MP3로 변환합니다.
     비용 절감을 위해 32kbps 비트레이트를 사용합니다.
+    이미 가벼운 mp3/ogg/aac 파일은 변환하지 않고, m4a/webm 등은 가능하면 디코딩 없이 리먹스합니다.
     
     Args:
         input_file_path: 입력 오디오 파일 경로
     
     Returns:
-        변환된 MP3 파일 경로 (임시 파일)
+        업로드할 파일 경로 (변환하지 않은 경우 입력 파일 경로 그대로, 그 외에는 임시 파일)
     """
     print(f"오디오 변환 시작: {input_file_path}")
     
-    # 파일 확장자 확인
-    input_path = Path(input_file_path)
-    file_extension = input_path.suffix.lower().replace('.', '')
-    
-    # 임시 파일 생성
-    temp_file = tempfile.NamedTemporaryFile(suffix='.mp3', delete=False)
-    output_file_path = temp_file.name
-    temp_file.close()
-    
     try:
-        # 오디오 파일 로드
-        audio = AudioSegment.from_file(input_file_path, format=file_extension)
-        
-        # 경량 MP3로 변환 (32kbps, 모노로 변환하여 용량 절감)
-        audio = audio.set_channels(1)  # 모노로 변환
-        audio.export(
-            output_file_path, 
-            format='mp3', 
-            bitrate='32k',
-            parameters=["-ac", "1"]  # 모노 채널 강제
-        )
+        output_file_path = convert_audio(input_file_path)
         
         # 파일 크기 확인
         file_size = os.path.getsize(output_file_path) / (1024 * 1024)  # MB
-        print(f"오디오 변환 완료: {output_file_path} ({file_size:.2f}MB)")
+        if output_file_path == input_file_path:
+            print(f"이미 경량 파일이므로 변환 생략 ({file_size:.2f}MB)")
+        else:
+            print(f"오디오 변환 완료: {output_file_path} ({file_size:.2f}MB)")
         return output_file_path
     
     except Exception as e:
-        # 변환 실패 시 임시 파일 삭제
-        if os.path.exists(output_file_path):
-            os.remove(output_file_path)
         print(f"오디오 변환 중 오류 발생: {e}")
         raise
 
@@ -77,15 +106,13 @@ def upload_audio_to_gemini(audio_file_path: str) -> any:
     print(f"Gemini에 파일 업로드 중...")
     
     try:
-        uploaded_file = genai.upload_file(audio_file_path)
+        uploaded_file = genai.upload_file(audio_file_path, mime_type=get_mime_type(audio_file_path))
         print(f"파일 업로드 완료: {uploaded_file.name}")
         return uploaded_file
     
     except Exception as e:
         # API 할당량 초과 에러 처리
-        error_message = str(e).lower()
-        if 'quota' in error_message or 'limit' in error_message or '429' in error_message:
-            raise Exception("일일 사용량이 초과되었습니다. 내일 다시 시도해주세요.")
+        raise_if_quota_exceeded(e)
         print(f"파일 업로드 중 오류 발생: {e}")
         raise
 
@@ -105,11 +132,15 @@ def summarize_audio_with_gemini(uploaded_file: any) -> str:
     try:
         # Gemini 1.5 Flash 무료 모델 사용
         # Gemini 1.5 Flash Latest 모델 사용 (최신 API 버전)
-        model = genai.GenerativeModel('gemini-1.5-flash-latest')
+        model = genai.GenerativeModel(GEMINI_MODEL)
         
         # 프롬프트 작성
         prompt = "이 회의 녹음 파일을 분석해서, 주요 안건, 결정 사항, 향후 행동 계획(Action Item)으로 요약해줘."
         
+        # 일괄 처리 중이면 분당 요청 한도를 넘지 않도록 순서를 기다림
+        if rate_limiter is not None:
+            rate_limiter.acquire(GEMINI_MODEL)
+        
         # 요약 생성
         response = model.generate_content([prompt, uploaded_file])
         
@@ -118,9 +149,7 @@ def summarize_audio_with_gemini(uploaded_file: any) -> str:
     
     except Exception as e:
         # API 할당량 초과 에러 처리
-        error_message = str(e).lower()
-        if 'quota' in error_message or 'limit' in error_message or '429' in error_message:
-            raise Exception("일일 사용량이 초과되었습니다. 내일 다시 시도해주세요.")
+        raise_if_quota_exceeded(e)
         print(f"요약 생성 중 오류 발생: {e}")
         raise
 
@@ -137,6 +166,7 @@ def process_audio_file(input_file_path: str) -> str:
         회의록 요약 텍스트
     """
     mp3_file_path = None
+    uploaded_file = None
     
     try:
         # 1. 오디오 파일을 경량 MP3로 변환
@@ -155,8 +185,13 @@ def process_audio_file(input_file_path: str) -> str:
         raise
     
     finally:
+        # Gemini에 업로드된 파일 삭제 (개인정보 보호)
+        if uploaded_file is not None:
+            delete_remote_file(uploaded_file)
+        
         # 처리 완료 후 변환된 MP3 파일 삭제 (개인정보 보호)
-        if mp3_file_path and os.path.exists(mp3_file_path):
+        # 변환을 생략한 경우 원본 파일은 삭제하지 않습니다
+        if mp3_file_path and mp3_file_path != input_file_path and os.path.exists(mp3_file_path):
             try:
                 os.remove(mp3_file_path)
                 print(f"임시 파일 삭제 완료: {mp3_file_path}")
@@ -164,9 +199,212 @@ def process_audio_file(input_file_path: str) -> str:
                 print(f"임시 파일 삭제 실패: {e}")
 
 
-def main():
+def find_audio_files(inputs: List[str]) -> List[Tuple[Path, Path]]:
     """
-    메인 함수
+    파일, 폴더, glob 패턴으로 지정한 입력에서 처리할 오디오 파일을 찾습니다.
+    폴더는 하위 폴더까지 모두 찾습니다.
+    
+    Args:
+        inputs: 파일 경로, 폴더 경로 또는 glob 패턴 목록 (예: "archive/**/*.m4a")
+    
+    Returns:
+        (오디오 파일 경로, 기준 폴더) 목록 (경로 순으로 정렬, 중복 제거)
+        기준 폴더는 --output-dir 사용 시 하위 폴더 구조를 유지하는 데 사용됩니다.
+    """
+    found = {}
+    for pattern in inputs:
+        path = Path(pattern)
+        if path.is_dir():
+            candidates = [(file, path) for file in path.rglob('*')]
+        elif path.is_file():
+            candidates = [(path, path.parent)]
+        else:
+            candidates = [(Path(match), Path(match).parent) for match in glob.glob(pattern, recursive=True)]
+            if not candidates:
+                print(f"⚠️  일치하는 파일이 없습니다: {pattern}")
+        
+        for file, base_dir in candidates:
+            if file.is_file() and file.suffix.lower() in AUDIO_EXTENSIONS:
+                found.setdefault(file.resolve(), base_dir.resolve())
+    
+    return sorted(found.items())
+
+
+def get_output_path(audio_path: Path, base_dir: Path, output_dir: Optional[str] = None) -> Path:
+    """
+    요약본을 저장할 .txt 파일 경로를 반환합니다.
+    output_dir이 없으면 오디오 파일과 같은 폴더에 저장합니다.
+    """
+    if output_dir is None:
+        return audio_path.with_suffix('.txt')
+    return Path(output_dir).resolve() / audio_path.relative_to(base_dir).with_suffix('.txt')
+
+
+def is_up_to_date(audio_path: Path, output_path: Path) -> bool:
+    """요약본이 이미 있고 오디오 파일보다 나중에 만들어졌는지 확인합니다."""
+    return output_path.exists() and output_path.stat().st_mtime >= audio_path.stat().st_mtime
+
+
+def write_output(output_path: Path, summary: str):
+    """
+    요약본을 저장합니다.
+    임시 파일에 쓴 뒤 이름을 바꾸므로, 중단되어도 완성되지 않은 요약본이 남지 않습니다.
+    """
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    temp_path = output_path.with_name(output_path.name + '.part')
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        f.write(summary)
+    os.replace(temp_path, output_path)
+
+
+def process_batch_file(audio_path: Path, output_path: Path, stop: threading.Event) -> Optional[dict]:
+    """
+    일괄 처리에서 파일 하나를 요약하고 결과 기록을 반환합니다.
+    일일 사용량 초과 오류가 나면 stop을 설정하여 아직 시작하지 않은 파일은 처리하지 않습니다.
+    
+    Args:
+        audio_path: 오디오 파일 경로
+        output_path: 요약본 저장 경로
+        stop: 일괄 처리 중단 신호
+    
+    Returns:
+        매니페스트 기록 (중단되어 처리하지 않은 경우 None)
+    """
+    if stop.is_set():
+        return None
+    
+    start_time = time.time()
+    record = {
+        "file": str(audio_path),
+        "output": str(output_path),
+        "size_bytes": audio_path.stat().st_size
+    }
+    try:
+        summary = process_audio_file(str(audio_path))
+        write_output(output_path, summary)
+        record["status"] = "completed"
+    except Exception as e:
+        record["status"] = "failed"
+        record["error"] = str(e)
+        # 분당 한도 초과는 이 파일만 실패로 기록하고, 일일 한도 초과면 남은 파일은 시작하지 않음
+        if DAILY_QUOTA_MESSAGE in str(e):
+            stop.set()
+    record["seconds"] = round(time.time() - start_time, 2)
+    record["finished_at"] = datetime.now().isoformat(timespec='seconds')
+    return record
+
+
+def run_batch(args: argparse.Namespace) -> int:
+    """
+    여러 오디오 파일을 작업자 스레드로 동시에 요약합니다.
+    요약본이 이미 최신인 파일은 건너뛰므로, 중단된 뒤 같은 명령을 다시 실행하면 남은 파일만 이어서 처리합니다.
+    파일별 결과와 처리 시간은 매니페스트(JSONL)에 한 줄씩 추가됩니다.
+    
+    Args:
+        args: 명령행 인자
+    
+    Returns:
+        종료 코드 (모두 성공하면 0, 실패하거나 처리하지 못한 파일이 있으면 1)
+    """
+    global rate_limiter
+    
+    files = find_audio_files(args.paths)
+    pending = []
+    skipped = 0
+    for audio_path, base_dir in files:
+        output_path = get_output_path(audio_path, base_dir, args.output_dir)
+        if not args.force and is_up_to_date(audio_path, output_path):
+            skipped += 1
+        else:
+            pending.append((audio_path, output_path))
+    
+    print("=" * 70)
+    print(f"오디오 파일 {len(files)}개 (처리할 파일: {len(pending)}개, 요약본이 최신이라 건너뜀: {skipped}개)")
+    print(f"작업자 수: {args.workers}, 분당 요청 한도: {args.rpm}, 매니페스트: {args.manifest}")
+    print("=" * 70)
+    
+    if args.dry_run:
+        for audio_path, output_path in pending:
+            print(f"{audio_path} -> {output_path}")
+        return 0
+    if not pending:
+        return 0
+    
+    rate_limiter = RateLimiter(DailyUsage(), default_limits={"rpm": args.rpm, "rpd": sys.maxsize})
+    stop = threading.Event()
+    counts = {"completed": 0, "failed": 0}
+    start_time = time.time()
+    
+    with open(args.manifest, 'a', encoding='utf-8') as manifest, \
+            ThreadPoolExecutor(max_workers=args.workers, thread_name_prefix='batch') as executor:
+        futures = [
+            executor.submit(process_batch_file, audio_path, output_path, stop)
+            for audio_path, output_path in pending
+        ]
+        
+        # 중단 후 다시 모을 때 이미 기록한 파일이 또 나오지 않도록 처리한 작업을 기억
+        handled = set()
+        
+        def collect():
+            for future in as_completed([future for future in futures if future not in handled]):
+                handled.add(future)
+                record = future.result()
+                if record is None:
+                    continue
+                counts[record["status"]] += 1
+                # 중단되어도 이미 끝난 파일의 기록이 남도록 한 줄씩 바로 기록
+                manifest.write(json.dumps(record, ensure_ascii=False) + "\n")
+                manifest.flush()
+                done = counts["completed"] + counts["failed"]
+                mark = "✅" if record["status"] == "completed" else "❌"
+                detail = f"{record['seconds']:.1f}초" if record["status"] == "completed" else record["error"]
+                print(f"{mark} [{done}/{len(pending)}] {record['file']} ({detail})")
+        
+        try:
+            collect()
+        except KeyboardInterrupt:
+            # 진행 중인 파일만 마무리하고 종료 (다시 실행하면 남은 파일부터 처리)
+            stop.set()
+            print("\n⏹  중단 요청 - 진행 중인 파일만 마무리합니다...")
+            collect()
+    
+    not_started = len(pending) - counts["completed"] - counts["failed"]
+    print("=" * 70)
+    print(
+        f"완료: {counts['completed']}개, 실패: {counts['failed']}개, 처리하지 않음: {not_started}개 "
+        f"({time.time() - start_time:.1f}초)"
+    )
+    if not_started:
+        print("💡 같은 명령을 다시 실행하면 남은 파일부터 이어서 처리합니다.")
+    print("=" * 70)
+    return 0 if counts["failed"] == 0 and not_started == 0 else 1
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    """명령행 인자를 해석합니다."""
+    parser = argparse.ArgumentParser(
+        description="오디오 파일을 Gemini로 요약하여 .txt 파일로 저장합니다. 경로 없이 실행하면 파일 경로를 직접 입력받습니다."
+    )
+    parser.add_argument('paths', nargs='*', help="오디오 파일, 폴더 또는 glob 패턴 (예: 'archive/**/*.m4a')")
+    parser.add_argument('-w', '--workers', type=int, default=DEFAULT_WORKERS,
+                        help=f"동시에 처리할 파일 수 (기본값: {DEFAULT_WORKERS})")
+    parser.add_argument('--rpm', type=int, default=DEFAULT_RPM,
+                        help=f"Gemini 분당 요청 한도 (기본값: {DEFAULT_RPM})")
+    parser.add_argument('-o', '--output-dir',
+                        help="요약본을 저장할 폴더 (기본값: 오디오 파일과 같은 폴더, 폴더 입력은 하위 구조 유지)")
+    parser.add_argument('-m', '--manifest', default=DEFAULT_MANIFEST,
+                        help=f"파일별 결과를 기록할 JSONL 파일 (기본값: {DEFAULT_MANIFEST})")
+    parser.add_argument('-f', '--force', action='store_true', help="요약본이 최신이어도 다시 처리")
+    parser.add_argument('--dry-run', action='store_true', help="처리할 파일 목록만 출력")
+    args = parser.parse_args(argv)
+    if args.workers < 1 or args.rpm < 1:
+        parser.error("--workers와 --rpm은 1 이상이어야 합니다.")
+    return args
+
+
+def interactive_main():
+    """
+    오디오 파일 경로를 입력받아 하나의 파일을 처리합니다.
     """
     print("=" * 70)
     print("AI 회의록 요약 서비스 (Powered by Gemini 1.5 Flash)")
@@ -215,5 +453,16 @@ def main():
         print("   3. 일일 사용량 제한(1,500회)에 도달하지 않았는지")
 
 
+def main():
+    """
+    메인 함수
+    """
+    args = parse_args()
+    if not args.paths:
+        interactive_main()
+        return
+    sys.exit(run_batch(args))
+
+
 if __name__ == "__main__":
     main()
@@ -0,0 +1,366 @@
+import os
+import json
+import math
+import time
+import bisect
+import logging
+import threading
+from contextlib import contextmanager
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from tracing import span
+
+
+# 처리 단계 (Gemini 호출 단계 이름은 resilience.STAGE_*와 같음)
+STAGE_RECEIVE = "receive"  # 업로드 파일 수신 (디스크 저장)
+STAGE_CONVERT = "convert"  # 오디오 변환
+STAGE_UPLOAD = "upload"  # Gemini 파일 업로드
+STAGE_TRANSCRIBE = "transcribe"  # 텍스트 변환 (Gemini 호출 단위)
+STAGE_SUMMARIZE = "summarize"  # 요약 (Gemini 호출 단위)
+STAGE_CLEANUP = "cleanup"  # 임시 파일/업로드 파일 정리
+
+# 히스토그램 구간
+LATENCY_BUCKETS = (0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600)
+SIZE_BUCKETS = (64 * 1024, 256 * 1024, 1024 ** 2, 4 * 1024 ** 2, 16 * 1024 ** 2, 64 * 1024 ** 2, 256 * 1024 ** 2)
+DURATION_BUCKETS = (30, 60, 300, 600, 1200, 1800, 3600, 7200)
+
+# Prometheus 텍스트 형식 Content-Type
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _escape(value: str) -> str:
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(f'{extra[0]}="{extra[1]}"')
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class Metric:
+    """
+    지표의 공통 기능입니다. 레이블 값 조합별로 값을 따로 보관하며,
+    생성 시 기본 레지스트리에 등록되어 /metrics 응답에 포함됩니다.
+    """
+
+    type_name = "untyped"
+    # 여러 워커 프로세스의 값을 합치는 방식 (sum: 합계, mean: 평균, max: 최댓값)
+    multiprocess_mode = "sum"
+
+    def __init__(self, name: str, documentation: str, label_names: Sequence[str] = (), registry=None):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(label_names)
+        self._values = {}
+        self._lock = threading.Lock()
+        (registry if registry is not None else REGISTRY).register(self)
+
+    def _key(self, labels: dict) -> tuple:
+        if set(labels) != set(self.label_names):
+            raise ValueError(f"{self.name} 지표의 레이블은 {self.label_names}이어야 합니다: {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.label_names)
+
+    def render(self, values: Optional[dict] = None) -> List[str]:
+        """
+        Args:
+            values: 출력할 값 (기본값: 이 프로세스의 값, 여러 워커의 값을 합쳐 출력할 때 지정)
+        """
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type_name}"]
+        if values is None:
+            with self._lock:
+                values = dict(self._values)
+        for key, value in sorted(values.items()):
+            lines.extend(self._render_value(key, value))
+        return lines
+
+    def snapshot(self) -> list:
+        """현재 값을 JSON으로 저장할 수 있는 [[레이블 값 목록, 값], ...] 형식으로 반환합니다."""
+        with self._lock:
+            return [[list(key), json.loads(json.dumps(value))] for key, value in self._values.items()]
+
+    def _add_values(self, current, value):
+        return value if current is None else current + value
+
+    def merge(self, snapshots: List[list]) -> dict:
+        """여러 프로세스의 snapshot을 multiprocess_mode에 따라 합칩니다."""
+        if self.multiprocess_mode == "max":
+            return self._max_values(snapshots)
+        merged = {}
+        counts = {}
+        for snapshot in snapshots:
+            for key, value in snapshot:
+                key = tuple(key)
+                merged[key] = self._add_values(merged.get(key), value)
+                counts[key] = counts.get(key, 0) + 1
+        if self.multiprocess_mode == "mean":
+            return {key: value / counts[key] for key, value in merged.items()}
+        return merged
+
+    def _max_values(self, snapshots: List[list]) -> dict:
+        merged = {}
+        for snapshot in snapshots:
+            for key, value in snapshot:
+                key = tuple(key)
+                merged[key] = max(merged.get(key, value), value)
+        return merged
+
+    def _render_value(self, key: tuple, value) -> List[str]:
+        return [f"{self.name}{_format_labels(self.label_names, key)} {_format_value(value)}"]
+
+
+class Counter(Metric):
+    """계속 증가하는 값 (요청 수, 오류 수 등)"""
+
+    type_name = "counter"
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def set_total(self, value: float, **labels):
+        """다른 곳에서 집계한 누적 값을 그대로 반영합니다 (수집 시점에 사용)."""
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+
+class Gauge(Metric):
+    """현재 상태 값 (처리 중인 요청 수, 대기열 길이 등)"""
+
+    type_name = "gauge"
+
+    def __init__(self, name: str, documentation: str, label_names: Sequence[str] = (), registry=None,
+                 multiprocess_mode: str = "sum"):
+        super().__init__(name, documentation, label_names, registry)
+        self.multiprocess_mode = multiprocess_mode
+
+    def set(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount: float = 1, **labels):
+        self.inc(-amount, **labels)
+
+
+class Histogram(Metric):
+    """
+    값의 분포 (처리 시간, 파일 크기 등)
+    관측값을 정해진 구간별로 세므로, 관측 수와 관계없이 메모리 사용량이 일정합니다.
+    """
+
+    type_name = "histogram"
+
+    def __init__(self, name: str, documentation: str, label_names: Sequence[str] = (),
+                 buckets: Sequence[float] = LATENCY_BUCKETS, registry=None):
+        super().__init__(name, documentation, label_names, registry)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                # 구간별 개수 (마지막은 +Inf), 합계
+                state = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0]
+            state[0][index] += 1
+            state[1] += value
+
+    def _add_values(self, current, value):
+        if current is None:
+            return [list(value[0]), value[1]]
+        return [[a + b for a, b in zip(current[0], value[0])], current[1] + value[1]]
+
+    def _render_value(self, key: tuple, value) -> List[str]:
+        counts, total = value[0][:], value[1]
+        lines = []
+        cumulative = 0
+        for bound, count in zip(self.buckets + (math.inf,), counts):
+            cumulative += count
+            labels = _format_labels(self.label_names, key, ("le", _format_value(bound)))
+            lines.append(f"{self.name}_bucket{labels} {cumulative}")
+        labels = _format_labels(self.label_names, key)
+        lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+        lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+class Registry:
+    """지표 목록을 보관하고 Prometheus 텍스트 형식으로 출력합니다."""
+
+    def __init__(self):
+        self._metrics = []
+        self._lock = threading.Lock()
+
+    def register(self, metric: Metric):
+        with self._lock:
+            self._metrics.append(metric)
+
+    def render(self, merged: Optional[Dict[str, dict]] = None) -> str:
+        """
+        Args:
+            merged: 지표 이름별로 합친 값 (MultiProcessCollector.collect 결과, 없으면 이 프로세스의 값)
+        """
+        with self._lock:
+            metrics = list(self._metrics)
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render(merged.get(metric.name, {}) if merged is not None else None))
+        return "\n".join(lines) + "\n"
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            metrics = list(self._metrics)
+        return {metric.name: metric.snapshot() for metric in metrics}
+
+    def metrics(self) -> list:
+        with self._lock:
+            return list(self._metrics)
+
+
+class MultiProcessCollector:
+    """
+    여러 워커 프로세스의 지표를 합칩니다.
+    워커마다 자기 지표를 디렉토리에 <pid>.json으로 주기적으로 저장하고,
+    /metrics 요청을 받은 워커가 모든 파일을 읽어 합친 값을 출력합니다.
+    종료된 프로세스의 파일은 읽을 때 삭제합니다.
+    """
+
+    def __init__(self, directory: str, registry: Registry = None):
+        self.directory = directory
+        self.registry = registry if registry is not None else REGISTRY
+        os.makedirs(directory, exist_ok=True)
+        self.path = os.path.join(directory, f"{os.getpid()}.json")
+
+    def write(self):
+        """이 프로세스의 지표를 파일에 저장합니다."""
+        temp_path = f"{self.path}.tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.registry.snapshot(), f)
+        os.replace(temp_path, self.path)
+
+    def remove(self):
+        """이 프로세스의 지표 파일을 삭제합니다 (워커 종료 시)."""
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+
+    def _read_snapshots(self) -> List[dict]:
+        snapshots = []
+        for name in os.listdir(self.directory):
+            pid, extension = os.path.splitext(name)
+            if extension != '.json' or not pid.isdigit():
+                continue
+            path = os.path.join(self.directory, name)
+            if not _process_alive(int(pid)):
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+                continue
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    snapshots.append(json.load(f))
+            except (OSError, ValueError) as e:
+                logging.warning(f"[지표] 워커 지표 파일 읽기 실패: {name} ({e})")
+        return snapshots
+
+    def collect(self) -> Dict[str, dict]:
+        """
+        이 프로세스의 지표를 저장한 뒤, 실행 중인 모든 워커의 지표를 합칩니다.
+
+        Returns:
+            지표 이름별로 합친 값 (Registry.render에 전달)
+        """
+        self.write()
+        snapshots = self._read_snapshots()
+        return {
+            metric.name: metric.merge([snapshot.get(metric.name, []) for snapshot in snapshots])
+            for metric in self.registry.metrics()
+        }
+
+
+def _process_alive(pid: int) -> bool:
+    if pid == os.getpid():
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+# 기본 레지스트리
+REGISTRY = Registry()
+
+# 단계별 처리 시간
+STAGE_SECONDS = Histogram(
+    "audio_stage_duration_seconds", "처리 단계별 소요 시간 (Gemini 단계는 재시도 포함 호출 단위)", ["stage"]
+)
+STAGE_FAILURES = Counter("audio_stage_failures_total", "처리 단계별 실패 수", ["stage"])
+
+# 크기/길이 분포
+INPUT_BYTES = Histogram("audio_input_bytes", "업로드된 원본 파일 크기 (바이트)", buckets=SIZE_BUCKETS)
+CONVERTED_BYTES = Histogram("audio_converted_bytes", "변환 후 Gemini에 보내는 파일 크기 (바이트)", buckets=SIZE_BUCKETS)
+AUDIO_DURATION = Histogram("audio_duration_seconds", "처리한 오디오 길이 (초)", buckets=DURATION_BUCKETS)
+
+# 요청 결과
+REQUESTS = Counter("audio_requests_total", "처리 요청 수 (엔드포인트, 결과별)", ["endpoint", "outcome"])
+ERRORS = Counter("audio_errors_total", "처리 실패 수 (오류 종류별)", ["type"])
+
+# 상태 (수집 시점에 갱신)
+QUEUE_RUNNING = Gauge("audio_queue_running", "처리 중인 요청 수")
+QUEUE_WAITING = Gauge("audio_queue_waiting", "처리 순서를 기다리는 요청 수")
+# 여러 워커가 SQLite 작업 저장소를 공유하면 워커마다 같은 전체 값을 보고하므로 최댓값 사용
+JOBS_ACTIVE = Gauge("audio_jobs_active", "진행 중인 비동기 작업 수", multiprocess_mode="max")
+MODEL_IN_FLIGHT = Gauge("audio_model_in_flight", "모델별 처리 중인 요청 수", ["model"])
+CACHE_LOOKUPS = Counter("audio_cache_lookups_total", "결과 캐시 조회 수", ["result"])
+CACHE_HIT_RATIO = Gauge("audio_cache_hit_ratio", "결과 캐시 적중률", multiprocess_mode="mean")
+
+# 서버 시작 단계별 소요 시간 (import: 모듈 불러오기, startup: lifespan 시작, gemini_client: Gemini 클라이언트 준비)
+# 워커가 여러 개이면 가장 느린 워커 기준
+STARTUP_SECONDS = Gauge("audio_startup_seconds", "서버 시작 단계별 소요 시간 (초)", ["phase"], multiprocess_mode="max")
+
+# 오디오 전처리 (audio.preprocess, 전후 합계의 차이가 줄인 양)
+PREPROCESS_SECONDS = Counter("audio_preprocess_seconds_total", "전처리 전후 오디오 길이 합계 (초)", ["phase"])
+PREPROCESS_BYTES = Counter("audio_preprocess_bytes_total", "전처리 전후 파일 크기 합계 (바이트)", ["phase"])
+
+
+@contextmanager
+def track_stage(stage: str):
+    """
+    처리 단계의 소요 시간을 기록하고, 예외가 발생하면 단계별 실패 수를 늘립니다.
+    요청 추적이 켜져 있으면 같은 구간을 span으로도 기록합니다.
+
+    Args:
+        stage: 처리 단계 (STAGE_*)
+    """
+    start = time.perf_counter()
+    try:
+        with span(stage):
+            yield
+    except Exception:
+        STAGE_FAILURES.inc(stage=stage)
+        raise
+    finally:
+        STAGE_SECONDS.observe(time.perf_counter() - start, stage=stage)
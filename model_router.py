@@ -0,0 +1,255 @@
+import time
+import logging
+import threading
+import contextvars
+from contextlib import contextmanager
+from typing import List, Optional, Set
+
+from quota import PRIORITY_HIGH, PRIORITY_NORMAL, PRIORITY_LOW, QuotaExceededError
+
+
+# 설정 파일의 우선순위 이름
+PRIORITY_NAMES = {"high": PRIORITY_HIGH, "normal": PRIORITY_NORMAL, "low": PRIORITY_LOW}
+
+# 분당 한도 때문에 이 시간(초) 이상 기다려야 하면 다른 모델을 먼저 고려
+DEFAULT_MAX_WAIT_SECONDS = 30
+
+
+class ModelAssignment:
+    """요청 하나가 지금 사용 중인 모델 (처리 중 대체 모델로 넘어가면 ModelRouter.switch로 옮김)"""
+
+    def __init__(self, model_name: str):
+        self.model_name = model_name
+        self.started = time.perf_counter()
+
+
+# 현재 요청의 모델 배정 (track에서 지정, 스레드로 복사된 컨텍스트에서도 같은 객체를 가리킴)
+current_assignment = contextvars.ContextVar("model_assignment", default=None)
+
+
+class ModelProfile:
+    """
+    모델 하나의 배정 조건입니다.
+    오디오 길이, 요청 우선순위 조건이 맞으면 이 모델을 우선 사용하고,
+    fallback이 켜져 있으면 다른 모델이 한도 초과/혼잡할 때 대신 사용할 수 있습니다.
+    """
+
+    def __init__(self, profile: dict):
+        self.name = profile['name']
+        self.min_duration = profile.get('min_duration_seconds', 0)
+        self.max_duration = profile.get('max_duration_seconds')
+        self.priorities = {PRIORITY_NAMES[name] for name in profile.get('priorities', PRIORITY_NAMES)}
+        self.max_concurrent = profile.get('max_concurrent')
+        self.max_wait = profile.get('max_wait_seconds', DEFAULT_MAX_WAIT_SECONDS)
+        self.fallback = profile.get('fallback', True)
+
+    def matches(self, duration: float, priority: int) -> bool:
+        """오디오 길이와 우선순위가 이 모델의 배정 조건에 맞는지 확인합니다."""
+        if duration < self.min_duration:
+            return False
+        if self.max_duration is not None and duration > self.max_duration:
+            return False
+        return priority in self.priorities
+
+
+class ModelRouter:
+    """
+    요청마다 오디오 길이, 우선순위, 모델별 처리 중인 요청 수와 남은 한도를 보고 사용할 모델을 고릅니다.
+    조건에 맞는 모델을 설정 순서대로 우선 사용하고, 한도가 없거나 혼잡하면 다른 모델로 넘깁니다.
+    """
+
+    def __init__(self, profiles: List[ModelProfile], rate_limiter=None):
+        self.profiles = profiles
+        self.rate_limiter = rate_limiter
+        self._lock = threading.Lock()
+        self._stats = {
+            profile.name: {"requests": 0, "in_flight": 0, "fallbacks": 0, "failures": 0, "total_seconds": 0.0}
+            for profile in profiles
+        }
+
+    @property
+    def default_model(self) -> str:
+        return self.profiles[0].name
+
+    @property
+    def uses_duration(self) -> bool:
+        """오디오 길이에 따라 모델을 고르는지 여부 (길이 측정이 필요한지)"""
+        return any(profile.min_duration or profile.max_duration is not None for profile in self.profiles)
+
+    def model_names(self) -> List[str]:
+        return [profile.name for profile in self.profiles]
+
+    def _has_budget(self, model_name: str, calls: int) -> bool:
+        return self.rate_limiter is None or self.rate_limiter.remaining_today(model_name) >= calls
+
+    def _load(self, profile: ModelProfile) -> tuple:
+        """(혼잡 여부, 예상 대기 시간) - 대기 시간은 분당 한도 대기와 처리 중인 요청 비율로 계산"""
+        with self._lock:
+            in_flight = self._stats[profile.name]["in_flight"]
+        wait = self.rate_limiter.estimated_wait(profile.name) if self.rate_limiter else 0.0
+        busy = wait > profile.max_wait or (
+            profile.max_concurrent is not None and in_flight >= profile.max_concurrent
+        )
+        load = in_flight / profile.max_concurrent if profile.max_concurrent else 0.0
+        return busy, (wait, load)
+
+    def _candidates(self, duration: float, priority: int) -> List[ModelProfile]:
+        preferred = [profile for profile in self.profiles if profile.matches(duration, priority)]
+        fallbacks = [profile for profile in self.profiles if profile.fallback and profile not in preferred]
+        # 조건에 맞는 모델이 하나도 없으면 설정 순서대로 모든 모델 사용
+        return preferred + fallbacks or list(self.profiles)
+
+    def route(self, duration: float, priority: int, calls: int = 1) -> str:
+        """
+        요청에 사용할 모델을 고릅니다.
+
+        Args:
+            duration: 오디오 길이 (초, 모르면 0)
+            priority: 요청 우선순위
+            calls: 요청 처리에 필요한 예상 호출 수
+
+        Returns:
+            모델 이름
+
+        Raises:
+            QuotaExceededError: 사용할 수 있는 모든 모델의 일일 한도가 부족한 경우
+        """
+        ordered = self._candidates(duration, priority)
+        candidates = [profile for profile in ordered if self._has_budget(profile.name, calls)]
+        if not candidates:
+            raise QuotaExceededError(self.rate_limiter.seconds_until_reset())
+
+        loads = [(profile, *self._load(profile)) for profile in candidates]
+        chosen = next((profile for profile, busy, _ in loads if not busy), None)
+        if chosen is None:
+            # 모두 혼잡하면 예상 대기 시간이 가장 짧은 모델
+            chosen = min(loads, key=lambda item: item[2])[0]
+
+        preferred = ordered[0]
+        if chosen is not preferred:
+            self._record_fallback(preferred.name)
+            logging.info(f"[모델] {preferred.name} 대신 {chosen.name} 사용 (한도 부족 또는 혼잡)")
+        return chosen.name
+
+    def fallback(self, model_name: str, calls: int = 1, exclude: Optional[Set[str]] = None) -> Optional[str]:
+        """
+        처리 중 model_name의 한도가 초과되었을 때 대신 사용할 모델을 고릅니다.
+
+        Args:
+            model_name: 한도가 초과된 모델
+            calls: 남은 예상 호출 수
+            exclude: 이미 시도한 모델 (다시 고르지 않아 모델 사이를 오가지 않음)
+
+        Returns:
+            다른 모델 이름 (시도하지 않은 대체 모델이 없으면 None)
+        """
+        exclude = exclude or set()
+        for profile in self.profiles:
+            if (profile.name != model_name and profile.name not in exclude and profile.fallback
+                    and self._has_budget(profile.name, calls)):
+                self._record_fallback(model_name)
+                return profile.name
+        return None
+
+    def check_admission(self, calls: int):
+        """
+        설정된 모델 중 하나라도 일일 한도가 남아 있는지 확인합니다.
+
+        Raises:
+            QuotaExceededError: 모든 모델의 일일 한도가 부족한 경우
+        """
+        if not any(self._has_budget(name, calls) for name in self.model_names()):
+            self.rate_limiter.rejected += 1
+            raise QuotaExceededError(self.rate_limiter.seconds_until_reset())
+
+    def _record_fallback(self, model_name: str):
+        with self._lock:
+            if model_name in self._stats:
+                self._stats[model_name]["fallbacks"] += 1
+
+    @contextmanager
+    def track(self, model_name: str):
+        """
+        모델에 배정된 요청의 처리 중 수, 처리 시간, 실패 수를 기록합니다.
+        처리 중 대체 모델로 넘어가면(switch) 이후 처리 중 수와 결과는 실제로 응답하는 모델에 기록합니다.
+        """
+        assignment = ModelAssignment(model_name)
+        with self._lock:
+            self._stats[model_name]["requests"] += 1
+            self._stats[model_name]["in_flight"] += 1
+        token = current_assignment.set(assignment)
+        try:
+            yield assignment
+        except Exception:
+            with self._lock:
+                self._stats[assignment.model_name]["failures"] += 1
+            raise
+        finally:
+            current_assignment.reset(token)
+            with self._lock:
+                stats = self._stats[assignment.model_name]
+                stats["in_flight"] -= 1
+                stats["total_seconds"] += time.perf_counter() - assignment.started
+
+    def switch(self, model_name: str, fallback_model: str):
+        """
+        현재 요청이 model_name에서 fallback_model로 넘어갔음을 기록합니다.
+        model_name의 처리 중 수를 줄이고 fallback_model의 요청으로 기록하여 이후 모델 선택에 반영합니다
+        (구간을 동시에 처리하다 여러 구간이 넘어가도 한 번만 옮김).
+
+        Args:
+            model_name: 한도가 초과된 모델
+            fallback_model: 대신 사용할 모델
+        """
+        assignment = current_assignment.get()
+        if assignment is None:
+            return
+        with self._lock:
+            if assignment.model_name != model_name:
+                return
+            now = time.perf_counter()
+            previous = self._stats[model_name]
+            previous["in_flight"] -= 1
+            previous["total_seconds"] += now - assignment.started
+            current = self._stats[fallback_model]
+            current["requests"] += 1
+            current["in_flight"] += 1
+            assignment.model_name = fallback_model
+            assignment.started = now
+
+    def stats(self) -> dict:
+        """모델별 요청 수, 처리 중 수, 다른 모델로 넘긴 횟수, 실패 수, 평균 처리 시간, 남은 일일 한도를 반환합니다."""
+        with self._lock:
+            snapshot = {name: dict(stats) for name, stats in self._stats.items()}
+        result = {}
+        for name, stats in snapshot.items():
+            completed = stats["requests"] - stats["in_flight"]
+            result[name] = {
+                "requests": stats["requests"],
+                "in_flight": stats["in_flight"],
+                "fallbacks": stats["fallbacks"],
+                "failures": stats["failures"],
+                "avg_seconds": round(stats["total_seconds"] / completed, 3) if completed else 0.0
+            }
+            if self.rate_limiter:
+                result[name]["remaining_today"] = self.rate_limiter.remaining_today(name)
+        return result
+
+
+def create_model_router(gemini_config: dict, rate_limiter=None) -> ModelRouter:
+    """
+    설정에 따라 모델 선택기를 생성합니다.
+    gemini.models가 없으면 gemini.model 하나만 사용합니다.
+
+    Args:
+        gemini_config: config.yaml의 gemini 섹션
+        rate_limiter: 모델별 남은 한도 확인용 RateLimiter (선택)
+
+    Returns:
+        ModelRouter
+    """
+    profiles = gemini_config.get('models') or [{'name': gemini_config.get('model', 'gemini-1.5-flash-latest')}]
+    router = ModelRouter([ModelProfile(profile) for profile in profiles], rate_limiter)
+    if len(profiles) > 1:
+        logging.info(f"[모델] 모델 선택 사용: {', '.join(router.model_names())}")
+    return router
@@ -0,0 +1,407 @@
+import os
+import time
+import heapq
+import sqlite3
+import logging
+import itertools
+import threading
+import contextvars
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Optional
+
+
+# 요청 우선순위 (값이 작을수록 먼저 처리)
+PRIORITY_HIGH = 0  # 사용자가 응답을 기다리는 요청 (/summarize, /summarize/stream)
+PRIORITY_NORMAL = 1  # 비동기 작업 (/jobs)
+PRIORITY_LOW = 2  # 일괄 처리 등 급하지 않은 요청
+
+# 현재 요청의 우선순위 (엔드포인트에서 지정, Gemini 호출 시 참조)
+request_priority = contextvars.ContextVar("request_priority", default=PRIORITY_NORMAL)
+
+# 모델별 한도가 설정되지 않았을 때 사용할 기본값 (Gemini 1.5 Flash 무료 등급)
+DEFAULT_LIMITS = {"rpm": 15, "rpd": 1500}
+
+
+class QuotaExceededError(Exception):
+    """일일 요청 한도를 모두 사용했을 때 발생하는 예외"""
+
+    def __init__(self, retry_after: int):
+        super().__init__("일일 사용량이 초과되었습니다. 내일 다시 시도해주세요.")
+        self.retry_after = retry_after
+
+
+class TokenBucket:
+    """
+    분당 요청 수 제한용 토큰 버킷입니다.
+    최대 rpm개까지 한 번에 사용할 수 있고, 초당 rpm/60개씩 다시 채워집니다.
+    """
+
+    def __init__(self, rpm: int):
+        self.capacity = rpm
+        self.rate = rpm / 60.0
+        self.tokens = float(rpm)
+        self.updated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    def available(self) -> float:
+        """지금 사용할 수 있는 토큰 수"""
+        with self._lock:
+            self._refill()
+            return self.tokens
+
+    def try_take(self) -> float:
+        """
+        토큰이 있으면 하나 사용합니다.
+
+        Returns:
+            0 (토큰을 사용한 경우) 또는 토큰 하나를 사용할 수 있을 때까지 남은 시간 (초)
+        """
+        with self._lock:
+            self._refill()
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return 0.0
+            return (1 - self.tokens) / self.rate
+
+
+class SQLiteTokenBucket(TokenBucket):
+    """
+    SQLite 파일에 남은 토큰 수를 저장하는 토큰 버킷입니다.
+    같은 파일을 쓰는 여러 워커 프로세스가 분당 한도 하나를 함께 사용합니다.
+    """
+
+    def __init__(self, connect: Callable[[], sqlite3.Connection], model_name: str, rpm: int):
+        super().__init__(rpm)
+        self._connect = connect
+        self.model_name = model_name
+
+    def _load(self, conn: sqlite3.Connection, now: float) -> float:
+        row = conn.execute(
+            "SELECT tokens, updated_at FROM quota_buckets WHERE model = ?", (self.model_name,)
+        ).fetchone()
+        if row is None:
+            return float(self.capacity)
+        tokens, updated_at = row
+        return min(self.capacity, tokens + max(0.0, now - updated_at) * self.rate)
+
+    def available(self) -> float:
+        return self._load(self._connect(), time.time())
+
+    def try_take(self) -> float:
+        # 다른 스레드/프로세스가 같은 토큰을 동시에 사용하지 않도록 쓰기 잠금을 잡은 뒤 읽고 갱신
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            now = time.time()
+            tokens = self._load(conn, now)
+            wait = 0.0
+            if tokens >= 1:
+                tokens -= 1
+            else:
+                wait = (1 - tokens) / self.rate
+            conn.execute(
+                "INSERT INTO quota_buckets (model, tokens, updated_at) VALUES (?, ?, ?) "
+                "ON CONFLICT (model) DO UPDATE SET tokens = excluded.tokens, updated_at = excluded.updated_at",
+                (self.model_name, tokens, now)
+            )
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        return wait
+
+
+class DailyUsage:
+    """
+    메모리 기반 모델별 일일 요청 수 저장소입니다.
+    하루의 기준은 reset_hour_utc 시각(UTC)이며, 그 시각에 사용량이 초기화됩니다.
+    """
+
+    def __init__(self, reset_hour_utc: int = 8):
+        self.reset_hour_utc = reset_hour_utc
+        self._counts = {}
+        self._lock = threading.Lock()
+
+    def today(self) -> str:
+        """현재 사용량을 집계하는 날짜 (YYYY-MM-DD)"""
+        shifted = datetime.now(timezone.utc) - timedelta(hours=self.reset_hour_utc)
+        return shifted.date().isoformat()
+
+    def seconds_until_reset(self) -> int:
+        """다음 사용량 초기화까지 남은 시간 (초)"""
+        now = datetime.now(timezone.utc)
+        reset = now.replace(hour=self.reset_hour_utc, minute=0, second=0, microsecond=0)
+        if reset <= now:
+            reset += timedelta(days=1)
+        return int((reset - now).total_seconds()) + 1
+
+    def get(self, model_name: str) -> int:
+        return self._counts.get((model_name, self.today()), 0)
+
+    def increment(self, model_name: str):
+        key = (model_name, self.today())
+        with self._lock:
+            self._counts[key] = self._counts.get(key, 0) + 1
+
+    def try_increment(self, model_name: str, limit: int) -> bool:
+        """
+        사용량이 limit보다 적을 때만 1 늘립니다.
+
+        Returns:
+            사용량을 늘렸으면 True, 이미 한도에 도달했으면 False
+        """
+        key = (model_name, self.today())
+        with self._lock:
+            if self._counts.get(key, 0) >= limit:
+                return False
+            self._counts[key] = self._counts.get(key, 0) + 1
+        return True
+
+    def create_bucket(self, model_name: str, rpm: int) -> TokenBucket:
+        """모델의 분당 한도용 토큰 버킷을 생성합니다."""
+        return TokenBucket(rpm)
+
+
+class SQLiteDailyUsage(DailyUsage):
+    """
+    SQLite 기반 모델별 일일 요청 수 저장소입니다.
+    서버가 재시작되어도 그날 사용한 요청 수가 유지되며,
+    분당 한도의 토큰도 같은 파일에 저장하므로 여러 워커 프로세스가 한도를 함께 사용합니다.
+    스레드마다 연결을 따로 사용하므로, 한 스레드가 쓰기 잠금을 기다리는 동안에도
+    다른 스레드는 사용량을 읽을 수 있습니다 (스레드 사이의 원자성도 SQLite 잠금으로 보장).
+    """
+
+    def __init__(self, db_path: str, reset_hour_utc: int = 8):
+        super().__init__(reset_hour_utc)
+        db_dir = os.path.dirname(db_path)
+        if db_dir:
+            os.makedirs(db_dir, exist_ok=True)
+        self.db_path = db_path
+        self._local = threading.local()
+        conn = self._connect()
+        with conn:
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS quota_usage (
+                    model TEXT NOT NULL,
+                    day TEXT NOT NULL,
+                    count INTEGER NOT NULL,
+                    PRIMARY KEY (model, day)
+                )
+                """
+            )
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS quota_buckets (
+                    model TEXT PRIMARY KEY,
+                    tokens REAL NOT NULL,
+                    updated_at REAL NOT NULL
+                )
+                """
+            )
+            # 지난 날짜의 사용량은 더 이상 필요 없으므로 삭제
+            conn.execute("DELETE FROM quota_usage WHERE day < ?", (self.today(),))
+        logging.info(f"[할당량] SQLite 사용량 저장소 사용: {db_path}")
+
+    def _connect(self) -> sqlite3.Connection:
+        """현재 스레드의 연결을 반환합니다 (처음 사용하는 스레드이면 새로 연결)."""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            # 다른 연결/워커가 쓰는 동안에는 잠금이 풀릴 때까지 기다림
+            conn = sqlite3.connect(self.db_path, timeout=30, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, model_name: str) -> int:
+        row = self._connect().execute(
+            "SELECT count FROM quota_usage WHERE model = ? AND day = ?",
+            (model_name, self.today())
+        ).fetchone()
+        return row[0] if row else 0
+
+    def increment(self, model_name: str):
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT INTO quota_usage (model, day, count) VALUES (?, ?, 1) "
+                "ON CONFLICT (model, day) DO UPDATE SET count = count + 1",
+                (model_name, self.today())
+            )
+
+    def try_increment(self, model_name: str, limit: int) -> bool:
+        # 확인과 증가를 한 문장으로 처리하여 여러 스레드/프로세스가 동시에 마지막 한도를 사용하지 않도록 함
+        with self._connect() as conn:
+            cursor = conn.execute(
+                "INSERT INTO quota_usage (model, day, count) VALUES (?, ?, 1) "
+                "ON CONFLICT (model, day) DO UPDATE SET count = count + 1 WHERE count < ?",
+                (model_name, self.today(), limit)
+            )
+        return cursor.rowcount > 0
+
+    def create_bucket(self, model_name: str, rpm: int) -> TokenBucket:
+        return SQLiteTokenBucket(self._connect, model_name, rpm)
+
+
+class RateLimiter:
+    """
+    Gemini API 호출 전 모델별 분당(rpm)/일일(rpd) 요청 한도를 지키도록 순서를 조절합니다.
+    한도를 기다리는 호출은 우선순위, 도착 순서대로 처리하며, 일일 한도를 모두 쓰면
+    호출하지 않고 QuotaExceededError를 발생시킵니다.
+    SQLite 사용량 저장소를 쓰면 한도는 여러 워커 프로세스가 함께 사용합니다 (대기 순서는 프로세스별로 관리).
+    조건 변수(_cond)는 대기 순서와 버킷 목록만 보호하고, 사용량 저장소 읽기/쓰기는 잠금 밖에서 실행하므로
+    한 모델이 SQLite 쓰기 잠금을 기다리는 동안에도 다른 모델의 호출과 사용량 조회는 기다리지 않습니다.
+    """
+
+    def __init__(self, usage: DailyUsage, model_limits: Optional[dict] = None,
+                 default_limits: Optional[dict] = None):
+        self.usage = usage
+        self.model_limits = model_limits or {}
+        self.default_limits = dict(DEFAULT_LIMITS, **(default_limits or {}))
+        self._cond = threading.Condition()
+        self._buckets = {}
+        self._waiters = {}
+        self._sequence = itertools.count()
+        self.rejected = 0
+
+    def limits(self, model_name: str) -> dict:
+        """모델의 분당/일일 한도"""
+        return dict(self.default_limits, **self.model_limits.get(model_name, {}))
+
+    def _bucket(self, model_name: str) -> TokenBucket:
+        with self._cond:
+            bucket = self._buckets.get(model_name)
+            if bucket is None:
+                bucket = self._buckets[model_name] = self.usage.create_bucket(
+                    model_name, self.limits(model_name)["rpm"]
+                )
+            return bucket
+
+    def _reject(self) -> QuotaExceededError:
+        """거절 횟수를 세고 발생시킬 예외를 반환합니다."""
+        with self._cond:
+            self.rejected += 1
+        return QuotaExceededError(self.usage.seconds_until_reset())
+
+    def check_admission(self, model_name: str, calls: int = 1):
+        """
+        요청을 받기 전에 일일 한도가 남아 있는지 확인합니다.
+        변환/업로드를 하기 전에 거절하여 결국 실패할 요청에 자원을 쓰지 않도록 합니다.
+
+        Args:
+            model_name: Gemini 모델 이름
+            calls: 요청 처리에 필요한 예상 호출 수
+
+        Raises:
+            QuotaExceededError: 남은 일일 한도가 calls보다 적은 경우
+        """
+        if self.usage.get(model_name) + calls > self.limits(model_name)["rpd"]:
+            raise self._reject()
+
+    def remaining_today(self, model_name: str) -> int:
+        """모델의 남은 일일 요청 수"""
+        return max(0, self.limits(model_name)["rpd"] - self.usage.get(model_name))
+
+    def seconds_until_reset(self) -> int:
+        """다음 일일 사용량 초기화까지 남은 시간 (초)"""
+        return self.usage.seconds_until_reset()
+
+    def estimated_wait(self, model_name: str) -> float:
+        """지금 호출하면 분당 한도 때문에 기다려야 할 예상 시간 (초, 대기 중인 호출 포함)"""
+        bucket = self._bucket(model_name)
+        with self._cond:
+            waiting = len(self._waiters.get(model_name, []))
+        shortage = waiting + 1 - bucket.available()
+        return max(0.0, shortage / bucket.rate)
+
+    def acquire(self, model_name: str, priority: Optional[int] = None):
+        """
+        호출 한 번에 대한 허가를 받습니다. 분당 한도에 걸리면 토큰이 채워질 때까지 기다립니다.
+        스레드에서 호출하며, 같은 모델을 기다리는 호출 중 우선순위가 가장 높은 것부터 허가합니다.
+
+        Args:
+            model_name: Gemini 모델 이름
+            priority: 우선순위 (기본값: 현재 요청의 request_priority)
+
+        Raises:
+            QuotaExceededError: 일일 한도를 모두 사용한 경우
+        """
+        if priority is None:
+            priority = request_priority.get()
+        ticket = (priority, next(self._sequence))
+        rpd = self.limits(model_name)["rpd"]
+        bucket = self._bucket(model_name)
+
+        with self._cond:
+            waiters = self._waiters.setdefault(model_name, [])
+            heapq.heappush(waiters, ticket)
+        try:
+            while True:
+                # 차례가 올 때까지만 조건 변수를 잡고, 사용량 저장소(SQLite) 확인은 잠금 밖에서 실행
+                with self._cond:
+                    while waiters[0] != ticket:
+                        self._cond.wait()
+                if self.usage.get(model_name) >= rpd:
+                    raise self._reject()
+                wait = bucket.try_take()
+                if wait <= 0:
+                    break
+                with self._cond:
+                    self._cond.wait(wait)
+            if not self.usage.try_increment(model_name, rpd):
+                # 다른 워커 프로세스가 먼저 남은 한도를 사용한 경우
+                raise self._reject()
+        finally:
+            with self._cond:
+                waiters.remove(ticket)
+                heapq.heapify(waiters)
+                self._cond.notify_all()
+
+    def stats(self) -> dict:
+        """모델별 사용량과 대기 중인 호출 수를 반환합니다."""
+        with self._cond:
+            models = set(self.model_limits) | set(self._buckets)
+            rejected = self.rejected
+            waiting = {model_name: len(self._waiters.get(model_name, [])) for model_name in models}
+        return {
+            "rejected": rejected,
+            "models": {
+                model_name: {
+                    "used_today": self.usage.get(model_name),
+                    "rpd": self.limits(model_name)["rpd"],
+                    "rpm": self.limits(model_name)["rpm"],
+                    "waiting": waiting[model_name]
+                }
+                for model_name in sorted(models)
+            }
+        }
+
+
+def create_rate_limiter(quota_config: dict) -> Optional[RateLimiter]:
+    """
+    설정에 따라 요청 한도 관리자를 생성합니다.
+
+    Args:
+        quota_config: config.yaml의 quota 섹션
+
+    Returns:
+        RateLimiter (한도 관리가 비활성화되어 있으면 None)
+    """
+    if not quota_config.get('enabled', True):
+        return None
+
+    reset_hour_utc = quota_config.get('reset_hour_utc', 8)
+    if quota_config.get('store', 'sqlite') == 'sqlite':
+        usage = SQLiteDailyUsage(quota_config.get('sqlite_path', 'data/quota.db'), reset_hour_utc)
+    else:
+        usage = DailyUsage(reset_hour_utc)
+
+    return RateLimiter(
+        usage,
+        model_limits=quota_config.get('models', {}),
+        default_limits=quota_config.get('default', {})
+    )
@@ -0,0 +1,156 @@
+import os
+import time
+import shutil
+import asyncio
+import logging
+import tempfile
+from typing import Callable, Dict, Optional, Tuple
+
+
+class ReadinessChecker:
+    """
+    서버가 요청을 처리할 준비가 되었는지 확인합니다 (/ready, 로드 밸런서 상태 확인용).
+    ffmpeg과 디렉토리 쓰기는 요청마다 확인하고, Gemini API 연결처럼 오래 걸리는 확인은
+    백그라운드에서 주기적으로 실행한 결과를 재사용합니다.
+    """
+
+    def __init__(self, writable_dirs: Dict[str, str], gemini_check: Optional[Callable[[], None]] = None,
+                 check_interval: float = 60, check_timeout: float = 10):
+        self.writable_dirs = writable_dirs
+        self.gemini_check = gemini_check
+        self.check_interval = check_interval
+        self.check_timeout = check_timeout
+        # 백그라운드에서 갱신하는 확인 결과 (확인 이름 -> 결과)
+        self._states = {}
+        if gemini_check:
+            self.add_pending("gemini", "연결 확인 전")
+
+    def add_pending(self, name: str, detail: str):
+        """아직 확인하지 않은 항목을 준비되지 않음으로 추가합니다."""
+        self._states[name] = {"ok": False, "detail": detail}
+
+    def set_state(self, name: str, ok: bool, detail: Optional[str] = None, **extra):
+        """
+        백그라운드에서 확인한 결과를 기록합니다. 상태가 바뀌면 로그를 남깁니다.
+
+        Args:
+            name: 확인 이름
+            ok: 정상 여부
+            detail: 실패 이유 등 설명 (선택)
+            extra: 함께 보여 줄 값
+        """
+        previous = self._states.get(name)
+        state = {"ok": ok, "checked_at": time.time(), **extra}
+        if detail:
+            state["detail"] = detail
+        self._states[name] = state
+        # 처음 확인한 결과가 아니면 이전에 확인한 결과와 다를 때만 기록
+        checked_before = previous is not None and "checked_at" in previous
+        if not ok and not (checked_before and not previous["ok"]):
+            logging.warning(f"[준비] {name} 확인 실패: {detail}")
+        elif ok and checked_before and not previous["ok"]:
+            logging.info(f"[준비] {name} 정상으로 돌아왔습니다.")
+
+    @staticmethod
+    def check_ffmpeg() -> dict:
+        """오디오 변환에 필요한 ffmpeg 실행 파일이 있는지 확인합니다."""
+        path = shutil.which('ffmpeg')
+        if path is None:
+            return {"ok": False, "detail": "ffmpeg을 찾을 수 없습니다 (PATH 확인)"}
+        return {"ok": True, "path": path}
+
+    @staticmethod
+    def check_writable(directory: str) -> dict:
+        """
+        디렉토리에 실제로 파일을 만들고 써 봅니다 (권한, 읽기 전용 마운트, 디스크 가득 참 확인).
+
+        Args:
+            directory: 확인할 디렉토리
+
+        Returns:
+            확인 결과
+        """
+        try:
+            fd, path = tempfile.mkstemp(prefix='.ready-', dir=directory)
+            try:
+                os.write(fd, b'0')
+            finally:
+                os.close(fd)
+                os.remove(path)
+        except OSError as e:
+            return {"ok": False, "path": directory, "detail": str(e)}
+        return {"ok": True, "path": directory}
+
+    def check_local(self) -> Dict[str, dict]:
+        """ffmpeg과 디렉토리 쓰기를 확인합니다 (파일을 만들므로 스레드에서 실행)."""
+        checks = {"ffmpeg": self.check_ffmpeg()}
+        for name, directory in self.writable_dirs.items():
+            checks[f"{name}_dir"] = self.check_writable(directory)
+        return checks
+
+    async def refresh_gemini(self, executor):
+        """
+        Gemini API 연결을 한 번 확인하고 결과를 기록합니다.
+
+        Args:
+            executor: 확인 함수를 실행할 스레드 풀
+        """
+        loop = asyncio.get_running_loop()
+        started = time.perf_counter()
+        try:
+            await asyncio.wait_for(loop.run_in_executor(executor, self.gemini_check), self.check_timeout)
+        except asyncio.TimeoutError:
+            self.set_state("gemini", False, f"{self.check_timeout}초 안에 응답이 없습니다")
+        except Exception as e:
+            self.set_state("gemini", False, str(e) or type(e).__name__)
+        else:
+            self.set_state("gemini", True, latency_ms=round((time.perf_counter() - started) * 1000, 1))
+
+    async def monitor_gemini(self, executor):
+        """Gemini API 연결을 check_interval마다 확인합니다 (lifespan의 백그라운드 태스크)."""
+        while True:
+            await self.refresh_gemini(executor)
+            await asyncio.sleep(self.check_interval)
+
+    async def report(self, executor) -> Tuple[bool, Dict[str, dict]]:
+        """
+        모든 확인 결과를 모읍니다.
+
+        Args:
+            executor: 디렉토리 쓰기 확인을 실행할 스레드 풀
+
+        Returns:
+            (준비 여부, 확인 이름별 결과)
+        """
+        loop = asyncio.get_running_loop()
+        checks = await loop.run_in_executor(executor, self.check_local)
+        now = time.time()
+        for name, state in self._states.items():
+            state = dict(state)
+            checked_at = state.pop("checked_at", None)
+            if checked_at is not None:
+                state["age_seconds"] = round(now - checked_at, 1)
+            checks[name] = state
+        return all(check["ok"] for check in checks.values()), checks
+
+
+def create_readiness_checker(readiness_config: dict, writable_dirs: Dict[str, str],
+                             gemini_check: Callable[[], None]) -> ReadinessChecker:
+    """
+    설정에 따라 준비 상태 확인기를 생성합니다.
+
+    Args:
+        readiness_config: config.yaml의 readiness 섹션
+        writable_dirs: 쓰기를 확인할 디렉토리 (이름 -> 경로)
+        gemini_check: Gemini API 연결 확인 함수 (실패 시 예외 발생)
+
+    Returns:
+        ReadinessChecker
+    """
+    enabled = readiness_config.get('gemini_check', True)
+    return ReadinessChecker(
+        writable_dirs,
+        gemini_check=gemini_check if enabled else None,
+        check_interval=readiness_config.get('gemini_check_interval_seconds', 60),
+        check_timeout=readiness_config.get('gemini_check_timeout_seconds', 10)
+    )
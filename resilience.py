@@ -0,0 +1,361 @@
+import time
+import random
+import logging
+import threading
+import contextvars
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from typing import Callable, Optional
+
+
+# 호출 단계
+STAGE_UPLOAD = "upload"
+STAGE_TRANSCRIBE = "transcribe"
+STAGE_SUMMARIZE = "summarize"
+
+# 단계별 기본 제한 시간 (초)
+DEFAULT_TIMEOUTS = {
+    STAGE_UPLOAD: 120,
+    STAGE_TRANSCRIBE: 600,
+    STAGE_SUMMARIZE: 180
+}
+
+# 일시적인 오류로 보고 다시 시도할 HTTP 상태 코드
+RETRYABLE_STATUS_CODES = {408, 500, 502, 503, 504}
+
+# 단계별로 보관할 최근 응답 시간 수 (백분위 계산용)
+LATENCY_WINDOW = 200
+
+# hedging 호출을 실행할 스레드 수
+CALL_WORKERS = 32
+
+# 회로 차단기 상태
+CIRCUIT_CLOSED = "closed"
+CIRCUIT_OPEN = "open"
+CIRCUIT_HALF_OPEN = "half_open"
+
+
+class StageTimeoutError(Exception):
+    """단계 제한 시간 안에 응답이 오지 않았을 때 발생하는 예외"""
+
+    def __init__(self, stage: str, timeout: float):
+        super().__init__(f"Gemini 응답 시간이 초과되었습니다 ({stage}, {timeout:g}초)")
+        self.stage = stage
+
+
+class CircuitOpenError(Exception):
+    """Gemini 오류가 계속되어 호출을 잠시 중단한 상태일 때 발생하는 예외"""
+
+    def __init__(self, retry_after: int):
+        super().__init__("Gemini 서비스에 일시적으로 연결할 수 없습니다. 잠시 후 다시 시도해주세요.")
+        self.retry_after = retry_after
+
+
+def is_retryable(error: Exception) -> bool:
+    """
+    다시 시도하면 성공할 수 있는 일시적인 오류인지 확인합니다 (시간 초과, 연결 오류, 5xx).
+    할당량 초과(429)는 다시 시도해도 실패하므로 제외합니다.
+    """
+    if isinstance(error, (StageTimeoutError, TimeoutError, ConnectionError)):
+        return True
+    # google.api_core 예외는 code, googleapiclient 예외는 resp.status에 상태 코드가 있음
+    status = getattr(error, "code", None)
+    if status is None:
+        status = getattr(getattr(error, "resp", None), "status", None)
+    try:
+        return int(status) in RETRYABLE_STATUS_CODES
+    except (TypeError, ValueError):
+        return False
+
+
+class LatencyTracker:
+    """단계별 최근 응답 시간을 보관하고 백분위 값을 계산합니다."""
+
+    def __init__(self, window: int = LATENCY_WINDOW):
+        self._samples = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def record(self, seconds: float):
+        with self._lock:
+            self._samples.append(seconds)
+
+    def __len__(self):
+        with self._lock:
+            return len(self._samples)
+
+    def percentile(self, percent: float) -> Optional[float]:
+        """최근 응답 시간의 백분위 값 (기록이 없으면 None)"""
+        with self._lock:
+            samples = sorted(self._samples)
+        if not samples:
+            return None
+        index = min(len(samples) - 1, int(round(percent / 100 * (len(samples) - 1))))
+        return samples[index]
+
+
+class CircuitBreaker:
+    """
+    일시적인 오류가 연속으로 failure_threshold번 발생하면 open_seconds 동안 호출을 바로 실패시킵니다.
+    그 후 한 번의 시험 호출이 성공하면 다시 정상 상태로 돌아갑니다.
+    """
+
+    def __init__(self, failure_threshold: int = 5, open_seconds: float = 30):
+        self.failure_threshold = failure_threshold
+        self.open_seconds = open_seconds
+        self.state = CIRCUIT_CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self._probing = False
+        self._lock = threading.Lock()
+
+    def before_call(self):
+        """
+        호출 가능 여부를 확인합니다.
+
+        Raises:
+            CircuitOpenError: 차단 중인 경우
+        """
+        with self._lock:
+            if self.state == CIRCUIT_CLOSED:
+                return
+            remaining = self.opened_at + self.open_seconds - time.monotonic()
+            if self.state == CIRCUIT_OPEN and remaining <= 0:
+                self.state = CIRCUIT_HALF_OPEN
+            if self.state == CIRCUIT_HALF_OPEN and not self._probing:
+                self._probing = True
+                return
+            raise CircuitOpenError(max(1, int(remaining) + 1))
+
+    def record_success(self):
+        with self._lock:
+            if self.state != CIRCUIT_CLOSED:
+                logging.info("[재시도] Gemini 호출이 복구되어 차단을 해제합니다.")
+            self.state = CIRCUIT_CLOSED
+            self.failures = 0
+            self._probing = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            self._probing = False
+            if self.state == CIRCUIT_HALF_OPEN or self.failures >= self.failure_threshold:
+                if self.state != CIRCUIT_OPEN:
+                    logging.error(
+                        f"[재시도] Gemini 오류가 {self.failures}회 연속 발생하여 {self.open_seconds:g}초 동안 호출을 중단합니다."
+                    )
+                self.state = CIRCUIT_OPEN
+                self.opened_at = time.monotonic()
+
+    def record_ignored(self):
+        """재시도 대상이 아닌 오류 (요청 자체의 문제)는 연속 실패 수에 포함하지 않습니다."""
+        with self._lock:
+            self._probing = False
+
+
+class Resilience:
+    """
+    Gemini 호출에 단계별 제한 시간, 지수 백오프 재시도, 회로 차단기를 적용합니다.
+    hedging을 켜면 응답이 최근 응답 시간의 백분위 값보다 늦을 때 같은 요청을 한 번 더 보내
+    먼저 도착한 응답을 사용합니다 (꼬리 지연 시간 감소, 호출 수 증가).
+    """
+
+    def __init__(self, timeouts: Optional[dict] = None, max_retries: int = 3,
+                 backoff_base: float = 1.0, backoff_max: float = 30.0,
+                 hedge_enabled: bool = False, hedge_percentile: float = 95, hedge_min_samples: int = 20,
+                 breaker: Optional[CircuitBreaker] = None):
+        self.timeouts = dict(DEFAULT_TIMEOUTS, **(timeouts or {}))
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.hedge_enabled = hedge_enabled
+        self.hedge_percentile = hedge_percentile
+        self.hedge_min_samples = hedge_min_samples
+        self.breaker = breaker or CircuitBreaker()
+        self._latencies = {}
+        self._executor = ThreadPoolExecutor(max_workers=CALL_WORKERS, thread_name_prefix='gemini-hedge')
+        self._lock = threading.Lock()
+        self._counters = {"retries": 0, "timeouts": 0, "hedged": 0, "hedge_wins": 0, "rejected": 0}
+
+    def _count(self, name: str):
+        with self._lock:
+            self._counters[name] += 1
+
+    def _tracker(self, stage: str) -> LatencyTracker:
+        with self._lock:
+            return self._latencies.setdefault(stage, LatencyTracker())
+
+    def _submit(self, func: Callable, *args, **kwargs):
+        # 호출한 스레드의 컨텍스트(요청 우선순위 등)를 유지
+        return self._executor.submit(contextvars.copy_context().run, func, *args, **kwargs)
+
+    def run_with_deadline(self, stage: str, timeout: float, func: Callable, *args,
+                          on_late_result: Optional[Callable] = None, **kwargs):
+        """
+        자체 제한 시간 옵션이 없는 함수가 timeout 초 안에 끝나지 않으면 StageTimeoutError로 중단합니다.
+        멈춘 호출은 데몬 스레드에 남아 서버 종료를 막지 않으며, 요청을 처리하던 작업자는 바로 풀려납니다.
+        제한 시간이 지난 뒤에 호출이 성공하면 결과를 받을 곳이 없으므로 on_late_result(결과)로 정리합니다
+        (업로드가 늦게 끝난 경우 원격 파일 삭제 등).
+        """
+        outcome = {}
+        lock = threading.Lock()
+
+        def target():
+            try:
+                result = func(*args, **kwargs)
+            except BaseException as e:
+                outcome["error"] = e
+                return
+            with lock:
+                abandoned = outcome.get("abandoned", False)
+                outcome["result"] = result
+            if abandoned and on_late_result is not None:
+                logging.warning(f"[재시도] {stage} 호출이 제한 시간이 지난 뒤에 끝나 결과를 정리합니다.")
+                try:
+                    on_late_result(result)
+                except Exception as e:
+                    logging.error(f"[오류] {stage} 늦게 도착한 결과 정리 실패: {e}")
+
+        thread = threading.Thread(
+            target=contextvars.copy_context().run, args=(target,), name=f'gemini-{stage}', daemon=True
+        )
+        thread.start()
+        thread.join(timeout)
+        with lock:
+            # join이 끝난 직후에 결과가 도착했으면 그대로 사용
+            if "result" not in outcome and "error" not in outcome:
+                outcome["abandoned"] = True
+                raise StageTimeoutError(stage, timeout)
+        if "error" in outcome:
+            raise outcome["error"]
+        return outcome["result"]
+
+    def backoff_delay(self, attempt: int) -> float:
+        """attempt번째 재시도 전 대기 시간 (full jitter)"""
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+
+    def hedge_delay(self, stage: str) -> Optional[float]:
+        """같은 요청을 한 번 더 보낼 때까지 기다릴 시간 (기록이 부족하면 None)"""
+        tracker = self._tracker(stage)
+        if len(tracker) < self.hedge_min_samples:
+            return None
+        return tracker.percentile(self.hedge_percentile)
+
+    def _attempt(self, stage: str, func: Callable, timeout: float, hedge: bool):
+        delay = self.hedge_delay(stage) if hedge and self.hedge_enabled else None
+        if delay is None:
+            return func(timeout)
+
+        first = self._submit(func, timeout)
+        done, _ = wait([first], timeout=delay)
+        if done:
+            return first.result()
+
+        logging.info(f"[재시도] {stage} 응답이 {delay:.1f}초를 넘어 같은 요청을 한 번 더 보냅니다 (hedging)")
+        self._count("hedged")
+        second = self._submit(func, timeout)
+        pending = {first, second}
+        error = None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    if future is second:
+                        self._count("hedge_wins")
+                    return future.result()
+                error = future.exception()
+        raise error
+
+    def call(self, stage: str, func: Callable[[float], object], hedge: bool = False,
+             retry_allowed: Optional[Callable[[], bool]] = None):
+        """
+        단계 설정에 따라 func를 호출합니다.
+
+        Args:
+            stage: 호출 단계 (upload, transcribe, summarize)
+            func: 제한 시간(초)을 받아 호출을 한 번 실행하는 함수
+            hedge: hedging 허용 여부 (hedging 설정이 켜져 있을 때만 적용)
+            retry_allowed: 실패 후 다시 시도해도 되는지 확인하는 함수 (선택, 스트리밍 중 일부를 이미 보낸 경우 등)
+
+        Returns:
+            func의 반환값
+
+        Raises:
+            CircuitOpenError: 오류가 계속되어 호출을 중단한 상태인 경우
+            StageTimeoutError: 마지막 시도까지 제한 시간을 넘긴 경우
+        """
+        timeout = self.timeouts.get(stage, DEFAULT_TIMEOUTS[STAGE_SUMMARIZE])
+        tracker = self._tracker(stage)
+        attempt = 0
+        while True:
+            try:
+                self.breaker.before_call()
+            except CircuitOpenError:
+                self._count("rejected")
+                raise
+
+            start = time.perf_counter()
+            try:
+                result = self._attempt(stage, func, timeout, hedge)
+            except Exception as e:
+                if not is_retryable(e):
+                    self.breaker.record_ignored()
+                    raise
+                self.breaker.record_failure()
+                # google.api_core의 DeadlineExceeded도 시간 초과로 집계
+                if isinstance(e, StageTimeoutError) or "deadline" in type(e).__name__.lower():
+                    self._count("timeouts")
+                if attempt >= self.max_retries or (retry_allowed and not retry_allowed()):
+                    raise
+                delay = self.backoff_delay(attempt)
+                attempt += 1
+                self._count("retries")
+                logging.warning(f"[재시도] {stage} 실패, {delay:.1f}초 후 다시 시도합니다 ({attempt}/{self.max_retries}): {e}")
+                time.sleep(delay)
+                continue
+
+            self.breaker.record_success()
+            tracker.record(time.perf_counter() - start)
+            return result
+
+    def stats(self) -> dict:
+        """재시도/시간 초과/hedging 횟수, 회로 차단기 상태, 단계별 응답 시간(p50/p99)을 반환합니다."""
+        with self._lock:
+            counters = dict(self._counters)
+            stages = dict(self._latencies)
+        latency = {}
+        for stage, tracker in stages.items():
+            p50 = tracker.percentile(50)
+            p99 = tracker.percentile(99)
+            latency[stage] = {
+                "samples": len(tracker),
+                "p50_seconds": round(p50, 3) if p50 is not None else None,
+                "p99_seconds": round(p99, 3) if p99 is not None else None
+            }
+        return dict(counters, circuit=self.breaker.state, latency=latency)
+
+
+def create_resilience(resilience_config: dict) -> Resilience:
+    """
+    설정에 따라 Gemini 호출 재시도/제한 시간 정책을 생성합니다.
+
+    Args:
+        resilience_config: config.yaml의 resilience 섹션
+
+    Returns:
+        Resilience
+    """
+    hedge_config = resilience_config.get('hedge', {})
+    breaker_config = resilience_config.get('circuit_breaker', {})
+    return Resilience(
+        timeouts=resilience_config.get('timeouts', {}),
+        max_retries=resilience_config.get('max_retries', 3),
+        backoff_base=resilience_config.get('backoff_base_seconds', 1.0),
+        backoff_max=resilience_config.get('backoff_max_seconds', 30.0),
+        hedge_enabled=hedge_config.get('enabled', False),
+        hedge_percentile=hedge_config.get('percentile', 95),
+        hedge_min_samples=hedge_config.get('min_samples', 20),
+        breaker=CircuitBreaker(
+            failure_threshold=breaker_config.get('failure_threshold', 5),
+            open_seconds=breaker_config.get('open_seconds', 30)
+        )
+    )
@@ -0,0 +1,224 @@
+import os
+import json
+import time
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from typing import Optional
+
+
+# 파일 해시 계산 시 한 번에 읽을 크기
+HASH_CHUNK_SIZE = 1024 * 1024  # 1MB
+
+
+def hash_file(file_path: str) -> str:
+    """
+    파일 내용을 청크 단위로 읽어 SHA-256 해시를 계산합니다.
+
+    Args:
+        file_path: 해시를 계산할 파일 경로
+
+    Returns:
+        16진수 해시 문자열
+    """
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def make_cache_key(audio_hash: str, *parts: str) -> str:
+    """
+    오디오 해시와 모델/프롬프트 버전 등으로 캐시 키를 생성합니다.
+
+    Args:
+        audio_hash: 업로드된 오디오의 해시
+        parts: 결과에 영향을 주는 값들 (모델 이름, 프롬프트 버전 등)
+
+    Returns:
+        캐시 키 (16진수 문자열)
+    """
+    return hashlib.sha256("|".join((audio_hash,) + parts).encode('utf-8')).hexdigest()
+
+
+class ResultCache:
+    """
+    요약 결과 캐시입니다.
+    메모리 LRU 캐시를 기본으로 사용하며, 설정 시 디스크 캐시를 함께 사용합니다.
+    디스크 캐시는 변환된 텍스트를 파일로 저장하므로 명시적으로 활성화한 경우에만 사용합니다.
+    """
+
+    def __init__(self, max_entries: int = 128, ttl: int = 86400,
+                 disk_dir: Optional[str] = None, disk_max_bytes: int = 104857600):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.disk_dir = disk_dir
+        self.disk_max_bytes = disk_max_bytes
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+        if self.disk_dir:
+            os.makedirs(self.disk_dir, exist_ok=True)
+
+    def _disk_path(self, key: str) -> str:
+        return os.path.join(self.disk_dir, f"{key}.json")
+
+    def get(self, key: str) -> Optional[dict]:
+        """
+        캐시에서 결과를 조회합니다.
+
+        Args:
+            key: 캐시 키
+
+        Returns:
+            캐시된 결과 (없거나 만료되었으면 None)
+        """
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                stored_at, result = entry
+                if now - stored_at <= self.ttl:
+                    self._memory.move_to_end(key)
+                    self.hits += 1
+                    return result
+                del self._memory[key]
+
+        result = self._get_from_disk(key, now)
+        with self._lock:
+            if result is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self.disk_hits += 1
+            self._put_memory(key, result, now)
+        return result
+
+    def put(self, key: str, result: dict):
+        """
+        결과를 캐시에 저장합니다.
+
+        Args:
+            key: 캐시 키
+            result: 저장할 결과
+        """
+        now = time.time()
+        with self._lock:
+            self._put_memory(key, result, now)
+        if self.disk_dir:
+            self._put_to_disk(key, result)
+
+    def _put_memory(self, key: str, result: dict, stored_at: float):
+        self._memory[key] = (stored_at, result)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def _get_from_disk(self, key: str, now: float) -> Optional[dict]:
+        if not self.disk_dir:
+            return None
+
+        path = self._disk_path(key)
+        try:
+            if now - os.path.getmtime(path) > self.ttl:
+                os.remove(path)
+                return None
+            with open(path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logging.error(f"[캐시] 디스크 캐시 읽기 실패: {e}")
+            return None
+
+    def _put_to_disk(self, key: str, result: dict):
+        path = self._disk_path(key)
+        # 여러 워커 프로세스가 같은 결과를 동시에 저장해도 서로의 임시 파일을 덮어쓰지 않도록 pid를 붙임
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        try:
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump(result, f, ensure_ascii=False)
+            os.replace(temp_path, path)
+            self.evict_disk()
+        except Exception as e:
+            logging.error(f"[캐시] 디스크 캐시 저장 실패: {e}")
+
+    def evict_disk(self) -> int:
+        """
+        만료된 디스크 캐시 파일을 삭제하고, 최대 용량을 넘으면 오래된 파일부터 삭제합니다.
+
+        Returns:
+            삭제된 파일 수
+        """
+        if not self.disk_dir:
+            return 0
+
+        now = time.time()
+        entries = []
+        for name in os.listdir(self.disk_dir):
+            if not name.endswith('.json'):
+                continue
+            path = os.path.join(self.disk_dir, name)
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+
+        removed = 0
+        total_size = sum(size for _, size, _ in entries)
+        # 오래된 파일부터 확인
+        for mtime, size, path in sorted(entries):
+            if now - mtime <= self.ttl and total_size <= self.disk_max_bytes:
+                continue
+            try:
+                os.remove(path)
+                removed += 1
+                total_size -= size
+            except FileNotFoundError:
+                pass
+        return removed
+
+    def stats(self) -> dict:
+        """캐시 적중/실패 통계를 반환합니다."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+                "memory_entries": len(self._memory),
+                "disk_enabled": bool(self.disk_dir)
+            }
+
+
+def create_result_cache(cache_config: dict) -> Optional[ResultCache]:
+    """
+    설정에 따라 결과 캐시를 생성합니다.
+
+    Args:
+        cache_config: config.yaml의 cache 섹션
+
+    Returns:
+        ResultCache (캐시가 비활성화되어 있으면 None)
+    """
+    if not cache_config.get('enabled', True):
+        return None
+
+    disk_dir = None
+    if cache_config.get('persist_to_disk', False):
+        disk_dir = cache_config.get('disk_dir', 'data/cache')
+        logging.info(f"[캐시] 디스크 캐시 사용: {disk_dir}")
+
+    return ResultCache(
+        max_entries=cache_config.get('max_entries', 128),
+        ttl=cache_config.get('ttl_seconds', 86400),
+        disk_dir=disk_dir,
+        disk_max_bytes=cache_config.get('disk_max_bytes', 104857600)
+    )
@@ -1,18 +1,65 @@
+import time
+
+# 모듈 불러오기 시작 시각 (시작 시간 측정용이므로 다른 모듈보다 먼저 기록)
+MODULE_LOAD_STARTED = time.perf_counter()
+
 import os
 import sys
+import json
+import asyncio
+import hashlib
+import threading
 import tempfile
 import logging
-from pathlib import Path
-from logging.handlers import RotatingFileHandler
+import contextvars
+from functools import partial
+from typing import List, Optional
+from contextlib import asynccontextmanager
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from logging.handlers import RotatingFileHandler, WatchedFileHandler
 from dotenv import load_dotenv
-import google.generativeai as genai
-from pydub import AudioSegment
-from fastapi import FastAPI, File, UploadFile, HTTPException
+from fastapi import APIRouter, FastAPI, File, Form, UploadFile, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, StreamingResponse, Response
+from starlette.types import ASGIApp, Receive, Scope, Send
 import uvicorn
 import yaml
 
+from audio_utils import (
+    convert_audio, get_mime_type, get_audio_duration, detect_silences, plan_segments, split_audio,
+    build_preprocess_filter, measure_preprocessing
+)
+from transcript_utils import stitch_transcripts, split_text
+from result_cache import create_result_cache, make_cache_key
+from gemini_client import (
+    ModelRegistry, UploadedFileRegistry, generate_text, configure_gemini, load_genai, delete_remote_file
+)
+from quota import (
+    create_rate_limiter, request_priority, QuotaExceededError, PRIORITY_HIGH, PRIORITY_NORMAL, PRIORITY_LOW
+)
+from resilience import (
+    create_resilience, CircuitOpenError, StageTimeoutError, STAGE_UPLOAD, STAGE_TRANSCRIBE, STAGE_SUMMARIZE
+)
+from model_router import create_model_router
+from batch_utils import extract_audio_from_zip, remove_extracted, BatchLimitError
+from upload_sessions import create_upload_session_store, UploadSessionError
+from readiness import create_readiness_checker
+from transcript_store import create_transcript_store
+from tracing import (
+    configure_tracing, start_queue_logging, span, traced, accept_request_id, current_request_id,
+    call_with_request_id, request_id_var, JsonFormatter, RequestContextFilter, REQUEST_ID_HEADER
+)
+from metrics import (
+    REGISTRY, CONTENT_TYPE, MultiProcessCollector, STAGE_RECEIVE, STAGE_CONVERT, STAGE_CLEANUP, track_stage,
+    INPUT_BYTES, CONVERTED_BYTES, AUDIO_DURATION, REQUESTS, ERRORS,
+    QUEUE_RUNNING, QUEUE_WAITING, JOBS_ACTIVE, MODEL_IN_FLIGHT, CACHE_LOOKUPS, CACHE_HIT_RATIO,
+    PREPROCESS_SECONDS, PREPROCESS_BYTES, STARTUP_SECONDS
+)
+from job_store import (
+    create_job_store, job_progress, stage_progress,
+    JOB_QUEUED, JOB_CONVERTING, JOB_UPLOADING, JOB_TRANSCRIBING, JOB_SUMMARIZING, JOB_COMPLETED, JOB_FAILED
+)
+
 # 환경변수 로드
 load_dotenv()
 
@@ -42,12 +89,16 @@ def load_config(config_path: str = "config/config.yaml") -> dict:
 
 
 # 로깅 설정 함수
-def setup_logging(config: dict):
+def setup_logging(config: dict, use_queue: bool = True):
     """
     로깅 시스템을 설정합니다.
+    로그는 큐에 넣고 별도 스레드에서 파일/콘솔에 기록하므로, 요청 처리 중에 로그 쓰기를 기다리지 않습니다.
+    워커 프로세스가 여러 개이면 로그 파일을 프로세스마다 따로 교체할 수 없으므로,
+    교체는 logrotate 등에 맡기고 파일이 바뀌면 다시 여는 핸들러를 사용합니다.
     
     Args:
         config: 설정 딕셔너리
+        use_queue: False이면 핸들러에 바로 기록 (변환용 프로세스 등 큐를 비워 줄 스레드가 없는 경우)
     """
     log_config = config.get('logging', {})
     # log_dir와 log_path 둘 다 지원 (하위 호환성)
@@ -56,6 +107,7 @@ def setup_logging(config: dict):
     log_level = log_config.get('log_level', 'INFO')
     max_bytes = log_config.get('max_bytes', 10485760)  # 10MB
     backup_count = log_config.get('backup_count', 5)
+    log_format = log_config.get('format', 'text')  # text 또는 json
     
     # 로그 디렉토리 생성
     os.makedirs(log_dir, exist_ok=True)
@@ -70,244 +122,2016 @@ def setup_logging(config: dict):
         logger.removeHandler(handler)
     
     # 파일 핸들러 (로테이션 지원)
-    file_handler = RotatingFileHandler(
-        log_file_path,
-        maxBytes=max_bytes,
-        backupCount=backup_count,
-        encoding='utf-8'
-    )
+    if config.get('server', {}).get('workers', 1) > 1:
+        file_handler = WatchedFileHandler(log_file_path, encoding='utf-8')
+    else:
+        file_handler = RotatingFileHandler(
+            log_file_path,
+            maxBytes=max_bytes,
+            backupCount=backup_count,
+            encoding='utf-8'
+        )
     file_formatter = logging.Formatter(
-        '%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+        '%(asctime)s - %(name)s - %(levelname)s - %(request_tag)s%(message)s',
         datefmt='%Y-%m-%d %H:%M:%S'
     )
-    file_handler.setFormatter(file_formatter)
-    logger.addHandler(file_handler)
     
     # 콘솔 핸들러
     console_handler = logging.StreamHandler()
     console_formatter = logging.Formatter(
-        '%(asctime)s - %(levelname)s - %(message)s',
+        '%(asctime)s - %(levelname)s - %(request_tag)s%(message)s',
         datefmt='%Y-%m-%d %H:%M:%S'
     )
+    
+    # JSON 형식: 한 줄에 로그 하나 (요청 ID, span ID 포함)
+    if log_format == 'json':
+        file_formatter = console_formatter = JsonFormatter()
+    file_handler.setFormatter(file_formatter)
     console_handler.setFormatter(console_formatter)
-    logger.addHandler(console_handler)
     
-    logging.info(f"로깅 시스템 초기화 완료 (파일: {log_file_path}, 레벨: {log_level})")
+    if use_queue:
+        start_queue_logging(logger, [file_handler, console_handler])
+    else:
+        for handler in (file_handler, console_handler):
+            handler.addFilter(RequestContextFilter())
+            logger.addHandler(handler)
+        return
+    
+    logging.info(f"로깅 시스템 초기화 완료 (파일: {log_file_path}, 레벨: {log_level}, 형식: {log_format})")
+
+
+# 분석 방식
+MODE_TWO_STEP = "two_step"  # 텍스트 변환 후 요약 (2회 호출)
+MODE_SINGLE_CALL = "single_call"  # 텍스트 변환과 요약을 한 번에 요청 (JSON 응답, 1회 호출)
+GEMINI_MODES = (MODE_TWO_STEP, MODE_SINGLE_CALL)
+
+# multipart 경계/헤더 등 파일 외 요청 본문 여유분
+UPLOAD_BODY_OVERHEAD = 64 * 1024
+# 이어받기 업로드 청크의 SHA-256 해시 헤더 (선택)
+CHUNK_CHECKSUM_HEADER = "X-Chunk-SHA256"
+
+# 스트리밍 응답(/summarize/stream)에서 보낼 이벤트가 없을 때 연결 유지용 주석을 보내는 간격 (초)
+SSE_KEEPALIVE_SECONDS = 15
+
+# 처리 결과 검색 (/transcripts) 한 번에 반환할 기본/최대 개수
+TRANSCRIPTS_PAGE_SIZE = 20
+TRANSCRIPTS_MAX_PAGE_SIZE = 100
+
+# 워커가 여러 개일 때 워커별 지표를 저장하는 주기 (초)
+METRICS_SNAPSHOT_INTERVAL = 5
+
+# 설정 파일 내용 (create_app에서 불러옴, 모듈을 불러오기만 해서는 설정을 읽지 않음)
+config = None
+
+
+def apply_settings(app_config: dict):
+    """
+    설정 파일 내용으로 모듈 전체에서 사용하는 설정 값을 정합니다.
+    파일/DB를 열지 않으므로 변환용 프로세스에서도 같은 값을 쓰도록 다시 호출할 수 있습니다.
+    
+    Args:
+        app_config: 설정 딕셔너리
+    
+    Raises:
+        ValueError: 설정 값이 올바르지 않은 경우
+    """
+    global config, WORKERS, DRAIN_TIMEOUT
+    global IO_WORKERS, CPU_WORKERS, CPU_EXECUTOR_TYPE, MAX_CONCURRENT_JOBS, MAX_QUEUE_SIZE
+    global AUDIO_OPTIONS, PREPROCESS_FILTER, gemini_config, GEMINI_MODE
+    global MAP_REDUCE_THRESHOLD_CHARS, MAP_REDUCE_CHUNK_CHARS, MAP_REDUCE_FAN_OUT
+    global SEGMENTATION_ENABLED, SEGMENT_MIN_DURATION, SEGMENT_SECONDS, SEGMENT_OVERLAP_SECONDS
+    global SEGMENT_SPLIT_ON_SILENCE, SEGMENT_SILENCE_THRESHOLD_DB, SEGMENT_SILENCE_MIN_SECONDS, SEGMENT_PARALLELISM
+    global upload_config, MAX_UPLOAD_BYTES, UPLOAD_CHUNK_SIZE
+    global jobs_config, MAX_PENDING_JOBS, JOB_EVICTION_INTERVAL
+    global BATCH_MAX_FILES, BATCH_MAX_TOTAL_BYTES, BATCH_PARALLELISM
+    global METRICS_ENABLED, METRICS_MULTIPROCESS_DIR
+    config = app_config
+    
+    # 서버 프로세스 설정
+    server_config = config.get('server', {})
+    WORKERS = server_config.get('workers', 1)  # uvicorn 워커 프로세스 수
+    DRAIN_TIMEOUT = server_config.get('drain_timeout_seconds', 300)  # 종료 시 진행 중인 요청/작업을 기다릴 최대 시간
+    
+    # 동시 처리 설정
+    concurrency_config = config.get('concurrency', {})
+    IO_WORKERS = concurrency_config.get('io_workers', 8)  # Gemini 업로드/분석용 스레드 수
+    CPU_WORKERS = concurrency_config.get('cpu_workers', os.cpu_count() or 1)  # 오디오 변환용 프로세스 수
+    CPU_EXECUTOR_TYPE = concurrency_config.get('cpu_executor', 'process')  # process 또는 thread
+    MAX_CONCURRENT_JOBS = concurrency_config.get('max_concurrent_jobs', 4)  # 동시에 처리할 요청 수
+    MAX_QUEUE_SIZE = concurrency_config.get('max_queue_size', 16)  # 대기열 최대 길이
+    
+    # 오디오 변환 설정
+    AUDIO_OPTIONS = config.get('audio', {})
+    # 인코딩 전 전처리 필터 (무음 줄이기/속도 변경/샘플링 레이트, 사용하지 않으면 None)
+    PREPROCESS_FILTER = build_preprocess_filter(AUDIO_OPTIONS)
+    
+    gemini_config = config.get('gemini', {})
+    GEMINI_MODE = gemini_config.get('mode', MODE_TWO_STEP)
+    if GEMINI_MODE not in GEMINI_MODES:
+        raise ValueError(f"gemini.mode 설정이 올바르지 않습니다: {GEMINI_MODE} ({', '.join(GEMINI_MODES)} 중 선택)")
+    
+    # 긴 텍스트 요약 설정 (조각별 요약 후 종합)
+    MAP_REDUCE_THRESHOLD_CHARS = gemini_config.get('map_reduce_threshold_chars', 30000)  # 이 길이를 넘으면 나눠서 요약
+    MAP_REDUCE_CHUNK_CHARS = gemini_config.get('map_reduce_chunk_chars', 12000)  # 조각당 최대 글자 수
+    MAP_REDUCE_FAN_OUT = gemini_config.get('map_reduce_fan_out', 4)  # 동시에 요약할 조각 수
+    
+    # 긴 오디오 분할 처리 설정
+    segmentation_config = config.get('segmentation', {})
+    SEGMENTATION_ENABLED = segmentation_config.get('enabled', True)
+    SEGMENT_MIN_DURATION = segmentation_config.get('min_duration_seconds', 1800)  # 이 길이 이상이면 분할 처리
+    SEGMENT_SECONDS = segmentation_config.get('segment_seconds', 600)  # 구간 길이
+    SEGMENT_OVERLAP_SECONDS = segmentation_config.get('overlap_seconds', 10)  # 무음이 없을 때 겹칠 길이
+    SEGMENT_SPLIT_ON_SILENCE = segmentation_config.get('split_on_silence', True)  # 무음 구간에서 자르기
+    SEGMENT_SILENCE_THRESHOLD_DB = segmentation_config.get('silence_threshold_db', -35)
+    SEGMENT_SILENCE_MIN_SECONDS = segmentation_config.get('silence_min_seconds', 0.7)
+    SEGMENT_PARALLELISM = segmentation_config.get('parallelism', 4)  # 동시에 처리할 구간 수
+    if SEGMENT_OVERLAP_SECONDS >= SEGMENT_SECONDS:
+        raise ValueError(
+            f"segmentation.overlap_seconds({SEGMENT_OVERLAP_SECONDS})는 "
+            f"segment_seconds({SEGMENT_SECONDS})보다 작아야 합니다."
+        )
+    
+    # 업로드 설정
+    upload_config = config.get('upload', {})
+    if WORKERS > 1:
+        # 이어받기 업로드의 청크가 여러 워커로 나뉘어 도착하므로 세션은 SQLite로 공유
+        upload_config = dict(upload_config, resumable=dict(upload_config.get('resumable', {}), store='sqlite'))
+    MAX_UPLOAD_BYTES = int(upload_config.get('max_size_mb', 100) * 1024 * 1024)  # 업로드 최대 크기
+    UPLOAD_CHUNK_SIZE = upload_config.get('chunk_size', 1024 * 1024)  # 디스크에 나눠 쓸 크기 (기본 1MB)
+    
+    # 비동기 작업 설정
+    jobs_config = config.get('jobs', {})
+    if WORKERS > 1:
+        # 작업 조회가 다른 워커로 갈 수 있으므로 작업 상태는 SQLite로 공유
+        jobs_config = dict(jobs_config, store='sqlite')
+    MAX_PENDING_JOBS = jobs_config.get('max_pending_jobs', 100)  # 동시에 보관할 진행 중 작업 수
+    JOB_EVICTION_INTERVAL = jobs_config.get('eviction_interval_seconds', 60)  # 만료 작업 정리 주기
+    
+    # 일괄 처리 설정 (/summarize/batch)
+    batch_config = config.get('batch', {})
+    BATCH_MAX_FILES = batch_config.get('max_files', 50)  # 요청당 최대 파일 수 (zip 안의 파일 포함)
+    BATCH_MAX_TOTAL_BYTES = int(batch_config.get('max_total_size_mb', 500) * 1024 * 1024)  # 요청 전체 최대 크기
+    BATCH_PARALLELISM = batch_config.get('parallelism', MAX_CONCURRENT_JOBS)  # 요청 하나에서 동시에 처리할 파일 수
+    
+    # 지표 설정 (/metrics)
+    metrics_config = config.get('metrics', {})
+    METRICS_ENABLED = metrics_config.get('enabled', True)
+    # 워커가 여러 개일 때 워커별 지표를 모을 디렉토리
+    METRICS_MULTIPROCESS_DIR = metrics_config.get('multiprocess_dir', 'data/metrics')
+
+
+def init_cpu_worker(app_config: dict):
+    """변환용 프로세스를 준비합니다 (로그 큐를 비워 줄 스레드가 없으므로 핸들러에 바로 기록)."""
+    setup_logging(app_config, use_queue=False)
+    apply_settings(app_config)
+
+
+class QueueFullError(Exception):
+    """처리 대기열이 가득 찼을 때 발생하는 예외"""
+
+
+class ProcessingQueue:
+    """
+    동시 처리 수와 대기열 길이를 제한하는 처리 큐입니다.
+    대기열이 가득 차면 요청을 바로 거절하여 서버 과부하를 막습니다.
+    """
+
+    def __init__(self, max_concurrent: int, max_waiting: int):
+        self._semaphore = asyncio.Semaphore(max_concurrent)
+        self.max_concurrent = max_concurrent
+        self.max_waiting = max_waiting
+        self.waiting = 0
+        self.running = 0
+
+    @property
+    def is_full(self) -> bool:
+        """대기열이 가득 찼는지 여부"""
+        return self.waiting >= self.max_waiting
+
+    @asynccontextmanager
+    async def slot(self, reject_when_full: bool = True):
+        """
+        처리 슬롯을 확보합니다.
+        
+        Args:
+            reject_when_full: True이면 대기열이 가득 찼을 때 QueueFullError를 발생시키고,
+                False이면 대기열 길이와 관계없이 순서를 기다립니다 (비동기 작업용).
+        """
+        if reject_when_full and self.is_full:
+            raise QueueFullError("서버가 혼잡합니다. 잠시 후 다시 시도해주세요.")
+
+        self.waiting += 1
+        try:
+            await self._semaphore.acquire()
+        finally:
+            self.waiting -= 1
+
+        self.running += 1
+        try:
+            yield
+        finally:
+            self.running -= 1
+            self._semaphore.release()
+
+
+# 실행기 (lifespan에서 생성/종료)
+io_executor = None
+cpu_executor = None
+# 긴 텍스트의 조각 요약(map)용 스레드 (프로세스 전체에서 map_reduce_fan_out개까지만 동시에 요약)
+map_executor = None
+processing_queue = None
+
+# 비동기 작업 저장소와 실행 중인 작업 태스크 (저장소는 create_services에서 생성)
+job_store = None
+job_tasks = set()
+
+# 이어받기 업로드 (/uploads, create_services에서 생성)
+upload_sessions = None
+
+# 워커별 지표를 모아 /metrics에서 합산 (워커가 여러 개일 때 lifespan에서 생성)
+metrics_collector = None
+
+
+async def evict_expired_entries():
+    """
+    만료된 작업 결과, 처리하던 워커가 종료된 작업, 보관 시간이 지난 Gemini 업로드 파일,
+    중단된 이어받기 업로드, 보관 기간이 지난 처리 결과를 주기적으로 정리합니다.
+    """
+    loop = asyncio.get_running_loop()
+    while True:
+        await asyncio.sleep(JOB_EVICTION_INTERVAL)
+        try:
+            await loop.run_in_executor(io_executor, job_store.evict_expired)
+            await loop.run_in_executor(io_executor, job_store.fail_orphaned)
+        except Exception as e:
+            logging.error(f"[오류] 만료 작업 정리 실패: {e}")
+        try:
+            await loop.run_in_executor(io_executor, uploaded_files.evict_expired)
+        except Exception as e:
+            logging.error(f"[오류] 만료 업로드 파일 정리 실패: {e}")
+        try:
+            await loop.run_in_executor(io_executor, upload_sessions.evict_expired)
+        except Exception as e:
+            logging.error(f"[오류] 만료 이어받기 업로드 정리 실패: {e}")
+        if transcript_store:
+            try:
+                await loop.run_in_executor(io_executor, transcript_store.evict_expired)
+            except Exception as e:
+                logging.error(f"[오류] 보관 기간이 지난 처리 결과 정리 실패: {e}")
+
+
+async def write_metrics_snapshots():
+    """이 워커의 지표를 주기적으로 파일에 저장합니다 (/metrics 요청을 받은 워커가 모든 워커의 지표를 합산)."""
+    loop = asyncio.get_running_loop()
+    while True:
+        await asyncio.sleep(METRICS_SNAPSHOT_INTERVAL)
+        try:
+            await loop.run_in_executor(io_executor, collect_state_metrics)
+            await loop.run_in_executor(io_executor, metrics_collector.write)
+        except Exception as e:
+            logging.error(f"[오류] 워커 지표 저장 실패: {e}")
+
+
+async def drain_jobs(timeout: float):
+    """
+    서버 종료 시 진행 중인 비동기 작업이 끝날 때까지 기다립니다.
+    새 연결은 uvicorn이 이미 받지 않으며, timeout 안에 끝나지 않은 작업은 취소하고 실패로 기록합니다.
+
+    Args:
+        timeout: 최대 대기 시간 (초)
+    """
+    pending = [task for task in job_tasks if not task.done()]
+    if not pending:
+        return
+    logging.info(f"[종료] 진행 중인 작업 {len(pending)}개가 끝나기를 기다립니다 (최대 {timeout}초)")
+    _, pending = await asyncio.wait(pending, timeout=timeout)
+    if not pending:
+        logging.info("[종료] 진행 중이던 작업을 모두 마쳤습니다.")
+        return
+    for task in pending:
+        task.cancel()
+    await asyncio.gather(*pending, return_exceptions=True)
+    logging.warning(f"[종료] 제한 시간 안에 끝나지 않은 작업 {len(pending)}개를 중단했습니다.")
+
+
+def prepare_models():
+    """google.generativeai를 불러오고 사용할 모델 객체를 미리 만듭니다."""
+    for model_name in model_router.model_names():
+        model_registry.get(model_name)
+
+
+async def prepare_gemini():
+    """
+    서버 시작 후 백그라운드에서 Gemini 클라이언트를 준비하여 첫 요청의 준비 시간을 줄입니다.
+    준비가 끝나기 전에는 /ready가 준비 중으로 응답하고, 그 사이에 들어온 요청은 준비가 끝날 때까지 기다립니다.
+    """
+    loop = asyncio.get_running_loop()
+    started = time.perf_counter()
+    try:
+        await loop.run_in_executor(io_executor, prepare_models)
+    except Exception as e:
+        logging.error(f"[오류] Gemini 클라이언트 준비 실패: {e}")
+        readiness.set_state("gemini_client", False, str(e))
+        return
+    elapsed = time.perf_counter() - started
+    STARTUP_SECONDS.set(elapsed, phase="gemini_client")
+    readiness.set_state("gemini_client", True, prepare_seconds=round(elapsed, 2))
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    서버 시작 시 실행기를 생성하고, 종료 시 진행 중인 작업을 마친 뒤 정리합니다.
+    Gemini 클라이언트 준비와 연결 확인은 백그라운드에서 실행하므로 시작을 기다리게 하지 않습니다.
+    """
+    global io_executor, cpu_executor, map_executor, processing_queue, metrics_collector
+
+    startup_started = time.perf_counter()
+    io_executor = ThreadPoolExecutor(max_workers=IO_WORKERS, thread_name_prefix='gemini-io')
+    map_executor = ThreadPoolExecutor(max_workers=MAP_REDUCE_FAN_OUT, thread_name_prefix='gemini-map')
+    if CPU_EXECUTOR_TYPE == 'thread':
+        cpu_executor = ThreadPoolExecutor(max_workers=CPU_WORKERS, thread_name_prefix='audio-cpu')
+    else:
+        # 변환 프로세스에도 같은 설정과 로깅을 적용 (spawn 방식이면 모듈을 새로 불러오므로)
+        cpu_executor = ProcessPoolExecutor(max_workers=CPU_WORKERS, initializer=init_cpu_worker, initargs=(config,))
+    processing_queue = ProcessingQueue(MAX_CONCURRENT_JOBS, MAX_QUEUE_SIZE)
+    logging.info(
+        f"[동시성] 실행기 준비 완료 (I/O 스레드: {IO_WORKERS}, 조각 요약 스레드: {MAP_REDUCE_FAN_OUT}, "
+        f"변환 {CPU_EXECUTOR_TYPE}: {CPU_WORKERS}, 동시 처리: {MAX_CONCURRENT_JOBS}, 대기열: {MAX_QUEUE_SIZE})"
+    )
+
+    readiness.add_pending("gemini_client", "준비 중")
+    background_tasks = [asyncio.create_task(evict_expired_entries()), asyncio.create_task(prepare_gemini())]
+    if readiness.gemini_check:
+        background_tasks.append(asyncio.create_task(readiness.monitor_gemini(io_executor)))
+
+    if WORKERS > 1:
+        logging.info(
+            f"[워커] 워커 프로세스 {WORKERS}개 중 하나로 시작 (pid: {os.getpid()}, "
+            f"작업/이어받기 업로드/요청 한도는 SQLite로 공유)"
+        )
+        if result_cache and not result_cache.disk_dir:
+            # 디스크 캐시는 변환된 텍스트를 디스크에 저장하므로 워커 수와 관계없이 설정한 경우에만 사용
+            logging.warning(
+                "[워커] 결과 캐시를 워커마다 메모리에만 보관하므로 다른 워커가 저장한 결과는 적중하지 않습니다. "
+                "워커 사이에 공유하려면 cache.persist_to_disk: true로 설정하세요."
+            )
+        if METRICS_ENABLED:
+            metrics_collector = MultiProcessCollector(METRICS_MULTIPROCESS_DIR)
+            background_tasks.append(asyncio.create_task(write_metrics_snapshots()))
+
+    startup_seconds = time.perf_counter() - startup_started
+    STARTUP_SECONDS.set(MODULE_LOAD_SECONDS, phase="import")
+    STARTUP_SECONDS.set(APP_CREATE_SECONDS, phase="create_app")
+    STARTUP_SECONDS.set(startup_seconds, phase="startup")
+    logging.info(
+        f"[시작] 모듈 불러오기 {MODULE_LOAD_SECONDS:.2f}초, 앱 생성 {APP_CREATE_SECONDS:.2f}초, "
+        f"시작 준비 {startup_seconds:.2f}초"
+    )
+
+    try:
+        yield
+    finally:
+        for task in background_tasks:
+            task.cancel()
+        # uvicorn이 연결을 모두 닫은 뒤 호출되므로, 남은 비동기 작업(/jobs, 일괄 처리)을 마저 처리
+        await drain_jobs(DRAIN_TIMEOUT)
+        if metrics_collector:
+            metrics_collector.remove()
+        uploaded_files.clear()
+        upload_sessions.clear()
+        io_executor.shutdown(wait=False)
+        map_executor.shutdown(wait=False)
+        # 작업을 모두 마친 뒤이므로 변환 프로세스가 종료될 때까지 기다림 (남은 프로세스가 없도록)
+        cpu_executor.shutdown(wait=True)
+        logging.info("[동시성] 실행기 종료 완료")
+
+
+# API 엔드포인트 (create_app에서 앱에 등록)
+router = APIRouter()
+
+
+class UploadTooLargeError(Exception):
+    """요청 본문이 업로드 최대 크기를 넘었을 때 발생하는 예외"""
+
+
+class UploadSizeLimitMiddleware:
+    """
+    요청 본문 크기를 제한하는 ASGI 미들웨어입니다.
+    Content-Length가 최대 크기를 넘으면 본문을 받기 전에 413으로 거절하고,
+    Content-Length 없이 전송되는 경우에도 받은 바이트 수를 세어 초과 즉시 중단합니다.
+    path_limits에 지정한 경로(일괄 업로드 등)는 별도의 최대 크기를 사용합니다.
+    """
+
+    def __init__(self, app: ASGIApp, max_body_bytes: int, path_limits: dict = None):
+        self.app = app
+        self.max_body_bytes = max_body_bytes
+        self.path_limits = path_limits or {}
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http" or scope["method"] not in ("POST", "PUT"):
+            await self.app(scope, receive, send)
+            return
+
+        max_body_bytes = self.path_limits.get(scope["path"], self.max_body_bytes)
+        headers = dict(scope["headers"])
+        content_length = headers.get(b"content-length")
+        if content_length is not None and content_length.isdigit() and int(content_length) > max_body_bytes:
+            logging.warning(f"[업로드] 크기 초과로 거절: {int(content_length) / (1024 * 1024):.2f}MB")
+            await self.reject(send, max_body_bytes)
+            return
+
+        received = 0
+        exceeded = False
+        rejected = False
+
+        async def limited_receive():
+            nonlocal received, exceeded
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > max_body_bytes:
+                    exceeded = True
+                    raise UploadTooLargeError()
+            return message
+
+        async def limited_send(message):
+            nonlocal rejected
+            # 본문 파싱 오류로 만들어진 응답 대신 413 응답을 보냅니다
+            if exceeded:
+                if not rejected:
+                    rejected = True
+                    logging.warning(f"[업로드] 전송 중 크기 초과로 중단: {received / (1024 * 1024):.2f}MB")
+                    await self.reject(send, max_body_bytes)
+                return
+            await send(message)
+
+        try:
+            await self.app(scope, limited_receive, limited_send)
+        except UploadTooLargeError:
+            if not rejected:
+                rejected = True
+                await self.reject(send, max_body_bytes)
+
+    async def reject(self, send: Send, max_body_bytes: int):
+        if max_body_bytes == self.max_body_bytes:
+            detail = f"파일 크기는 {MAX_UPLOAD_BYTES // (1024 * 1024)}MB 이하여야 합니다."
+        else:
+            detail = f"요청 전체 크기는 {max_body_bytes // (1024 * 1024)}MB 이하여야 합니다."
+        response = JSONResponse(status_code=413, content={"detail": detail})
+        await response({"type": "http"}, None, send)
+
+
+class RequestContextMiddleware:
+    """
+    요청마다 요청 ID를 정하고 (클라이언트가 X-Request-ID 헤더를 보내면 그 값을 사용) 응답 헤더로 돌려주는 ASGI 미들웨어입니다.
+    요청 ID는 처리 중 남기는 모든 로그와 span에 기록되며, 요청 처리 전체를 span 하나로 기록합니다.
+    """
+
+    # 주기적으로 호출되는 상태 확인 요청은 span을 기록하지 않음
+    UNTRACED_PATHS = {"/health", "/ready", "/metrics"}
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        header_name = REQUEST_ID_HEADER.lower().encode()
+        client_request_id = dict(scope["headers"]).get(header_name)
+        request_id = accept_request_id(client_request_id.decode("latin-1") if client_request_id else None)
+        token = request_id_var.set(request_id)
+        status_code = None
+
+        async def send_with_request_id(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                message = dict(message, headers=list(message.get("headers", [])) + [(header_name, request_id.encode())])
+            await send(message)
+
+        try:
+            if scope["path"] in self.UNTRACED_PATHS:
+                await self.app(scope, receive, send_with_request_id)
+                return
+            with span("http.request", method=scope["method"], path=scope["path"]) as request_span:
+                await self.app(scope, receive, send_with_request_id)
+                if request_span:
+                    request_span.set_attribute("status_code", status_code)
+        finally:
+            request_id_var.reset(token)
+
+
+def create_app(app_config: Optional[dict] = None) -> FastAPI:
+    """
+    설정을 불러오고 로깅, 요청 추적, 저장소를 준비한 뒤 FastAPI 앱을 생성합니다.
+    실행기 생성, Gemini 클라이언트 준비 등 요청을 받기 직전의 시작 작업은 lifespan에서 실행합니다.
+    (uvicorn --factory server:create_app 으로 실행하며, server:app도 처음 찾을 때 이 함수로 만듭니다)
+
+    Args:
+        app_config: 설정 딕셔너리 (없으면 config/config.yaml에서 불러옴)
+
+    Returns:
+        미들웨어와 엔드포인트를 등록한 FastAPI 앱
+
+    Raises:
+        ValueError: GOOGLE_API_KEY가 없거나 설정 값이 올바르지 않은 경우
+    """
+    global APP_CREATE_SECONDS
+    started = time.perf_counter()
+    app_config = app_config or load_config()
+    
+    # 로깅과 요청 추적 설정 (span 기록)
+    setup_logging(app_config)
+    configure_tracing(app_config.get('tracing', {}))
+    
+    # Gemini API 설정
+    api_key = os.getenv('GOOGLE_API_KEY')
+    if not api_key:
+        raise ValueError("GOOGLE_API_KEY가 .env 파일에 설정되지 않았습니다.")
+    # google.generativeai는 처음 사용할 때 불러오므로 (시작 시간 단축) 키만 지정해 둠
+    configure_gemini(api_key)
+    
+    apply_settings(app_config)
+    create_services(app_config)
+    
+    app = FastAPI(
+        title="음성 텍스트 변환/요약",
+        description="오디오 파일을 업로드하여 Gemini 1.5 Flash로 텍스트 변환 및 요약",
+        version="1.0.0",
+        lifespan=lifespan
+    )
+    app.include_router(router)
+
+    app.add_middleware(
+        UploadSizeLimitMiddleware,
+        max_body_bytes=MAX_UPLOAD_BYTES + UPLOAD_BODY_OVERHEAD,
+        path_limits={"/summarize/batch": BATCH_MAX_TOTAL_BYTES + UPLOAD_BODY_OVERHEAD}
+    )
+
+    # CORS 설정 - 설정 파일에서 읽어오기
+    cors_config = config.get('cors', {})
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=cors_config.get('allow_origins', ["*"]),
+        allow_credentials=cors_config.get('allow_credentials', True),
+        allow_methods=cors_config.get('allow_methods', ["*"]),
+        allow_headers=cors_config.get('allow_headers', ["*"]),
+    )
+
+    # 요청 ID 지정 (가장 바깥에서 실행되도록 마지막에 추가)
+    app.add_middleware(RequestContextMiddleware)
+    APP_CREATE_SECONDS = time.perf_counter() - started
+    return app
+
+
+def __getattr__(name: str):
+    """
+    `uvicorn server:app`처럼 server.app을 처음 찾을 때 create_app()으로 앱을 만듭니다.
+    모듈을 불러오기만 해서는 설정을 읽거나 저장소를 만들지 않습니다.
+    """
+    if name == "app":
+        global app
+        app = create_app()
+        return app
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+# 지원하는 오디오 형식
+ALLOWED_EXTENSIONS = {'mp3', 'wav', 'm4a', 'ogg', 'flac', 'aac', 'wma', 'webm'}
+
+# Gemini 프롬프트 (내용을 바꾸면 버전도 올려서 이전 캐시 결과가 재사용되지 않도록 합니다)
+TRANSCRIPTION_PROMPT_VERSION = "1"
+TRANSCRIPTION_PROMPT = "이 오디오 파일의 내용을 텍스트로 정확하게 변환해줘. 말한 내용을 그대로 적어줘."
+
+SUMMARY_PROMPT_VERSION = "1"
+SUMMARY_PROMPT_TEMPLATE = """
+다음은 음성을 텍스트로 변환한 내용입니다:
+
+{original_text}
+
+위 내용을 다음 형식으로 요약해줘:
+
+## 📋 주요 내용
+- 핵심 주제와 내용을 정리
+
+## 💡 핵심 포인트
+- 중요한 내용이나 결정 사항
+
+## 📌 실행 항목 (있는 경우)
+- 향후 해야 할 일이나 행동 계획
+
+명확하고 간결하게 작성해줘. 만약 회의 내용이 아니면 그에 맞게 적절히 요약해줘.
+"""
+
+# 한 번의 호출로 텍스트 변환과 요약을 함께 요청하는 프롬프트 (JSON 응답)
+SINGLE_CALL_PROMPT_VERSION = "1"
+SINGLE_CALL_PROMPT = """
+이 오디오 파일의 내용을 텍스트로 정확하게 변환하고, 변환한 내용을 요약해줘.
+
+- original_text: 말한 내용을 그대로 적은 전체 텍스트
+- summary: 아래 형식의 요약
+
+## 📋 주요 내용
+- 핵심 주제와 내용을 정리
+
+## 💡 핵심 포인트
+- 중요한 내용이나 결정 사항
+
+## 📌 실행 항목 (있는 경우)
+- 향후 해야 할 일이나 행동 계획
+
+요약은 명확하고 간결하게 작성해줘. 만약 회의 내용이 아니면 그에 맞게 적절히 요약해줘.
+"""
+
+SINGLE_CALL_RESPONSE_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "original_text": {"type": "string"},
+        "summary": {"type": "string"}
+    },
+    "required": ["original_text", "summary"]
+}
+
+# 긴 텍스트 요약용 프롬프트 (조각별 요약 → 최종 요약)
+MAP_REDUCE_PROMPT_VERSION = "1"
+CHUNK_SUMMARY_PROMPT_TEMPLATE = """
+다음은 긴 음성 변환 텍스트의 일부분({index}/{total})입니다:
+
+{chunk_text}
+
+이 부분에서 다룬 주제, 중요한 내용이나 결정 사항, 향후 해야 할 일을 빠짐없이 간결하게 정리해줘.
+"""
+
+REDUCE_SUMMARY_PROMPT_TEMPLATE = """
+다음은 긴 음성 변환 텍스트를 부분별로 정리한 내용입니다:
+
+{partial_summaries}
+
+위 내용을 종합해서 다음 형식으로 요약해줘:
+
+## 📋 주요 내용
+- 핵심 주제와 내용을 정리
+
+## 💡 핵심 포인트
+- 중요한 내용이나 결정 사항
+
+## 📌 실행 항목 (있는 경우)
+- 향후 해야 할 일이나 행동 계획
+
+명확하고 간결하게 작성해줘. 만약 회의 내용이 아니면 그에 맞게 적절히 요약해줘.
+"""
+
+# Gemini 모델 객체, 업로드 파일 재사용, 결과 캐시, 처리 결과 보관, 요청 한도, 모델 선택, 호출 제한,
+# 준비 상태 확인 (create_services에서 생성)
+model_registry = None
+uploaded_files = None
+result_cache = None
+transcript_store = None
+rate_limiter = None
+model_router = None
+resilience = None
+readiness = None
+
+
+def check_gemini_connection():
+    """Gemini API에 연결할 수 있는지 확인합니다 (모델 목록 조회, 생성 요청 한도를 쓰지 않음, 실패 시 예외 발생)."""
+    next(iter(load_genai().list_models(page_size=1, request_options={"timeout": readiness.check_timeout})), None)
+
+
+def create_services(app_config: dict):
+    """
+    저장소, 캐시, 요청 한도 등 요청 처리에 필요한 객체를 만듭니다 (SQLite 파일/디렉토리를 열거나 만듦).
+    apply_settings를 먼저 호출해야 합니다.
+    
+    Args:
+        app_config: 설정 딕셔너리
+    """
+    global job_store, upload_sessions, model_registry, uploaded_files, result_cache, transcript_store
+    global rate_limiter, model_router, resilience, readiness
+    
+    # Gemini 모델 객체와 업로드 파일 재사용
+    # 업로드 파일은 upload_reuse_ttl_seconds 동안 보관하여 재시도 시 다시 업로드하지 않습니다 (0이면 사용 후 바로 삭제)
+    model_registry = ModelRegistry()
+    uploaded_files = UploadedFileRegistry(gemini_config.get('upload_reuse_ttl_seconds', 0))
+    
+    job_store = create_job_store(jobs_config)
+    upload_sessions = create_upload_session_store(upload_config, MAX_UPLOAD_BYTES)
+    
+    # 결과 캐시 (같은 파일이 다시 업로드되면 Gemini 호출 없이 결과 반환)
+    result_cache = create_result_cache(app_config.get('cache', {}))
+    
+    # 처리 결과 보관 (/transcripts로 검색, 사용하지 않으면 None)
+    transcript_store = create_transcript_store(app_config.get('transcripts', {}))
+    
+    # Gemini 요청 한도 관리 (모델별 분당/일일 요청 수)
+    quota_config = app_config.get('quota', {})
+    if WORKERS > 1:
+        # 한도는 서버 전체 기준이므로 모든 워커가 SQLite 사용량 저장소를 함께 사용
+        quota_config = dict(quota_config, store='sqlite')
+    rate_limiter = create_rate_limiter(quota_config)
+    
+    # 요청별 모델 선택 (gemini.models, 없으면 gemini.model 하나만 사용)
+    model_router = create_model_router(gemini_config, rate_limiter)
+    
+    # Gemini 호출 제한 시간/재시도/회로 차단기
+    resilience = create_resilience(app_config.get('resilience', {}))
+    
+    # 준비 상태 확인 (/ready): 요청 처리에 쓰는 디렉토리에 쓸 수 있는지 확인
+    log_config = app_config.get('logging', {})
+    readiness_dirs = {
+        "temp": tempfile.gettempdir(),
+        "log": log_config.get('log_dir') or log_config.get('log_path', 'logs')
+    }
+    if upload_sessions.temp_dir:
+        readiness_dirs["upload"] = upload_sessions.temp_dir
+    if result_cache and result_cache.disk_dir:
+        readiness_dirs["cache"] = result_cache.disk_dir
+    if transcript_store:
+        readiness_dirs["transcripts"] = os.path.dirname(transcript_store.db_path) or "."
+    readiness = create_readiness_checker(app_config.get('readiness', {}), readiness_dirs, check_gemini_connection)
+
+
+def convert_audio_to_lightweight_mp3(input_file_path: str) -> tuple:
+    """
+    다양한 형식의 오디오 파일을 경량 MP3로 변환합니다.
+    비용 절감을 위해 32kbps 비트레이트를 사용합니다.
+    이미 가벼운 mp3/ogg/aac 파일은 변환하지 않고, m4a/webm 등은 가능하면 디코딩 없이 리먹스합니다.
+    전처리를 사용하면 변환 전후의 길이와 크기를 함께 확인합니다.
+    
+    Args:
+        input_file_path: 입력 오디오 파일 경로
+    
+    Returns:
+        (업로드할 파일 경로, 전처리 결과) 튜플
+        - 파일 경로: 변환하지 않은 경우 입력 파일 경로 그대로, 그 외에는 임시 파일
+        - 전처리 결과: measure_preprocessing 결과 (전처리를 하지 않았으면 None)
+    """
+    logging.info(f"[변환] 오디오 변환 시작: {input_file_path}")
+    
+    try:
+        output_file_path = convert_audio(input_file_path, AUDIO_OPTIONS)
+        
+        # 파일 크기 확인
+        file_size = os.path.getsize(output_file_path) / (1024 * 1024)  # MB
+        if output_file_path == input_file_path:
+            logging.info(f"[변환] 이미 경량 파일이므로 변환 생략 ({file_size:.2f}MB)")
+            return output_file_path, None
+        
+        logging.info(f"[변환] 완료: {output_file_path} ({file_size:.2f}MB)")
+        preprocessing = None
+        if PREPROCESS_FILTER:
+            preprocessing = measure_preprocessing(input_file_path, output_file_path)
+            logging.info(
+                f"[전처리] 길이 {preprocessing['input_seconds']:.1f}초 → {preprocessing['output_seconds']:.1f}초, "
+                f"크기 {preprocessing['input_bytes'] / (1024 * 1024):.2f}MB → "
+                f"{preprocessing['output_bytes'] / (1024 * 1024):.2f}MB"
+            )
+        return output_file_path, preprocessing
+    
+    except Exception as e:
+        logging.error(f"[오류] 오디오 변환 중 오류 발생: {e}")
+        raise
 
 
-# 설정 로드
-config = load_config()
+def upload_audio_to_gemini(audio_file_path: str):
+    """
+    오디오 파일을 Gemini에 업로드합니다.
+    
+    Args:
+        audio_file_path: 업로드할 오디오 파일 경로
+    
+    Returns:
+        업로드된 파일 객체
+    """
+    logging.info(f"[업로드] Gemini에 파일 업로드 중...")
+    
+    try:
+        # upload_file에는 제한 시간 옵션이 없으므로 별도 스레드에서 기다림
+        with track_stage(STAGE_UPLOAD):
+            # 제한 시간이 지난 뒤에 끝난 업로드는 사용하지 않으므로 Gemini에서 삭제
+            uploaded_file = resilience.call(STAGE_UPLOAD, lambda timeout: resilience.run_with_deadline(
+                STAGE_UPLOAD, timeout, load_genai().upload_file, audio_file_path,
+                mime_type=get_mime_type(audio_file_path), on_late_result=delete_remote_file
+            ))
+        logging.info(f"[업로드] 완료: {uploaded_file.name}")
+        return uploaded_file
+    
+    except Exception as e:
+        # API 할당량 초과 에러 처리
+        raise_if_quota_exceeded(e)
+        logging.error(f"[오류] 파일 업로드 중 오류 발생: {e}")
+        raise
+
+
+def run_with_context(func, *args):
+    """
+    현재 컨텍스트(요청 우선순위, 요청 ID, span 등)를 복사해 함수를 실행하도록 감쌉니다.
+    run_in_executor는 컨텍스트 변수를 스레드로 전달하지 않으므로 I/O 실행기에서 실행하는 함수에 사용합니다.
+    """
+    return partial(contextvars.copy_context().run, func, *args)
+
+
+def run_with_request_id(func, *args):
+    """
+    변환 실행기(별도 프로세스일 수 있음)에서 실행할 함수를 현재 요청 ID와 함께 감쌉니다.
+    컨텍스트는 프로세스로 전달할 수 없으므로 요청 ID만 넘겨 로그를 요청과 연결합니다.
+    """
+    return partial(call_with_request_id, current_request_id(), func, *args)
+
+
+def wait_for_gemini_quota(model_name: str):
+    """Gemini 호출 전에 모델별 요청 한도에 맞춰 차례를 기다립니다 (스레드에서 호출)."""
+    if rate_limiter:
+        rate_limiter.acquire(model_name)
+
+
+def expected_gemini_calls(mode: str) -> int:
+    """분석 방식별 요청당 예상 Gemini 호출 수"""
+    return 1 if mode == MODE_SINGLE_CALL else 2
+
+
+async def check_gemini_quota(mode: str):
+    """
+    요청을 처리하기 전에 일일 한도가 남아 있는지 확인합니다.
+    변환/업로드 전에 거절하여 결국 실패할 요청에 자원을 쓰지 않도록 합니다.
+    한도 저장소(SQLite)를 읽으므로 이벤트 루프를 막지 않도록 스레드에서 확인합니다.
+    
+    Args:
+        mode: 분석 방식 (예상 호출 수 계산용)
+    
+    Raises:
+        HTTPException: 일일 한도가 부족한 경우 (429, Retry-After 헤더 포함)
+    """
+    if rate_limiter is None:
+        return
+    loop = asyncio.get_running_loop()
+    try:
+        await loop.run_in_executor(io_executor, model_router.check_admission, expected_gemini_calls(mode))
+    except QuotaExceededError as e:
+        logging.warning(f"[할당량] 일일 한도 부족으로 요청 거절 (초기화까지 {e.retry_after}초)")
+        raise HTTPException(status_code=429, detail=str(e), headers={"Retry-After": str(e.retry_after)})
+
+
+# 분당 한도 초과 안내 메시지 (일일 한도와 달리 잠시 후 다시 시도하면 됨)
+RATE_LIMITED_MESSAGE = "Gemini 분당 요청 한도를 초과했습니다. 잠시 후 다시 시도해주세요."
+
+
+def is_quota_error(error: Exception) -> bool:
+    """요청 한도 초과 오류(일일 또는 분당)인지 확인합니다."""
+    if isinstance(error, QuotaExceededError):
+        return True
+    error_message = str(error).lower()
+    return any(keyword in error_message for keyword in ('quota', '429', 'exhausted', 'rate limit'))
+
+
+def is_daily_quota_error(error: Exception) -> bool:
+    """
+    일일 한도 초과 오류인지 확인합니다.
+    Gemini 429 응답은 초과한 한도 이름(...PerDay... / ...PerMinute...)을 알려 주므로,
+    일일 한도라고 확인되지 않은 429는 분당 한도 초과로 취급합니다.
+    """
+    if isinstance(error, QuotaExceededError):
+        return True
+    if not is_quota_error(error):
+        return False
+    error_message = str(error).lower().replace(" ", "")
+    return 'perday' in error_message or 'daily' in error_message
+
+
+def raise_if_quota_exceeded(error: Exception):
+    """
+    API 할당량 초과 오류이면 사용자 안내 메시지로 바꿔서 발생시킵니다.
+    
+    Args:
+        error: Gemini API 호출 중 발생한 예외
+    """
+    if isinstance(error, QuotaExceededError):
+        # 이미 안내 메시지와 Retry-After 정보가 있으므로 그대로 전달
+        return
+    if is_daily_quota_error(error):
+        raise Exception("일일 사용량이 초과되었습니다. 내일 다시 시도해주세요.")
+    if is_quota_error(error):
+        raise Exception(RATE_LIMITED_MESSAGE)
+
+
+def call_gemini(stage: str, contents, model_name: str, on_text=None, generation_config: dict = None,
+                hedge: bool = False) -> tuple:
+    """
+    요청 한도, 단계별 제한 시간, 재시도를 적용하여 Gemini 응답 텍스트를 생성합니다.
+    모델의 일일 한도가 초과되면 아직 시도하지 않은 대체 모델로 한 번씩만 이어서 처리합니다.
+    
+    Args:
+        stage: 호출 단계 (transcribe, summarize)
+        contents: 프롬프트 (문자열 또는 [프롬프트, 업로드 파일] 목록)
+        model_name: 사용할 모델 이름
+        on_text: 생성되는 텍스트 조각을 받는 함수 (선택, 지정하면 스트리밍으로 요청)
+        generation_config: 생성 설정 (선택)
+        hedge: 응답이 늦을 때 같은 요청을 한 번 더 보낼지 여부 (resilience.hedge 설정이 켜져 있을 때만)
+    
+    Returns:
+        (응답 텍스트, 실제로 응답한 모델 이름) 튜플 (다음 단계는 이 모델로 호출)
+    """
+    streamed = []
+    tried = set()
+    
+    def on_chunk(text: str):
+        streamed.append(text)
+        on_text(text)
+    
+    with track_stage(stage):
+        while True:
+            tried.add(model_name)
+            model = model_registry.get(model_name, generation_config)
+            
+            def attempt(timeout: float, model_name=model_name, model=model) -> str:
+                wait_for_gemini_quota(model_name)
+                return generate_text(model, contents, on_chunk if on_text else None, timeout)
+            
+            try:
+                # 스트리밍으로 이미 일부를 보낸 뒤에는 다시 시도하면 내용이 중복되므로 재시도/hedging하지 않음
+                text = resilience.call(
+                    stage, attempt,
+                    hedge=hedge and on_text is None,
+                    retry_allowed=lambda: not streamed
+                )
+                return text, model_name
+            except Exception as e:
+                if streamed or not is_daily_quota_error(e):
+                    raise
+                # 일일 한도가 초과된 모델 대신 아직 시도하지 않은 모델로 이어서 처리
+                fallback_model = model_router.fallback(model_name, exclude=tried)
+                if fallback_model is None:
+                    raise
+                logging.warning(f"[모델] {model_name} 한도 초과, {fallback_model}(으)로 전환합니다: {e}")
+                # 요청의 처리 중 수를 실제로 응답할 모델로 옮겨 이후 모델 선택에 반영
+                model_router.switch(model_name, fallback_model)
+                model_name = fallback_model
+
+
+def transcribe_audio_with_gemini(uploaded_file, model_name: str, on_text=None) -> tuple:
+    """
+    Gemini에 업로드된 오디오를 텍스트로 변환합니다.
+    
+    Args:
+        uploaded_file: Gemini에 업로드된 파일 객체
+        model_name: 사용할 모델 이름
+        on_text: 생성되는 텍스트 조각을 받는 함수 (선택, 지정하면 스트리밍으로 요청)
+    
+    Returns:
+        (변환된 원본 텍스트, 응답한 모델 이름) 튜플
+    """
+    try:
+        return call_gemini(STAGE_TRANSCRIBE, [TRANSCRIPTION_PROMPT, uploaded_file], model_name, on_text, hedge=True)
+    
+    except Exception as e:
+        raise_if_quota_exceeded(e)
+        logging.error(f"[오류] 텍스트 변환 중 오류 발생: {e}")
+        raise
+
+
+def generate_text_with_gemini(prompt: str, model_name: str, on_text=None) -> tuple:
+    """
+    텍스트 프롬프트로 Gemini 응답을 생성합니다.
+    
+    Args:
+        prompt: 프롬프트
+        model_name: 사용할 모델 이름
+        on_text: 생성되는 텍스트 조각을 받는 함수 (선택, 지정하면 스트리밍으로 요청)
+    
+    Returns:
+        (응답 텍스트, 응답한 모델 이름) 튜플
+    """
+    try:
+        return call_gemini(STAGE_SUMMARIZE, prompt, model_name, on_text)
+    
+    except Exception as e:
+        raise_if_quota_exceeded(e)
+        logging.error(f"[오류] 요약 생성 중 오류 발생: {e}")
+        raise
+
+
+def summarize_text_with_gemini(original_text: str, model_name: str, on_text=None) -> tuple:
+    """
+    변환된 텍스트를 요약합니다.
+    텍스트가 gemini.map_reduce_threshold_chars보다 길면 조각별로 나눠 요약한 뒤 종합합니다.
+    
+    Args:
+        original_text: 음성을 변환한 원본 텍스트
+        model_name: 사용할 모델 이름
+        on_text: 생성되는 요약 조각을 받는 함수 (선택, 지정하면 스트리밍으로 요청)
+    
+    Returns:
+        (요약본, 응답한 모델 이름) 튜플
+    """
+    if len(original_text) > MAP_REDUCE_THRESHOLD_CHARS:
+        return summarize_long_text_with_gemini(original_text, model_name, on_text)
+    
+    return generate_text_with_gemini(
+        SUMMARY_PROMPT_TEMPLATE.format(original_text=original_text), model_name, on_text
+    )
+
+
+def summarize_long_text_with_gemini(original_text: str, model_name: str, on_text=None) -> tuple:
+    """
+    긴 텍스트를 조각으로 나눠 동시에 요약(map)한 뒤, 부분 요약을 최종 형식으로 종합(reduce)합니다.
+    부분 요약을 합친 내용도 기준보다 길면 같은 방식으로 한 번 더 줄입니다.
+    
+    Args:
+        original_text: 음성을 변환한 원본 텍스트
+        model_name: 사용할 모델 이름
+        on_text: 최종 요약 조각을 받는 함수 (선택, 부분 요약은 전달하지 않음)
+    
+    Returns:
+        (요약본, 응답한 모델 이름) 튜플
+    """
+    text = original_text
+    level = 1
+    while True:
+        chunks = split_text(text, MAP_REDUCE_CHUNK_CHARS)
+        logging.info(f"[요약] {len(text):,}자 텍스트를 {len(chunks)}개 조각으로 나눠 요약합니다 (단계 {level})")
+        
+        prompts = [
+            CHUNK_SUMMARY_PROMPT_TEMPLATE.format(index=index + 1, total=len(chunks), chunk_text=chunk)
+            for index, chunk in enumerate(chunks)
+        ]
+        # 요청마다 스레드를 만들지 않고 공유 스레드 풀 사용 (동시에 요약하는 조각 수를 서버 전체에서 제한)
+        futures = [
+            map_executor.submit(run_with_context(generate_text_with_gemini, prompt, model_name)) for prompt in prompts
+        ]
+        try:
+            responses = [future.result() for future in futures]
+        except BaseException:
+            # 한 조각이 실패하면 아직 시작하지 않은 조각은 요약하지 않음
+            for future in futures:
+                future.cancel()
+            raise
+        partial_summaries = [summary for summary, _ in responses]
+        # 조각 요약 중 다른 모델로 전환된 것이 있으면 이후 단계도 그 모델 사용
+        model_name = next((used for _, used in responses if used != model_name), model_name)
+        
+        text = "\n\n".join(
+            f"### 부분 {index + 1}\n{summary.strip()}" for index, summary in enumerate(partial_summaries)
+        )
+        if len(text) <= MAP_REDUCE_THRESHOLD_CHARS or len(chunks) == 1:
+            break
+        level += 1
+    
+    logging.info("[요약] 부분 요약을 종합하는 중...")
+    return generate_text_with_gemini(
+        REDUCE_SUMMARY_PROMPT_TEMPLATE.format(partial_summaries=text), model_name, on_text
+    )
+
+
+class ModeStats:
+    """분석 방식별 호출 수와 처리 시간을 집계합니다 (방식 간 지연 시간/사용량 비교용)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stats = {
+            mode: {"requests": 0, "gemini_calls": 0, "fallbacks": 0, "total_seconds": 0.0}
+            for mode in GEMINI_MODES
+        }
+
+    def record(self, mode: str, seconds: float, gemini_calls: int, fallback: bool = False):
+        """분석 1건의 결과를 기록합니다."""
+        with self._lock:
+            stats = self._stats[mode]
+            stats["requests"] += 1
+            stats["gemini_calls"] += gemini_calls
+            stats["total_seconds"] += seconds
+            if fallback:
+                stats["fallbacks"] += 1
+
+    def summary(self) -> dict:
+        """방식별 요청 수, 평균 처리 시간, 요청당 Gemini 호출 수를 반환합니다."""
+        with self._lock:
+            return {
+                mode: {
+                    "requests": stats["requests"],
+                    "fallbacks": stats["fallbacks"],
+                    "avg_seconds": round(stats["total_seconds"] / stats["requests"], 3) if stats["requests"] else 0.0,
+                    "avg_gemini_calls": round(stats["gemini_calls"] / stats["requests"], 2) if stats["requests"] else 0.0
+                }
+                for mode, stats in self._stats.items()
+            }
+
+
+mode_stats = ModeStats()
+
+
+def transcribe_and_summarize_in_one_call(uploaded_file, model_name: str) -> dict:
+    """
+    한 번의 Gemini 호출로 텍스트 변환과 요약을 함께 생성합니다 (JSON 응답).
+    
+    Args:
+        uploaded_file: Gemini에 업로드된 파일 객체
+        model_name: 사용할 모델 이름
+    
+    Returns:
+        {"summary": "요약본", "original_text": "원본 텍스트", "model": "응답한 모델"} 형태의 딕셔너리
+    
+    Raises:
+        ValueError: 응답을 JSON으로 해석할 수 없는 경우
+    """
+    try:
+        response_text, model_name = call_gemini(
+            STAGE_TRANSCRIBE,
+            [SINGLE_CALL_PROMPT, uploaded_file],
+            model_name,
+            generation_config={
+                "response_mime_type": "application/json",
+                "response_schema": SINGLE_CALL_RESPONSE_SCHEMA
+            },
+            hedge=True
+        )
+    
+    except ValueError:
+        # 응답이 비어 있는 경우 (안전 필터 등)
+        raise
+    except Exception as e:
+        raise_if_quota_exceeded(e)
+        logging.error(f"[오류] 텍스트 변환/요약 중 오류 발생: {e}")
+        raise
+    
+    data = json.loads(response_text)
+    if not isinstance(data, dict) or not isinstance(data.get("original_text"), str) \
+            or not isinstance(data.get("summary"), str):
+        raise ValueError("응답에 original_text/summary 항목이 없습니다.")
+    return {
+        "summary": data["summary"],
+        "original_text": data["original_text"],
+        "model": model_name
+    }
+
+
+def summarize_audio_with_gemini(uploaded_file, model_name: str, progress_callback=None, mode: str = None,
+                                text_callback=None) -> dict:
+    """
+    Gemini 1.5 Flash 무료 모델을 사용하여 오디오 내용을 텍스트로 변환하고 요약합니다.
+    
+    Args:
+        uploaded_file: Gemini에 업로드된 파일 객체
+        model_name: 사용할 모델 이름 (한도 초과로 전환되면 이후 단계는 전환된 모델 사용)
+        progress_callback: 단계가 바뀔 때 단계 이름으로 호출되는 함수 (선택)
+        mode: 분석 방식 (two_step, single_call, 기본값: gemini.mode 설정)
+        text_callback: 텍스트가 생성되는 대로 ("original_text" 또는 "summary", 텍스트 조각)으로
+            호출되는 함수 (선택, single_call 방식은 JSON 응답이므로 조각을 전달하지 않음)
+    
+    Returns:
+        {"summary": "요약본", "original_text": "원본 텍스트", "model": "마지막으로 응답한 모델"} 형태의 딕셔너리
+    """
+    mode = mode or GEMINI_MODE
+    start_time = time.perf_counter()
+    logging.info(f"[분석] Gemini ({model_name})로 음성 분석 중... (방식: {mode})")
+    
+    if mode == MODE_SINGLE_CALL:
+        logging.info("[분석] 텍스트 변환과 요약을 한 번에 생성 중...")
+        if progress_callback:
+            progress_callback(JOB_TRANSCRIBING)
+        try:
+            result = transcribe_and_summarize_in_one_call(uploaded_file, model_name)
+            mode_stats.record(mode, time.perf_counter() - start_time, gemini_calls=1)
+            logging.info("[분석] 완료!")
+            return result
+        except ValueError as e:
+            # JSON 응답을 해석하지 못하면 2단계 방식으로 다시 처리
+            logging.warning(f"[분석] 한 번에 생성한 응답을 해석하지 못해 2단계 방식으로 처리합니다: {e}")
+    
+    # 1단계: 원본 텍스트 추출
+    logging.info("[분석] 1단계 - 음성을 텍스트로 변환 중...")
+    if progress_callback:
+        progress_callback(JOB_TRANSCRIBING)
+    original_text, model_name = transcribe_audio_with_gemini(
+        uploaded_file, model_name, partial(text_callback, "original_text") if text_callback else None
+    )
+    
+    # 2단계: 요약 생성
+    logging.info("[분석] 2단계 - 내용 요약 생성 중...")
+    if progress_callback:
+        progress_callback(JOB_SUMMARIZING)
+    summary, model_name = summarize_text_with_gemini(
+        original_text, model_name, partial(text_callback, "summary") if text_callback else None
+    )
+    
+    if mode == MODE_SINGLE_CALL:
+        mode_stats.record(mode, time.perf_counter() - start_time, gemini_calls=3, fallback=True)
+    else:
+        mode_stats.record(mode, time.perf_counter() - start_time, gemini_calls=2)
+    
+    logging.info("[분석] 완료!")
+    return {
+        "summary": summary,
+        "original_text": original_text,
+        "model": model_name
+    }
+
+
+@traced("transcribe_in_segments")
+async def transcribe_in_segments(audio_file_path: str, duration: float, model_name: str) -> tuple:
+    """
+    긴 오디오를 구간으로 나눠 동시에 업로드/텍스트 변환한 뒤 순서대로 이어 붙입니다.
+    한 구간이라도 실패하면 나머지 구간을 취소하며, 겹치게 자른 경계의 중복 텍스트는 제거합니다.
+    
+    Args:
+        audio_file_path: 변환된 오디오 파일 경로
+        duration: 오디오 길이 (초)
+        model_name: 사용할 모델 이름
+    
+    Returns:
+        (전체 변환 텍스트, 응답한 모델 이름) 튜플 (구간 중 다른 모델로 전환된 것이 있으면 그 모델)
+    """
+    loop = asyncio.get_running_loop()
+    
+    silences = []
+    if SEGMENT_SPLIT_ON_SILENCE:
+        silences = await loop.run_in_executor(cpu_executor, run_with_request_id(
+            detect_silences, audio_file_path, SEGMENT_SILENCE_THRESHOLD_DB, SEGMENT_SILENCE_MIN_SECONDS
+        ))
+    segments = plan_segments(duration, SEGMENT_SECONDS, SEGMENT_OVERLAP_SECONDS, silences)
+    logging.info(f"[분할] {duration / 60:.1f}분 오디오를 {len(segments)}개 구간으로 나눠 처리합니다.")
+    
+    segment_paths = await loop.run_in_executor(
+        cpu_executor, run_with_request_id(split_audio, audio_file_path, segments)
+    )
+    semaphore = asyncio.Semaphore(SEGMENT_PARALLELISM)
+    
+    async def transcribe_segment(index: int, segment_path: str) -> tuple:
+        # 일시적인 오류는 업로드/변환 호출마다 resilience 설정으로 다시 시도하므로 여기서는 다시 시도하지 않음
+        async with semaphore:
+            upload_key = None
+            try:
+                upload = loop.run_in_executor(
+                    io_executor, run_with_context(uploaded_files.acquire, segment_path, upload_audio_to_gemini)
+                )
+                try:
+                    uploaded_file, upload_key = await asyncio.shield(upload)
+                except asyncio.CancelledError:
+                    # 업로드 중에 취소되면 구간 파일을 다 읽고 업로드가 끝날 때까지 기다렸다가 해제
+                    outcome, = await asyncio.gather(upload, return_exceptions=True)
+                    if not isinstance(outcome, BaseException):
+                        upload_key = outcome[1]
+                    raise
+                response = await loop.run_in_executor(
+                    io_executor, run_with_context(transcribe_audio_with_gemini, uploaded_file, model_name)
+                )
+                logging.info(f"[분할] 구간 {index + 1}/{len(segment_paths)} 변환 완료")
+                return response
+            finally:
+                if upload_key:
+                    await loop.run_in_executor(io_executor, run_with_context(uploaded_files.release, upload_key))
+    
+    tasks = [
+        asyncio.ensure_future(transcribe_segment(index, segment_path))
+        for index, segment_path in enumerate(segment_paths)
+    ]
+    try:
+        responses = await asyncio.gather(*tasks)
+    finally:
+        # 한 구간이 실패하면 나머지 구간은 취소하고, 모두 정리된 뒤에 구간 파일 삭제
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        for segment_path in segment_paths:
+            remove_temp_file(segment_path, "구간 파일")
+    
+    used_model = next((used for _, used in responses if used != model_name), model_name)
+    return stitch_transcripts([text for text, _ in responses]), used_model
+
+
+def remove_temp_file(file_path: str, label: str = "임시 파일"):
+    """
+    임시 파일을 삭제합니다 (개인정보 보호).
+    
+    Args:
+        file_path: 삭제할 파일 경로
+        label: 로그에 표시할 파일 종류
+    """
+    if file_path and os.path.exists(file_path):
+        try:
+            os.remove(file_path)
+            logging.info(f"[삭제] {label} 삭제 완료: {file_path}")
+        except Exception as e:
+            logging.error(f"[오류] {label} 삭제 실패: {e}")
+
+
+@traced("process_audio_file")
+async def process_audio_file(input_file_path: str, progress_callback=None, mode: str = None,
+                             text_callback=None) -> dict:
+    """
+    오디오 파일을 처리하여 텍스트 변환 및 요약을 생성합니다.
+    변환은 CPU 실행기에서, Gemini 호출은 I/O 실행기에서 실행하여 이벤트 루프를 막지 않습니다.
+    처리가 완료되면 변환된 파일을 자동으로 삭제합니다 (개인정보 보호).
+    
+    Args:
+        input_file_path: 입력 오디오 파일 경로
+        progress_callback: 단계가 바뀔 때 단계 이름으로 호출되는 함수 (선택, I/O 실행기 스레드에서 호출)
+        mode: 분석 방식 (two_step, single_call, 기본값: gemini.mode 설정)
+        text_callback: 텍스트가 생성되는 대로 ("original_text" 또는 "summary", 텍스트 조각)으로
+            호출되는 함수 (선택, 스레드에서 호출될 수 있음)
+    
+    Returns:
+        {"summary": "요약본", "original_text": "원본 텍스트", "model": "사용한 모델",
+        "duration_seconds": 오디오 길이 (확인하지 않았으면 None)} 형태의 딕셔너리
+    """
+    loop = asyncio.get_running_loop()
+    mp3_file_path = None
+    upload_key = None
+    
+    async def report(stage: str):
+        # 작업 상태 기록(SQLite 저장소일 수 있음)이 이벤트 루프를 막지 않도록 스레드에서 호출
+        if progress_callback:
+            await loop.run_in_executor(io_executor, progress_callback, stage)
+    
+    try:
+        # 1. 오디오 파일을 경량 MP3로 변환
+        await report(JOB_CONVERTING)
+        with track_stage(STAGE_CONVERT):
+            mp3_file_path, preprocessing = await loop.run_in_executor(
+                cpu_executor, run_with_request_id(convert_audio_to_lightweight_mp3, input_file_path)
+            )
+        CONVERTED_BYTES.observe(os.path.getsize(mp3_file_path))
+        if preprocessing:
+            for phase in ("input", "output"):
+                PREPROCESS_SECONDS.inc(preprocessing[f"{phase}_seconds"], phase=phase)
+                PREPROCESS_BYTES.inc(preprocessing[f"{phase}_bytes"], phase=phase)
+        
+        # 긴 오디오 분할과 모델 선택에 사용할 오디오 길이
+        duration = 0
+        if SEGMENTATION_ENABLED or model_router.uses_duration:
+            duration = await loop.run_in_executor(
+                cpu_executor, run_with_request_id(get_audio_duration, mp3_file_path)
+            )
+            AUDIO_DURATION.observe(duration)
+        
+        # 오디오 길이, 우선순위, 모델별 부하/남은 한도로 사용할 모델 선택 (한도 저장소를 읽으므로 스레드에서 실행)
+        model_name = await loop.run_in_executor(io_executor, partial(
+            model_router.route, duration, request_priority.get(), expected_gemini_calls(mode)
+        ))
+        
+        with model_router.track(model_name):
+            # 긴 오디오는 구간별로 나눠 병렬로 텍스트 변환
+            if SEGMENTATION_ENABLED and duration >= SEGMENT_MIN_DURATION:
+                await report(JOB_TRANSCRIBING)
+                original_text, model_name = await transcribe_in_segments(mp3_file_path, duration, model_name)
+                # 구간 텍스트는 이어 붙인 뒤 한 번에 전달 (겹침 제거 후)
+                if text_callback:
+                    text_callback("original_text", original_text)
+                
+                await report(JOB_SUMMARIZING)
+                summary, model_name = await loop.run_in_executor(io_executor, run_with_context(
+                    summarize_text_with_gemini, original_text, model_name,
+                    partial(text_callback, "summary") if text_callback else None
+                ))
+                return {
+                    "summary": summary,
+                    "original_text": original_text,
+                    "model": model_name,
+                    "duration_seconds": duration
+                }
+            
+            # 2. Gemini에 파일 업로드 (같은 파일이 이미 업로드되어 있으면 재사용)
+            await report(JOB_UPLOADING)
+            uploaded_file, upload_key = await loop.run_in_executor(
+                io_executor, run_with_context(uploaded_files.acquire, mp3_file_path, upload_audio_to_gemini)
+            )
+            
+            # 3. Gemini로 요약 생성
+            result = await loop.run_in_executor(io_executor, run_with_context(
+                summarize_audio_with_gemini, uploaded_file, model_name, progress_callback, mode, text_callback
+            ))
+            
+            return dict(result, duration_seconds=duration or None)
+    
+    except Exception as e:
+        logging.error(f"[오류] 처리 중 오류 발생: {e}")
+        raise
+    
+    finally:
+        with track_stage(STAGE_CLEANUP):
+            # Gemini 업로드 파일 사용 완료 (보관 시간이 0이면 바로 삭제)
+            if upload_key:
+                await loop.run_in_executor(io_executor, run_with_context(uploaded_files.release, upload_key))
+            
+            # 처리 완료 후 변환된 MP3 파일 삭제 (개인정보 보호)
+            # 변환을 생략한 경우 원본은 호출한 쪽에서 삭제합니다
+            if mp3_file_path != input_file_path:
+                remove_temp_file(mp3_file_path)
+
+
+def get_cache_key(upload_hash: str, mode: str = None) -> str:
+    """
+    업로드된 파일 내용의 해시, 사용 모델, 분석 방식, 프롬프트 버전으로 결과 캐시 키를 계산합니다.
+    
+    Args:
+        upload_hash: 업로드된 원본 파일의 SHA-256 해시
+        mode: 분석 방식 (기본값: gemini.mode 설정)
+    
+    Returns:
+        캐시 키
+    """
+    mode = mode or GEMINI_MODE
+    prompt_version = SINGLE_CALL_PROMPT_VERSION if mode == MODE_SINGLE_CALL else TRANSCRIPTION_PROMPT_VERSION
+    return make_cache_key(
+        upload_hash,
+        "+".join(model_router.model_names()),
+        mode,
+        prompt_version,
+        SUMMARY_PROMPT_VERSION,
+        MAP_REDUCE_PROMPT_VERSION,
+        # 전처리 설정이 바뀌면 Gemini에 보내는 오디오가 달라지므로 다른 결과로 취급
+        *([PREPROCESS_FILTER] if PREPROCESS_FILTER else [])
+    )
+
+
+async def lookup_cached_result(upload_hash: str, mode: str = None):
+    """
+    결과 캐시에서 같은 파일의 이전 처리 결과를 찾습니다.
+    
+    Args:
+        upload_hash: 업로드된 원본 파일의 SHA-256 해시
+        mode: 분석 방식 (기본값: gemini.mode 설정)
+    
+    Returns:
+        (캐시 키, 캐시된 결과) 튜플 (캐시가 꺼져 있으면 키는 None, 결과가 없으면 결과는 None)
+    """
+    if result_cache is None:
+        return None, None
+    
+    cache_key = get_cache_key(upload_hash, mode)
+    # 디스크 캐시를 사용하면 파일을 읽으므로 스레드에서 실행
+    loop = asyncio.get_running_loop()
+    cached = await loop.run_in_executor(io_executor, result_cache.get, cache_key)
+    if cached is not None:
+        logging.info(f"[캐시] 적중: {cache_key[:12]}")
+    return cache_key, cached
+
+
+async def store_cached_result(cache_key: str, result: dict):
+    """처리 결과를 결과 캐시에 저장합니다."""
+    if result_cache is None or cache_key is None:
+        return
+    
+    loop = asyncio.get_running_loop()
+    await loop.run_in_executor(io_executor, result_cache.put, cache_key, {
+        "summary": result["summary"],
+        "original_text": result["original_text"]
+    })
+
+
+async def save_transcript(result: dict, filename: str, mode: str = None):
+    """
+    처리 결과를 보관소에 저장합니다 (보관을 사용하지 않으면 아무것도 하지 않음).
+    저장에 실패해도 요청은 실패시키지 않습니다.
+    
+    Args:
+        result: process_audio_file의 처리 결과
+        filename: 업로드한 파일 이름
+        mode: 분석 방식 (기본값: gemini.mode 설정)
+    """
+    if transcript_store is None:
+        return
+    
+    loop = asyncio.get_running_loop()
+    try:
+        await loop.run_in_executor(io_executor, partial(
+            transcript_store.add, filename, result["original_text"], result["summary"],
+            model=result.get("model"), mode=mode or GEMINI_MODE, duration_seconds=result.get("duration_seconds")
+        ))
+    except Exception as e:
+        logging.error(f"[오류] 처리 결과 보관 실패: {e}")
+
+
+def get_upload_extension(file: UploadFile) -> str:
+    """
+    업로드 파일의 확장자를 확인합니다.
+    
+    Args:
+        file: 업로드된 파일
+    
+    Returns:
+        소문자 확장자 (점 제외)
+    
+    Raises:
+        HTTPException: 지원하지 않는 파일 형식인 경우 (400)
+    """
+    return get_file_extension(file.filename)
+
+
+def get_file_extension(filename: str) -> str:
+    """
+    파일 이름의 확장자를 확인합니다.
+    
+    Args:
+        filename: 파일 이름
+    
+    Returns:
+        소문자 확장자 (점 제외)
+    
+    Raises:
+        HTTPException: 지원하지 않는 파일 형식인 경우 (400)
+    """
+    file_extension = filename.split('.')[-1].lower() if '.' in filename else ''
+    
+    if file_extension not in ALLOWED_EXTENSIONS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"지원하지 않는 파일 형식입니다. 지원 형식: {', '.join(ALLOWED_EXTENSIONS)}"
+        )
+    return file_extension
+
+
+def copy_upload_to_file(source, destination) -> tuple:
+    """
+    업로드 본문을 청크 단위로 파일에 복사하면서 SHA-256 해시를 계산합니다 (디스크 I/O이므로 스레드에서 호출).
+    
+    Args:
+        source: Starlette가 받아 둔 업로드 본문 (파일 객체)
+        destination: 저장할 파일 객체
+    
+    Returns:
+        (파일 크기(바이트), SHA-256 해시) 튜플
+    """
+    digest = hashlib.sha256()
+    size = 0
+    source.seek(0)
+    while True:
+        chunk = source.read(UPLOAD_CHUNK_SIZE)
+        if not chunk:
+            break
+        size += len(chunk)
+        digest.update(chunk)
+        destination.write(chunk)
+    return size, digest.hexdigest()
+
+
+async def save_upload_to_disk(file: UploadFile, file_extension: str, max_bytes: Optional[int] = None):
+    """
+    업로드 파일을 임시 파일에 저장합니다.
+    복사와 SHA-256 해시 계산은 한 번에 읽으면서 io_executor에서 실행하므로 이벤트 루프를 막지 않고,
+    요청당 메모리 사용량은 청크 하나로 일정합니다.
+    
+    Args:
+        file: 업로드된 파일
+        file_extension: 파일 확장자
+        max_bytes: 최대 크기 (기본값: upload.max_size_mb 설정)
+    
+    Returns:
+        (저장된 임시 파일 경로, 파일 크기(바이트), SHA-256 해시) 튜플
+    
+    Raises:
+        HTTPException: 파일이 업로드 최대 크기를 넘는 경우 (413)
+    """
+    max_bytes = max_bytes or MAX_UPLOAD_BYTES
+    # 요청 전체 크기는 UploadSizeLimitMiddleware가 제한하므로, 여기서는 일괄 요청 안의 파일별 크기만 확인
+    # (본문은 Starlette가 이미 받아 두었으므로 크기를 보고 복사 전에 거절)
+    if file.size is not None and file.size > max_bytes:
+        raise HTTPException(status_code=413, detail=f"파일 크기는 {max_bytes // (1024 * 1024)}MB 이하여야 합니다.")
+    
+    loop = asyncio.get_running_loop()
+    temp_file = tempfile.NamedTemporaryFile(suffix=f'.{file_extension}', delete=False)
+    uploaded_file_path = temp_file.name
+    
+    try:
+        with track_stage(STAGE_RECEIVE), temp_file:
+            size, file_hash = await loop.run_in_executor(io_executor, copy_upload_to_file, file.file, temp_file)
+    except BaseException:
+        remove_temp_file(uploaded_file_path, "업로드 파일")
+        raise
+    
+    INPUT_BYTES.observe(size)
+    return uploaded_file_path, size, file_hash
+
+
+async def receive_upload(file: Optional[UploadFile], upload_id: Optional[str]) -> tuple:
+    """
+    요청의 오디오 파일을 디스크에 준비합니다.
+    파일을 직접 업로드했으면 임시 파일로 저장하고, 이어받기 업로드(upload_id)를 지정했으면 완료된 업로드를 가져옵니다.
+    
+    Args:
+        file: 업로드된 파일 (upload_id를 지정한 경우 None)
+        upload_id: 완료된 이어받기 업로드 ID (선택)
+    
+    Returns:
+        (임시 파일 경로, 파일 크기(바이트), SHA-256 해시, 원본 파일 이름) 튜플
+    
+    Raises:
+        HTTPException: 파일이 없거나 형식이 맞지 않는 경우 (400), 업로드를 찾을 수 없거나 (404)
+            완료되지 않은 경우 (409), 파일이 업로드 최대 크기를 넘는 경우 (413)
+    """
+    if upload_id:
+        loop = asyncio.get_running_loop()
+        try:
+            session = await loop.run_in_executor(io_executor, upload_sessions.take, upload_id)
+        except UploadSessionError as e:
+            raise HTTPException(status_code=e.status_code, detail=str(e))
+        return session.path, session.size, session.sha256, session.filename
+    
+    if file is None:
+        raise HTTPException(status_code=400, detail="file 또는 upload_id를 지정해야 합니다.")
+    file_extension = get_upload_extension(file)
+    uploaded_file_path, upload_size, upload_hash = await save_upload_to_disk(file, file_extension)
+    return uploaded_file_path, upload_size, upload_hash, file.filename
+
+
+def validate_mode(mode: str) -> str:
+    """
+    요청에서 지정한 분석 방식을 확인합니다.
+    
+    Args:
+        mode: 분석 방식 (빈 값이면 gemini.mode 설정 사용)
+    
+    Returns:
+        분석 방식
+    
+    Raises:
+        HTTPException: 지원하지 않는 분석 방식인 경우 (400)
+    """
+    if not mode:
+        return GEMINI_MODE
+    if mode not in GEMINI_MODES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"지원하지 않는 분석 방식입니다. 지원 방식: {', '.join(GEMINI_MODES)}"
+        )
+    return mode
+
+
+def error_status_code(error_message: str) -> int:
+    """처리 오류 메시지에 맞는 HTTP 상태 코드를 반환합니다."""
+    if "일일 사용량이 초과" in error_message or RATE_LIMITED_MESSAGE in error_message:
+        return 429
+    if "일시적으로 연결할 수 없습니다" in error_message:
+        return 503
+    return 500
+
+
+def classify_error(error: Exception) -> str:
+    """지표(/metrics)에 기록할 오류 종류를 반환합니다."""
+    if isinstance(error, HTTPException):
+        return {400: "bad_request", 413: "too_large", 429: "quota", 503: "unavailable"}.get(error.status_code, "http")
+    if isinstance(error, QueueFullError):
+        return "queue_full"
+    if isinstance(error, StageTimeoutError):
+        return "timeout"
+    status_code = error_status_code(str(error))
+    if status_code == 429:
+        return "quota"
+    if status_code == 503:
+        return "unavailable"
+    return "processing"
+
+
+def record_outcome(endpoint: str, error: Exception = None, cached: bool = False):
+    """
+    요청 처리 결과를 지표에 기록합니다.
+    
+    Args:
+        endpoint: 요청 종류 (summarize, stream, jobs, batch)
+        error: 실패한 경우 발생한 예외
+        cached: 캐시된 결과를 반환한 경우 True
+    """
+    if error is None:
+        REQUESTS.inc(endpoint=endpoint, outcome="cached" if cached else "completed")
+        return
+    REQUESTS.inc(endpoint=endpoint, outcome="failed")
+    ERRORS.inc(type=classify_error(error))
+
+
+def describe_error(error_message: str):
+    """
+    처리 오류 메시지를 사용자에게 보여줄 상태 코드와 메시지로 바꿉니다.
+    
+    Args:
+        error_message: 처리 중 발생한 예외 메시지
+    
+    Returns:
+        (HTTP 상태 코드, 사용자 안내 메시지) 튜플
+    """
+    status_code = error_status_code(error_message)
+    if RATE_LIMITED_MESSAGE in error_message:
+        return status_code, RATE_LIMITED_MESSAGE
+    if status_code == 429:
+        return status_code, "일일 사용량이 초과되었습니다. 내일 다시 시도해주세요."
+    if status_code == 503:
+        return status_code, error_message
+    return status_code, f"처리 중 오류가 발생했습니다: {error_message}"
 
-# 로깅 설정
-setup_logging(config)
 
-# Gemini API 설정
-api_key = os.getenv('GOOGLE_API_KEY')
-if not api_key:
-    raise ValueError("GOOGLE_API_KEY가 .env 파일에 설정되지 않았습니다.")
+async def run_job(job_id: str, uploaded_file_path: str, cache_key: str, result: dict = None, mode: str = None,
+                  filename: str = None):
+    """
+    비동기 작업을 실행하고 결과를 작업 저장소에 기록합니다.
+    
+    Args:
+        job_id: 작업 ID
+        uploaded_file_path: 업로드된 원본 파일 경로 (처리 후 삭제)
+        cache_key: 결과 캐시 키 (캐시가 꺼져 있으면 None)
+        result: 캐시에서 찾은 이전 결과 (없으면 None)
+        mode: 분석 방식 (기본값: gemini.mode 설정)
+        filename: 업로드한 파일 이름 (처리 결과 보관용)
+    """
+    def update_progress(stage: str):
+        job_store.set_status(job_id, stage)
+    
+    request_priority.set(PRIORITY_NORMAL)
+    cache_hit = result is not None
+    # 작업 저장소가 SQLite이면 기록이 디스크에 쓰므로 I/O 실행기에서 실행
+    loop = asyncio.get_running_loop()
+    try:
+        # 같은 파일의 이전 결과가 있으면 대기열을 거치지 않고 바로 완료
+        if not cache_hit:
+            async with processing_queue.slot(reject_when_full=False):
+                result = await process_audio_file(uploaded_file_path, update_progress, mode)
+            await store_cached_result(cache_key, result)
+            await save_transcript(result, filename, mode)
+        await loop.run_in_executor(io_executor, job_store.complete, job_id, {
+            "summary": result["summary"],
+            "original_text": result["original_text"]
+        })
+        record_outcome("jobs", cached=cache_hit)
+        logging.info(f"[작업] 완료: {job_id}")
+    
+    except asyncio.CancelledError:
+        await loop.run_in_executor(
+            io_executor, job_store.fail, job_id, "서버 종료로 작업이 중단되었습니다. 다시 요청해주세요.", 503
+        )
+        raise
+    
+    except Exception as e:
+        record_outcome("jobs", e)
+        error_message = str(e)
+        logging.error(f"[작업] 실패: {job_id} - {error_message}")
+        status_code, error_message = describe_error(error_message)
+        await loop.run_in_executor(io_executor, job_store.fail, job_id, error_message, status_code)
+    
+    finally:
+        # 업로드된 원본 파일 삭제 (개인정보 보호)
+        remove_temp_file(uploaded_file_path, "업로드 파일")
 
-genai.configure(api_key=api_key)
 
-# FastAPI 앱 생성
-app = FastAPI(
-    title="음성 텍스트 변환/요약",
-    description="오디오 파일을 업로드하여 Gemini 1.5 Flash로 텍스트 변환 및 요약",
-    version="1.0.0"
-)
+async def lookup_and_admit(uploaded_file_path: str, upload_hash: str, mode: str, endpoint: str):
+    """
+    백그라운드 처리를 시작하기 전에 캐시를 확인하고, 이전 결과가 없으면 일일 한도가 남아 있는지 확인합니다.
+    한도가 부족하면 업로드 파일을 삭제하고 429 오류를 발생시킵니다.
+    
+    Args:
+        uploaded_file_path: 업로드된 원본 파일 경로
+        upload_hash: 업로드된 원본 파일의 SHA-256 해시
+        mode: 분석 방식
+        endpoint: 요청 종류 (지표 기록용)
+    
+    Returns:
+        (캐시 키, 캐시된 결과) 튜플
+    """
+    cache_key, cached = await lookup_cached_result(upload_hash, mode)
+    if cached is None:
+        try:
+            await check_gemini_quota(mode)
+        except HTTPException as e:
+            record_outcome(endpoint, e)
+            remove_temp_file(uploaded_file_path, "업로드 파일")
+            raise
+    return cache_key, cached
 
-# CORS 설정 - 설정 파일에서 읽어오기
-cors_config = config.get('cors', {})
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=cors_config.get('allow_origins', ["*"]),
-    allow_credentials=cors_config.get('allow_credentials', True),
-    allow_methods=cors_config.get('allow_methods', ["*"]),
-    allow_headers=cors_config.get('allow_headers', ["*"]),
-)
 
-# 지원하는 오디오 형식
-ALLOWED_EXTENSIONS = {'mp3', 'wav', 'm4a', 'ogg', 'flac', 'aac', 'wma', 'webm'}
+def format_sse(event: str, data: dict) -> str:
+    """Server-Sent Events 형식의 메시지를 만듭니다."""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
 
 
-def convert_audio_to_lightweight_mp3(input_file_path: str) -> str:
+async def run_stream(uploaded_file_path: str, cache_key: str, result: dict, mode: str, emit, filename: str = None):
     """
-    다양한 형식의 오디오 파일을 경량 MP3로 변환합니다.
-    비용 절감을 위해 32kbps 비트레이트를 사용합니다.
+    스트리밍 요청을 처리하면서 진행 단계와 생성 중인 텍스트를 이벤트로 전달합니다.
+    클라이언트 연결이 끊겨도 처리를 끝까지 진행하여 결과를 캐시에 저장합니다.
     
     Args:
-        input_file_path: 입력 오디오 파일 경로
-    
-    Returns:
-        변환된 MP3 파일 경로 (임시 파일)
+        uploaded_file_path: 업로드된 원본 파일 경로 (처리 후 삭제)
+        cache_key: 결과 캐시 키 (캐시가 꺼져 있으면 None)
+        result: 캐시에서 찾은 이전 결과 (없으면 None)
+        mode: 분석 방식
+        emit: (이벤트 이름, 데이터)를 받아 클라이언트로 보내는 함수 (스레드에서 호출될 수 있음)
+        filename: 업로드한 파일 이름 (처리 결과 보관용)
     """
-    logging.info(f"[변환] 오디오 변환 시작: {input_file_path}")
-    
-    # 파일 확장자 확인
-    input_path = Path(input_file_path)
-    file_extension = input_path.suffix.lower().replace('.', '')
+    def report_progress(stage: str):
+        emit("progress", {"status": stage, "progress": stage_progress(stage)})
     
-    # 임시 파일 생성
-    temp_file = tempfile.NamedTemporaryFile(suffix='.mp3', delete=False)
-    output_file_path = temp_file.name
-    temp_file.close()
+    def report_text(field: str, text: str):
+        emit("transcript" if field == "original_text" else "summary", {"text": text})
     
     try:
-        # 오디오 파일 로드
-        audio = AudioSegment.from_file(input_file_path, format=file_extension)
+        report_progress(JOB_QUEUED)
+        cache_hit = result is not None
         
-        # 경량 MP3로 변환 (32kbps, 모노로 변환하여 용량 절감)
-        audio = audio.set_channels(1)  # 모노로 변환
-        audio.export(
-            output_file_path, 
-            format='mp3', 
-            bitrate='32k',
-            parameters=["-ac", "1"]  # 모노 채널 강제
-        )
+        if not cache_hit:
+            async with processing_queue.slot(reject_when_full=False):
+                result = await process_audio_file(uploaded_file_path, report_progress, mode, report_text)
+            await store_cached_result(cache_key, result)
+            await save_transcript(result, filename, mode)
         
-        # 파일 크기 확인
-        file_size = os.path.getsize(output_file_path) / (1024 * 1024)  # MB
-        logging.info(f"[변환] 완료: {output_file_path} ({file_size:.2f}MB)")
-        return output_file_path
+        record_outcome("stream", cached=cache_hit)
+        logging.info("[스트림] 요약 생성 완료")
+        emit("result", {
+            "summary": result["summary"],
+            "original_text": result["original_text"],
+            "cached": cache_hit
+        })
     
     except Exception as e:
-        # 변환 실패 시 임시 파일 삭제
-        if os.path.exists(output_file_path):
-            os.remove(output_file_path)
-        logging.error(f"[오류] 오디오 변환 중 오류 발생: {e}")
-        raise
+        record_outcome("stream", e)
+        logging.error(f"[스트림] 실패: {e}")
+        status_code, error_message = describe_error(str(e))
+        error = {"status_code": status_code, "detail": error_message}
+        if isinstance(e, (QuotaExceededError, CircuitOpenError)):
+            error["retry_after"] = e.retry_after
+        emit("error", error)
+    
+    finally:
+        # 업로드된 원본 파일 삭제 (개인정보 보호)
+        remove_temp_file(uploaded_file_path, "업로드 파일")
 
 
-def upload_audio_to_gemini(audio_file_path: str):
+async def save_batch_uploads(files: List[UploadFile]) -> List[dict]:
     """
-    오디오 파일을 Gemini에 업로드합니다.
+    일괄 요청의 업로드 파일을 임시 파일로 저장합니다. zip 파일은 안의 오디오 파일을 꺼냅니다.
+    형식이 맞지 않거나 크기를 넘는 파일은 요청 전체를 실패시키지 않고 파일별 오류로 표시합니다.
     
     Args:
-        audio_file_path: 업로드할 오디오 파일 경로
+        files: 업로드된 파일 목록 (오디오 파일 또는 zip 파일)
     
     Returns:
-        업로드된 파일 객체
+        {"filename", "path", "hash", "size", "error", "status_code"} 목록 (업로드 순서대로)
+    
+    Raises:
+        HTTPException: 파일 수/전체 크기 제한을 넘거나, zip 파일을 읽을 수 없거나, 처리할 파일이 없는 경우 (400)
     """
-    logging.info(f"[업로드] Gemini에 파일 업로드 중...")
+    loop = asyncio.get_running_loop()
+    items = []
+    # 지금까지 저장하거나 압축을 푼 파일 크기 합계 (zip 안의 파일은 요청에서 남은 크기까지만 꺼냄)
+    bytes_so_far = 0
     
     try:
-        uploaded_file = genai.upload_file(audio_file_path)
-        logging.info(f"[업로드] 완료: {uploaded_file.name}")
-        return uploaded_file
+        for file in files:
+            file_extension = file.filename.split('.')[-1].lower() if '.' in file.filename else ''
+            
+            if file_extension == 'zip':
+                zip_path, _, _ = await save_upload_to_disk(file, file_extension, BATCH_MAX_TOTAL_BYTES)
+                try:
+                    extracted = await loop.run_in_executor(io_executor, partial(
+                        extract_audio_from_zip, zip_path, ALLOWED_EXTENSIONS,
+                        BATCH_MAX_FILES - len(items), MAX_UPLOAD_BYTES, BATCH_MAX_TOTAL_BYTES - bytes_so_far
+                    ))
+                finally:
+                    remove_temp_file(zip_path, "업로드 파일")
+                for item in extracted:
+                    item["filename"] = f"{file.filename}/{item['filename']}"
+                logging.info(f"[일괄] {file.filename}에서 오디오 파일 {len(extracted)}개 추출")
+                items.extend(extracted)
+                bytes_so_far += sum(item["size"] for item in extracted)
+                continue
+            
+            if len(items) >= BATCH_MAX_FILES:
+                raise BatchLimitError(f"한 번에 처리할 수 있는 파일은 {BATCH_MAX_FILES}개 이하입니다.")
+            item = {"filename": file.filename, "path": None, "hash": None, "size": 0, "error": None, "status_code": None}
+            items.append(item)
+            try:
+                get_upload_extension(file)
+                item["path"], item["size"], item["hash"] = await save_upload_to_disk(file, file_extension)
+            except HTTPException as e:
+                item["error"] = e.detail
+                item["status_code"] = e.status_code
+            bytes_so_far += item["size"]
+            # 요청 본문은 UploadSizeLimitMiddleware가 제한하지만, 앞에서 zip을 풀었으면 합계가 넘을 수 있음
+            if bytes_so_far > BATCH_MAX_TOTAL_BYTES:
+                raise BatchLimitError(
+                    f"압축을 푼 파일을 포함한 요청 전체 크기는 {BATCH_MAX_TOTAL_BYTES // (1024 * 1024)}MB 이하여야 합니다."
+                )
     
-    except Exception as e:
-        # API 할당량 초과 에러 처리
-        error_message = str(e).lower()
-        if 'quota' in error_message or 'limit' in error_message or '429' in error_message:
-            raise Exception("일일 사용량이 초과되었습니다. 내일 다시 시도해주세요.")
-        logging.error(f"[오류] 파일 업로드 중 오류 발생: {e}")
+    except BatchLimitError as e:
+        remove_extracted(items)
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    except BaseException:
+        remove_extracted(items)
         raise
+    
+    if not items:
+        raise HTTPException(status_code=400, detail="처리할 오디오 파일이 없습니다.")
+    return items
 
 
-def summarize_audio_with_gemini(uploaded_file) -> dict:
+async def process_batch_item(item: dict, mode: str, semaphore: asyncio.Semaphore) -> dict:
     """
-    Gemini 1.5 Flash 무료 모델을 사용하여 오디오 내용을 텍스트로 변환하고 요약합니다.
+    일괄 요청의 파일 하나를 처리합니다. 실패해도 예외를 발생시키지 않고 파일별 결과에 오류를 담습니다.
     
     Args:
-        uploaded_file: Gemini에 업로드된 파일 객체
+        item: save_batch_uploads가 반환한 파일 정보 (처리 후 임시 파일 삭제)
+        mode: 분석 방식
+        semaphore: 요청 하나에서 동시에 처리할 파일 수 제한
     
     Returns:
-        {"summary": "요약본", "original_text": "원본 텍스트"} 형태의 딕셔너리
+        파일별 결과 ({"filename", "status", "cached", "summary", "original_text"}
+        또는 {"filename", "status", "status_code", "error"})
     """
-    # 설정에서 모델 이름 가져오기
-    gemini_config = config.get('gemini', {})
-    model_name = gemini_config.get('model', 'gemini-1.5-flash-latest')
-    
-    logging.info(f"[분석] Gemini ({model_name})로 음성 분석 중...")
+    filename = item["filename"]
+    if item["error"]:
+        record_outcome("batch", HTTPException(status_code=item["status_code"], detail=item["error"]))
+        return {"filename": filename, "status": JOB_FAILED, "status_code": item["status_code"], "error": item["error"]}
     
     try:
-        # Gemini 모델 사용
-        model = genai.GenerativeModel(model_name)
-        
-        # 1단계: 원본 텍스트 추출
-        logging.info("[분석] 1단계 - 음성을 텍스트로 변환 중...")
-        transcription_prompt = "이 오디오 파일의 내용을 텍스트로 정확하게 변환해줘. 말한 내용을 그대로 적어줘."
-        transcription_response = model.generate_content([transcription_prompt, uploaded_file])
-        original_text = transcription_response.text
+        cache_key, result = await lookup_cached_result(item["hash"], mode)
+        cache_hit = result is not None
         
-        # 2단계: 요약 생성
-        logging.info("[분석] 2단계 - 내용 요약 생성 중...")
-        summary_prompt = f"""
-다음은 음성을 텍스트로 변환한 내용입니다:
-
-{original_text}
-
-위 내용을 다음 형식으로 요약해줘:
-
-## 📋 주요 내용
-- 핵심 주제와 내용을 정리
-
-## 💡 핵심 포인트
-- 중요한 내용이나 결정 사항
-
-## 📌 실행 항목 (있는 경우)
-- 향후 해야 할 일이나 행동 계획
-
-명확하고 간결하게 작성해줘. 만약 회의 내용이 아니면 그에 맞게 적절히 요약해줘.
-"""
-        summary_response = model.generate_content(summary_prompt)
-        summary = summary_response.text
+        if not cache_hit:
+            async with semaphore:
+                # 대기하는 동안 일일 한도가 소진되었으면 변환/업로드 전에 거절
+                await check_gemini_quota(mode)
+                async with processing_queue.slot(reject_when_full=False):
+                    result = await process_audio_file(item["path"], mode=mode)
+            await store_cached_result(cache_key, result)
+            await save_transcript(result, filename, mode)
         
-        logging.info("[분석] 완료!")
+        record_outcome("batch", cached=cache_hit)
+        logging.info(f"[일괄] 완료: {filename}")
         return {
-            "summary": summary,
-            "original_text": original_text
+            "filename": filename,
+            "status": JOB_COMPLETED,
+            "cached": cache_hit,
+            "summary": result["summary"],
+            "original_text": result["original_text"]
         }
     
+    except HTTPException as e:
+        record_outcome("batch", e)
+        logging.warning(f"[일괄] 실패: {filename} - {e.detail}")
+        return {"filename": filename, "status": JOB_FAILED, "status_code": e.status_code, "error": e.detail}
+    
     except Exception as e:
-        # API 할당량 초과 에러 처리
-        error_message = str(e).lower()
-        if 'quota' in error_message or 'limit' in error_message or '429' in error_message:
-            raise Exception("일일 사용량이 초과되었습니다. 내일 다시 시도해주세요.")
-        logging.error(f"[오류] 요약 생성 중 오류 발생: {e}")
-        raise
+        record_outcome("batch", e)
+        logging.error(f"[일괄] 실패: {filename} - {e}")
+        status_code, error_message = describe_error(str(e))
+        return {"filename": filename, "status": JOB_FAILED, "status_code": status_code, "error": error_message}
+    
+    finally:
+        # 업로드된 원본 파일 삭제 (개인정보 보호)
+        remove_temp_file(item["path"], "업로드 파일")
 
 
-def process_audio_file(input_file_path: str) -> dict:
+async def run_batch(items: List[dict], mode: str) -> dict:
     """
-    오디오 파일을 처리하여 텍스트 변환 및 요약을 생성합니다.
-    처리가 완료되면 변환된 파일을 자동으로 삭제합니다 (개인정보 보호).
+    일괄 요청의 파일을 batch.parallelism개씩 동시에 처리합니다.
     
     Args:
-        input_file_path: 입력 오디오 파일 경로
+        items: save_batch_uploads가 반환한 파일 정보 목록
+        mode: 분석 방식
     
     Returns:
-        {"summary": "요약본", "original_text": "원본 텍스트"} 형태의 딕셔너리
+        {"total", "succeeded", "failed", "results": [파일별 결과]} (results는 업로드 순서대로)
     """
-    mp3_file_path = None
+    semaphore = asyncio.Semaphore(BATCH_PARALLELISM)
+    start_time = time.time()
+    results = await asyncio.gather(*(process_batch_item(item, mode, semaphore) for item in items))
+    succeeded = sum(1 for result in results if result["status"] == JOB_COMPLETED)
+    logging.info(
+        f"[일괄] 처리 완료: {succeeded}/{len(results)}개 성공 ({time.time() - start_time:.1f}초)"
+    )
+    return {
+        "total": len(results),
+        "succeeded": succeeded,
+        "failed": len(results) - succeeded,
+        "results": list(results)
+    }
+
+
+async def run_batch_job(job_id: str, items: List[dict], mode: str):
+    """
+    일괄 요청을 비동기 작업으로 실행하고 결과를 작업 저장소에 기록합니다.
     
+    Args:
+        job_id: 작업 ID
+        items: save_batch_uploads가 반환한 파일 정보 목록
+        mode: 분석 방식
+    """
+    loop = asyncio.get_running_loop()
     try:
-        # 1. 오디오 파일을 경량 MP3로 변환
-        mp3_file_path = convert_audio_to_lightweight_mp3(input_file_path)
-        
-        # 2. Gemini에 파일 업로드
-        uploaded_file = upload_audio_to_gemini(mp3_file_path)
-        
-        # 3. Gemini로 요약 생성
-        result = summarize_audio_with_gemini(uploaded_file)
-        
-        return result
-    
-    except Exception as e:
-        logging.error(f"[오류] 처리 중 오류 발생: {e}")
+        result = await run_batch(items, mode)
+        await loop.run_in_executor(io_executor, job_store.complete, job_id, result)
+        logging.info(f"[작업] 완료: {job_id}")
+    except asyncio.CancelledError:
+        await loop.run_in_executor(
+            io_executor, job_store.fail, job_id, "서버 종료로 작업이 중단되었습니다. 다시 요청해주세요.", 503
+        )
         raise
-    
+    except Exception as e:
+        logging.error(f"[작업] 실패: {job_id} - {e}")
+        await loop.run_in_executor(io_executor, job_store.fail, job_id, f"처리 중 오류가 발생했습니다: {e}", 500)
     finally:
-        # 처리 완료 후 변환된 MP3 파일 삭제 (개인정보 보호)
-        if mp3_file_path and os.path.exists(mp3_file_path):
-            try:
-                os.remove(mp3_file_path)
-                logging.info(f"[삭제] 임시 파일 삭제 완료: {mp3_file_path}")
-            except Exception as e:
-                logging.error(f"[오류] 임시 파일 삭제 실패: {e}")
+        remove_extracted(items)
 
 
 # API 엔드포인트
-@app.get("/")
+@router.get("/")
 async def root():
     """서비스 정보"""
     return {
@@ -316,100 +2140,531 @@ async def root():
         "powered_by": "Gemini 1.5 Flash",
         "endpoints": {
             "/summarize": "POST - 오디오 파일 업로드 및 텍스트 변환/요약",
-            "/health": "GET - 서버 상태 확인"
+            "/summarize/stream": "POST - 텍스트 변환/요약 (진행 단계와 생성 중인 텍스트를 SSE로 스트리밍)",
+            "/summarize/batch": "POST - 여러 오디오 파일(또는 zip) 일괄 텍스트 변환/요약",
+            "/jobs": "POST - 오디오 파일 업로드 후 작업 ID 즉시 반환 (비동기 처리)",
+            "/jobs/{job_id}": "GET - 작업 상태/진행률 조회",
+            "/jobs/{job_id}/result": "GET - 작업 결과 조회",
+            "/uploads": "POST - 이어받기 업로드 시작 (청크를 나눠 병렬 전송, 완료 후 upload_id로 요약 요청)",
+            "/uploads/{upload_id}": "GET - 받은 청크 조회 / DELETE - 업로드 취소",
+            "/uploads/{upload_id}/chunks/{index}": "PUT - 청크 전송",
+            "/uploads/{upload_id}/complete": "POST - 업로드 완료",
+            "/health": "GET - 서버 상태 확인 (프로세스가 응답하는지)",
+            "/ready": "GET - 요청 처리 준비 상태 확인 (ffmpeg, 디렉토리 쓰기, Gemini 연결, 준비되지 않으면 503)",
+            "/metrics": "GET - 처리 단계별 소요 시간, 대기열, 캐시, 오류 지표 (Prometheus 형식)",
+            "/transcripts": "GET - 보관한 처리 결과 검색/목록 (q, limit, offset, transcripts.enabled 사용 시)",
+            "/transcripts/{transcript_id}": "GET - 보관한 처리 결과 조회 / DELETE - 삭제"
         }
     }
 
 
-@app.get("/health")
+@router.get("/health")
 async def health():
-    """서버 상태 확인"""
+    """서버 상태 확인 (프로세스가 응답하는지만 확인, 요청 처리 가능 여부는 /ready)"""
+    loop = asyncio.get_running_loop()
+    active_jobs = await loop.run_in_executor(io_executor, job_store.count_active)
     return {
         "status": "ok",
-        "message": "서버가 정상적으로 작동 중입니다."
+        "message": "서버가 정상적으로 작동 중입니다.",
+        "worker": {"pid": os.getpid(), "workers": WORKERS},
+        "queue": {
+            "running": processing_queue.running if processing_queue else 0,
+            "waiting": processing_queue.waiting if processing_queue else 0,
+            "max_concurrent": MAX_CONCURRENT_JOBS,
+            "max_queue_size": MAX_QUEUE_SIZE
+        },
+        "jobs": {
+            "active": active_jobs
+        },
+        "cache": result_cache.stats() if result_cache else {"enabled": False},
+        "gemini_modes": mode_stats.summary(),
+        "gemini_uploads": uploaded_files.stats(),
+        "quota": rate_limiter.stats() if rate_limiter else {"enabled": False},
+        "resilience": resilience.stats(),
+        "models": model_router.stats(),
+        "transcripts": transcript_store.stats() if transcript_store else {"enabled": False}
     }
 
 
-@app.post("/summarize")
-async def summarize(file: UploadFile = File(...)):
+@router.get("/ready")
+async def ready():
+    """
+    요청을 처리할 준비가 되었는지 확인합니다 (로드 밸런서 상태 확인용).
+    ffmpeg, 임시/로그 디렉토리 쓰기, Gemini 클라이언트 준비, Gemini API 연결(주기적으로 확인한 결과)을 확인하며,
+    하나라도 실패하면 503으로 응답합니다.
+    """
+    is_ready, checks = await readiness.report(io_executor)
+    content = {"status": "ready" if is_ready else "not_ready", "worker": {"pid": os.getpid()}, "checks": checks}
+    return JSONResponse(status_code=200 if is_ready else 503, content=content)
+
+
+def collect_state_metrics():
+    """대기열, 작업, 모델별 처리 중 요청 수, 캐시 통계를 지표에 반영합니다 (/metrics 요청 시, I/O 실행기에서 실행)."""
+    if processing_queue:
+        QUEUE_RUNNING.set(processing_queue.running)
+        QUEUE_WAITING.set(processing_queue.waiting)
+    JOBS_ACTIVE.set(job_store.count_active())
+    for model_name, stats in model_router.stats().items():
+        MODEL_IN_FLIGHT.set(stats["in_flight"], model=model_name)
+    if result_cache:
+        stats = result_cache.stats()
+        CACHE_LOOKUPS.set_total(stats["hits"], result="hit")
+        CACHE_LOOKUPS.set_total(stats["misses"], result="miss")
+        CACHE_HIT_RATIO.set(stats["hit_ratio"])
+
+
+@router.get("/metrics")
+async def get_metrics():
+    """처리 지표를 Prometheus 텍스트 형식으로 반환합니다."""
+    if not METRICS_ENABLED:
+        raise HTTPException(status_code=404, detail="지표 수집이 비활성화되어 있습니다.")
+    loop = asyncio.get_running_loop()
+    # 작업 수/남은 한도를 저장소(SQLite일 수 있음)에서 읽으므로 스레드에서 실행
+    await loop.run_in_executor(io_executor, collect_state_metrics)
+    if metrics_collector:
+        # 모든 워커의 지표를 합산
+        merged = await loop.run_in_executor(io_executor, metrics_collector.collect)
+        return Response(content=REGISTRY.render(merged), media_type=CONTENT_TYPE)
+    return Response(content=REGISTRY.render(), media_type=CONTENT_TYPE)
+
+
+@router.post("/summarize")
+async def summarize(file: UploadFile = File(None), mode: str = Form(None), upload_id: str = Form(None)):
     """
     오디오 파일을 업로드하여 텍스트 변환 및 요약 생성
     
     Args:
         file: 오디오 파일 (mp3, wav, m4a, ogg, flac, aac, wma, webm)
+        mode: 분석 방식 (two_step, single_call, 선택, 기본값: gemini.mode 설정)
+        upload_id: file 대신 사용할 완료된 이어받기 업로드 ID (선택)
     
     Returns:
         JSON: {"summary": "요약본", "original_text": "원본 텍스트"}
     """
     uploaded_file_path = None
+    # 사용자가 응답을 기다리는 요청이므로 Gemini 호출 순서를 앞당김
+    request_priority.set(PRIORITY_HIGH)
     
     try:
-        # 파일 확장자 확인
-        file_extension = file.filename.split('.')[-1].lower() if '.' in file.filename else ''
+        # 분석 방식 확인
+        mode = validate_mode(mode)
         
-        if file_extension not in ALLOWED_EXTENSIONS:
-            raise HTTPException(
-                status_code=400,
-                detail=f"지원하지 않는 파일 형식입니다. 지원 형식: {', '.join(ALLOWED_EXTENSIONS)}"
-            )
-        
-        # 임시 파일로 저장
-        temp_file = tempfile.NamedTemporaryFile(suffix=f'.{file_extension}', delete=False)
-        uploaded_file_path = temp_file.name
-        
-        # 파일 저장
-        with open(uploaded_file_path, 'wb') as f:
-            content = await file.read()
-            f.write(content)
+        # 임시 파일로 저장 (청크 단위 저장, 크기 제한 및 해시 계산) 또는 이어받기 업로드 사용
+        uploaded_file_path, upload_size, upload_hash, filename = await receive_upload(file, upload_id)
         
         # 파일 크기 확인
-        file_size = os.path.getsize(uploaded_file_path) / (1024 * 1024)  # MB
+        file_size = upload_size / (1024 * 1024)  # MB
         logging.info("="*60)
         logging.info(f"[요청] 새로운 요약 요청")
-        logging.info(f"[파일] {file.filename} ({file_size:.2f}MB)")
+        logging.info(f"[파일] {filename} ({file_size:.2f}MB)")
         logging.info("="*60)
         
-        # 오디오 처리 및 요약 생성
-        result = process_audio_file(uploaded_file_path)
+        # 같은 파일의 이전 결과가 있으면 캐시에서 바로 반환
+        cache_key, result = await lookup_cached_result(upload_hash, mode)
+        cache_hit = result is not None
+        
+        if not cache_hit:
+            # 일일 한도가 부족하면 변환/업로드 전에 거절
+            await check_gemini_quota(mode)
+            
+            # 오디오 처리 및 요약 생성 (동시 처리 수 제한)
+            async with processing_queue.slot():
+                result = await process_audio_file(uploaded_file_path, mode=mode)
+            await store_cached_result(cache_key, result)
+            await save_transcript(result, filename, mode)
         
+        record_outcome("summarize", cached=cache_hit)
         logging.info("="*60)
         logging.info(f"[완료] 요약 생성 완료")
         logging.info("="*60)
         
         # 성공 응답
-        return JSONResponse(content={
-            "summary": result["summary"],
-            "original_text": result["original_text"]
-        })
+        return JSONResponse(
+            content={
+                "summary": result["summary"],
+                "original_text": result["original_text"]
+            },
+            headers={"X-Cache": "HIT" if cache_hit else "MISS"}
+        )
+    
+    except HTTPException as e:
+        record_outcome("summarize", e)
+        raise
+    
+    except QueueFullError as e:
+        record_outcome("summarize", e)
+        logging.warning(f"[대기열] 요청 거절: {e}")
+        raise HTTPException(status_code=503, detail=str(e))
+    
+    except QuotaExceededError as e:
+        record_outcome("summarize", e)
+        logging.warning(f"[할당량] 처리 중 일일 한도 소진: {e}")
+        raise HTTPException(status_code=429, detail=str(e), headers={"Retry-After": str(e.retry_after)})
+    
+    except CircuitOpenError as e:
+        record_outcome("summarize", e)
+        logging.warning(f"[재시도] Gemini 호출 중단 상태로 요청 실패: {e}")
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": str(e.retry_after)})
     
     except Exception as e:
+        record_outcome("summarize", e)
         error_message = str(e)
         logging.error(f"[오류] {error_message}")
         
         # 사용자 친화적인 에러 메시지
-        if "일일 사용량이 초과" in error_message:
-            raise HTTPException(
-                status_code=429,
-                detail="일일 사용량이 초과되었습니다. 내일 다시 시도해주세요."
-            )
-        else:
-            raise HTTPException(
-                status_code=500,
-                detail=f"처리 중 오류가 발생했습니다: {error_message}"
-            )
+        status_code, detail = describe_error(error_message)
+        raise HTTPException(status_code=status_code, detail=detail)
     
     finally:
         # 업로드된 원본 파일 삭제 (개인정보 보호)
-        if uploaded_file_path and os.path.exists(uploaded_file_path):
+        remove_temp_file(uploaded_file_path, "업로드 파일")
+
+
+@router.post("/summarize/stream")
+async def summarize_stream(file: UploadFile = File(None), mode: str = Form(None), upload_id: str = Form(None)):
+    """
+    오디오 파일을 업로드하여 텍스트 변환 및 요약을 생성하고, 진행 상황을 Server-Sent Events로 스트리밍합니다.
+    
+    이벤트:
+        progress: {"status": "단계", "progress": 0~1} - 처리 단계가 바뀔 때
+        transcript: {"text": "조각"} - 변환 텍스트가 생성되는 대로
+        summary: {"text": "조각"} - 요약이 생성되는 대로
+        result: {"summary", "original_text", "cached"} - 최종 결과 (마지막 이벤트)
+        error: {"status_code", "detail"} - 처리 실패 (마지막 이벤트)
+    
+    Args:
+        file: 오디오 파일 (mp3, wav, m4a, ogg, flac, aac, wma, webm)
+        mode: 분석 방식 (two_step, single_call, 선택, 기본값: gemini.mode 설정)
+        upload_id: file 대신 사용할 완료된 이어받기 업로드 ID (선택)
+    """
+    # 스트림을 시작하기 전에 확인할 수 있는 오류는 일반 HTTP 오류로 응답
+    if file is not None:
+        get_upload_extension(file)
+    mode = validate_mode(mode)
+    if processing_queue.is_full:
+        raise HTTPException(status_code=503, detail="서버가 혼잡합니다. 잠시 후 다시 시도해주세요.")
+    
+    uploaded_file_path, upload_size, upload_hash, filename = await receive_upload(file, upload_id)
+    logging.info(f"[스트림] 새로운 요약 요청: {filename} ({upload_size / (1024 * 1024):.2f}MB)")
+    
+    cache_key, cached = await lookup_and_admit(uploaded_file_path, upload_hash, mode, "stream")
+    
+    loop = asyncio.get_running_loop()
+    events = asyncio.Queue()
+    
+    def emit(event: str, data: dict):
+        loop.call_soon_threadsafe(events.put_nowait, (event, data))
+    
+    # 사용자가 응답을 기다리는 요청이므로 Gemini 호출 순서를 앞당김 (태스크 생성 시 컨텍스트 복사)
+    request_priority.set(PRIORITY_HIGH)
+    task = asyncio.create_task(run_stream(uploaded_file_path, cache_key, cached, mode, emit, filename))
+    job_tasks.add(task)
+    task.add_done_callback(job_tasks.discard)
+    
+    async def event_stream():
+        while True:
             try:
-                os.remove(uploaded_file_path)
-                logging.info(f"[삭제] 업로드 파일 삭제 완료: {uploaded_file_path}")
-            except Exception as e:
-                logging.error(f"[오류] 업로드 파일 삭제 실패: {e}")
+                event, data = await asyncio.wait_for(events.get(), timeout=SSE_KEEPALIVE_SECONDS)
+            except asyncio.TimeoutError:
+                # 프록시가 유휴 연결을 끊지 않도록 주석 전송
+                yield ": keep-alive\n\n"
+                continue
+            yield format_sse(event, data)
+            if event in ("result", "error"):
+                break
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@router.post("/summarize/batch")
+async def summarize_batch(files: List[UploadFile] = File(...), mode: str = Form(None),
+                          background: bool = Form(False)):
+    """
+    여러 오디오 파일(또는 오디오 파일을 담은 zip)을 한 번에 업로드하여 텍스트 변환 및 요약을 생성합니다.
+    파일은 batch.parallelism개씩 동시에 처리하며, 일부 파일이 실패해도 나머지 결과는 함께 반환합니다.
+    
+    Args:
+        files: 오디오 파일 또는 zip 파일 목록
+        mode: 분석 방식 (two_step, single_call, 선택, 기본값: gemini.mode 설정)
+        background: true이면 작업 ID를 즉시 반환하고 백그라운드에서 처리 (/jobs/{job_id}로 조회)
+    
+    Returns:
+        JSON: {"total", "succeeded", "failed", "results": [파일별 결과]}
+        (background가 true이면 202 응답과 작업 상태)
+    """
+    mode = validate_mode(mode)
+    loop = asyncio.get_running_loop()
+    if background and await loop.run_in_executor(io_executor, job_store.count_active) >= MAX_PENDING_JOBS:
+        raise HTTPException(status_code=503, detail="진행 중인 작업이 너무 많습니다. 잠시 후 다시 시도해주세요.")
+    
+    items = await save_batch_uploads(files)
+    logging.info(f"[일괄] 새로운 일괄 요청: 파일 {len(items)}개 (동시 처리: {BATCH_PARALLELISM})")
+    
+    # 대량 처리 요청이므로 사용자가 응답을 기다리는 요청보다 Gemini 호출 순서를 늦춤
+    request_priority.set(PRIORITY_LOW)
+    
+    if background:
+        job_name = f"{items[0]['filename']} 외 {len(items) - 1}개" if len(items) > 1 else items[0]["filename"]
+        job = await loop.run_in_executor(io_executor, job_store.create, job_name)
+        logging.info(f"[작업] 일괄 작업 등록: {job['job_id']} (파일 {len(items)}개)")
+        task = asyncio.create_task(run_batch_job(job["job_id"], items, mode))
+        job_tasks.add(task)
+        task.add_done_callback(job_tasks.discard)
+        return JSONResponse(status_code=202, content=job_progress(job))
+    
+    try:
+        return await run_batch(items, mode)
+    finally:
+        remove_extracted(items)
+
+
+@router.post("/jobs", status_code=202)
+async def create_job(file: UploadFile = File(None), mode: str = Form(None), upload_id: str = Form(None)):
+    """
+    오디오 파일을 업로드하고 작업 ID를 즉시 반환합니다.
+    처리는 백그라운드에서 진행되며 /jobs/{job_id}로 상태를 조회할 수 있습니다.
+    
+    Args:
+        file: 오디오 파일 (mp3, wav, m4a, ogg, flac, aac, wma, webm)
+        mode: 분석 방식 (two_step, single_call, 선택, 기본값: gemini.mode 설정)
+        upload_id: file 대신 사용할 완료된 이어받기 업로드 ID (선택)
+    
+    Returns:
+        JSON: {"job_id": "작업 ID", "status": "queued", ...}
+    """
+    if file is not None:
+        get_upload_extension(file)
+    mode = validate_mode(mode)
+    
+    loop = asyncio.get_running_loop()
+    if await loop.run_in_executor(io_executor, job_store.count_active) >= MAX_PENDING_JOBS:
+        raise HTTPException(status_code=503, detail="진행 중인 작업이 너무 많습니다. 잠시 후 다시 시도해주세요.")
+    
+    uploaded_file_path, upload_size, upload_hash, filename = await receive_upload(file, upload_id)
+    cache_key, cached = await lookup_and_admit(uploaded_file_path, upload_hash, mode, "jobs")
+    
+    job = await loop.run_in_executor(io_executor, job_store.create, filename)
+    logging.info(f"[작업] 등록: {job['job_id']} ({filename}, {upload_size / (1024 * 1024):.2f}MB)")
+    
+    task = asyncio.create_task(run_job(job["job_id"], uploaded_file_path, cache_key, cached, mode, filename))
+    job_tasks.add(task)
+    task.add_done_callback(job_tasks.discard)
+    
+    return job_progress(job)
+
+
+@router.get("/jobs/{job_id}")
+async def get_job(job_id: str):
+    """작업 상태와 진행률을 조회합니다."""
+    loop = asyncio.get_running_loop()
+    job = await loop.run_in_executor(io_executor, job_store.get, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="작업을 찾을 수 없습니다. (만료되었거나 존재하지 않는 작업)")
+    return job_progress(job)
+
+
+@router.get("/jobs/{job_id}/result")
+async def get_job_result(job_id: str):
+    """
+    작업 결과를 조회합니다.
+    아직 처리 중이면 202 응답과 함께 현재 상태를 반환합니다.
+    """
+    loop = asyncio.get_running_loop()
+    job = await loop.run_in_executor(io_executor, job_store.get, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="작업을 찾을 수 없습니다. (만료되었거나 존재하지 않는 작업)")
+    
+    if job["status"] == JOB_FAILED:
+        raise HTTPException(status_code=job["error_code"] or 500, detail=job["error"])
+    
+    if job["status"] != JOB_COMPLETED:
+        return JSONResponse(status_code=202, content=job_progress(job))
+    
+    return JSONResponse(content=job["result"])
+
+
+@router.post("/uploads", status_code=201)
+async def create_upload(filename: str = Form(...), size: int = Form(...)):
+    """
+    이어받기 업로드를 시작합니다.
+    큰 파일을 청크로 나눠 여러 개를 동시에 보낼 수 있고, 연결이 끊겨도 받지 못한 청크만 다시 보내면 됩니다.
+    모든 청크를 보낸 뒤 /uploads/{upload_id}/complete로 완료하고,
+    /summarize, /summarize/stream, /jobs에 file 대신 upload_id를 지정하여 처리를 요청합니다.
+    
+    Args:
+        filename: 원본 파일 이름 (확장자로 형식 확인)
+        size: 전체 파일 크기 (바이트)
+    
+    Returns:
+        JSON: {"upload_id", "chunk_size", "total_chunks", "missing_chunks", ...}
+    """
+    file_extension = get_file_extension(filename)
+    loop = asyncio.get_running_loop()
+    try:
+        session = await loop.run_in_executor(io_executor, upload_sessions.create, filename, file_extension, size)
+    except UploadSessionError as e:
+        raise HTTPException(status_code=e.status_code, detail=str(e))
+    return await loop.run_in_executor(io_executor, upload_sessions.status, session)
+
+
+@router.get("/uploads/{upload_id}")
+async def get_upload(upload_id: str):
+    """이어받기 업로드의 상태와 아직 받지 못한 청크 번호를 조회합니다 (연결이 끊긴 뒤 이어서 보낼 때 사용)."""
+    loop = asyncio.get_running_loop()
+    try:
+        session = await loop.run_in_executor(io_executor, upload_sessions.get, upload_id)
+    except UploadSessionError as e:
+        raise HTTPException(status_code=e.status_code, detail=str(e))
+    return await loop.run_in_executor(io_executor, upload_sessions.status, session)
+
+
+@router.put("/uploads/{upload_id}/chunks/{index}")
+async def put_upload_chunk(upload_id: str, index: int, request: Request):
+    """
+    청크 하나를 받아 파일의 제자리에 기록합니다. 청크는 순서와 관계없이 동시에 보낼 수 있습니다.
+    X-Chunk-SHA256 헤더에 청크의 SHA-256 해시를 보내면 기록 전에 확인합니다 (일치하지 않으면 400).
+    
+    Args:
+        upload_id: 업로드 ID
+        index: 청크 번호 (0부터, 마지막 청크만 chunk_size보다 작음)
+        request: 요청 본문이 청크 내용
+    
+    Returns:
+        JSON: {"upload_id", "index", "received_bytes", "remaining_chunks"}
+    """
+    loop = asyncio.get_running_loop()
+    try:
+        # SQLite 저장소는 세션을 불러올 때 DB를 조회하므로 스레드에서 실행
+        session = await loop.run_in_executor(io_executor, upload_sessions.get, upload_id)
+        expected = session.chunk_length(index)
+    except UploadSessionError as e:
+        raise HTTPException(status_code=e.status_code, detail=str(e))
+    
+    # 청크 크기를 넘는 본문은 끝까지 받지 않고 거절
+    body = bytearray()
+    async for data in request.stream():
+        body.extend(data)
+        if len(body) > expected:
+            raise HTTPException(status_code=413, detail=f"청크 {index}의 크기는 {expected}바이트여야 합니다.")
+    
+    try:
+        # 기록한 뒤의 세션으로 응답 (SQLite 저장소는 기록 전에 불러온 세션에 이번 청크가 없음)
+        session = await loop.run_in_executor(
+            io_executor, upload_sessions.write_chunk,
+            upload_id, index, bytes(body), request.headers.get(CHUNK_CHECKSUM_HEADER)
+        )
+        received = await loop.run_in_executor(io_executor, upload_sessions.received_chunks, session)
+    except UploadSessionError as e:
+        raise HTTPException(status_code=e.status_code, detail=str(e))
+    return {
+        "upload_id": upload_id,
+        "index": index,
+        "received_bytes": session.received_bytes(received),
+        "remaining_chunks": len(session.missing_chunks(received))
+    }
+
+
+@router.post("/uploads/{upload_id}/complete")
+async def complete_upload(upload_id: str):
+    """
+    모든 청크를 받았는지 확인하고 업로드를 완료합니다.
+    받지 못한 청크가 있으면 409로 응답하며, /uploads/{upload_id}로 빠진 청크를 확인할 수 있습니다.
+    
+    Returns:
+        JSON: 업로드 상태 (sha256 포함)
+    """
+    loop = asyncio.get_running_loop()
+    try:
+        session = await loop.run_in_executor(io_executor, upload_sessions.complete, upload_id)
+    except UploadSessionError as e:
+        raise HTTPException(status_code=e.status_code, detail=str(e))
+    INPUT_BYTES.observe(session.size)
+    return await loop.run_in_executor(io_executor, upload_sessions.status, session)
+
+
+@router.delete("/uploads/{upload_id}")
+async def delete_upload(upload_id: str):
+    """이어받기 업로드를 취소하고 받은 청크를 삭제합니다."""
+    loop = asyncio.get_running_loop()
+    try:
+        await loop.run_in_executor(io_executor, upload_sessions.delete, upload_id)
+    except UploadSessionError as e:
+        raise HTTPException(status_code=e.status_code, detail=str(e))
+    return {"upload_id": upload_id, "deleted": True}
+
+
+def require_transcript_store():
+    """처리 결과 보관을 사용하지 않으면 404 오류를 발생시킵니다."""
+    if transcript_store is None:
+        raise HTTPException(status_code=404, detail="처리 결과 보관이 비활성화되어 있습니다. (transcripts.enabled)")
+
+
+@router.get("/transcripts")
+async def search_transcripts(q: str = None, limit: int = TRANSCRIPTS_PAGE_SIZE, offset: int = 0):
+    """
+    보관한 처리 결과를 검색합니다. 검색어가 없으면 최근 결과부터 나열합니다.
+    
+    Args:
+        q: 검색어 (원본 텍스트, 요약, 파일 이름에서 단어 앞부분으로 찾음, 여러 단어는 모두 포함된 결과만, 선택)
+        limit: 한 번에 반환할 개수 (1~100, 기본값: 20)
+        offset: 건너뛸 개수 (다음 페이지는 next_offset 사용)
+    
+    Returns:
+        JSON: {"total", "limit", "offset", "next_offset", "items": [{"transcript_id", "filename", "mode", "model",
+        "duration_seconds", "created_at", "snippet"}]} (검색어가 있으면 관련도 순, 없으면 최근 순)
+    """
+    require_transcript_store()
+    if not 1 <= limit <= TRANSCRIPTS_MAX_PAGE_SIZE:
+        raise HTTPException(status_code=400, detail=f"limit은 1~{TRANSCRIPTS_MAX_PAGE_SIZE} 사이여야 합니다.")
+    if offset < 0:
+        raise HTTPException(status_code=400, detail="offset은 0 이상이어야 합니다.")
+    
+    loop = asyncio.get_running_loop()
+    found = await loop.run_in_executor(io_executor, transcript_store.search, q, limit, offset)
+    next_offset = offset + limit
+    return {
+        "total": found["total"],
+        "limit": limit,
+        "offset": offset,
+        "next_offset": next_offset if next_offset < found["total"] else None,
+        "items": found["items"]
+    }
+
+
+@router.get("/transcripts/{transcript_id}")
+async def get_transcript(transcript_id: str):
+    """보관한 처리 결과(원본 텍스트와 요약 전체)를 조회합니다."""
+    require_transcript_store()
+    loop = asyncio.get_running_loop()
+    transcript = await loop.run_in_executor(io_executor, transcript_store.get, transcript_id)
+    if transcript is None:
+        raise HTTPException(status_code=404, detail="처리 결과를 찾을 수 없습니다. (보관 기간이 지났거나 존재하지 않는 결과)")
+    return transcript
+
+
+@router.delete("/transcripts/{transcript_id}")
+async def delete_transcript(transcript_id: str):
+    """보관한 처리 결과를 삭제합니다 (개인정보 보호)."""
+    require_transcript_store()
+    loop = asyncio.get_running_loop()
+    deleted = await loop.run_in_executor(io_executor, transcript_store.delete, transcript_id)
+    if not deleted:
+        raise HTTPException(status_code=404, detail="처리 결과를 찾을 수 없습니다. (보관 기간이 지났거나 존재하지 않는 결과)")
+    return {"transcript_id": transcript_id, "deleted": True}
+
+
+# 모듈 불러오기와 앱 생성에 걸린 시간 (lifespan에서 시작 시간과 함께 기록)
+MODULE_LOAD_SECONDS = time.perf_counter() - MODULE_LOAD_STARTED
+APP_CREATE_SECONDS = 0.0
 
 
 if __name__ == "__main__":
     # 서버 설정 가져오기
+    apply_settings(load_config())
     server_config = config.get('server', {})
     host = server_config.get('host', '0.0.0.0')
     port = server_config.get('port', 8000)
@@ -421,6 +2676,13 @@ if __name__ == "__main__":
     # 프로토콜 결정
     protocol = "https" if https_enabled else "http"
     
+    # 워커가 여러 개이면 uvicorn이 워커 프로세스마다 server 모듈을 다시 불러와 create_app으로 앱을 만듦
+    if WORKERS > 1:
+        setup_logging(config)
+        app_target = "server:create_app"
+    else:
+        app_target = create_app(config)
+    
     logging.info("=" * 70)
     logging.info("🚀 음성 텍스트 변환/요약 서비스 시작 (Powered by Gemini 1.5 Flash)")
     logging.info("=" * 70)
@@ -428,6 +2690,18 @@ if __name__ == "__main__":
     logging.info(f"API 문서: {protocol}://{host}:{port}/docs")
     logging.info("지원 형식: mp3, wav, m4a, ogg, flac, aac, wma, webm")
     logging.info("주의: 무료 API 사용으로 하루 1,500회 제한이 있습니다.")
+    logging.info(f"워커 프로세스: {WORKERS}개 (종료 시 최대 {DRAIN_TIMEOUT}초 동안 진행 중인 작업 처리)")
+    
+    run_options = {
+        "factory": WORKERS > 1,
+        "host": host,
+        "port": port,
+        "log_level": "info",
+        "workers": WORKERS,
+        # 종료 신호(SIGTERM)를 받으면 새 연결은 받지 않고, 처리 중인 요청은 이 시간까지 기다림
+        "timeout_graceful_shutdown": DRAIN_TIMEOUT,
+        "app_dir": os.path.dirname(os.path.abspath(__file__))
+    }
     
     if https_enabled:
         cert_file = https_config.get('cert_file')
@@ -448,22 +2722,10 @@ if __name__ == "__main__":
         logging.info("=" * 70)
         
         # HTTPS로 서버 시작
-        uvicorn.run(
-            app,
-            host=host,
-            port=port,
-            log_level="info",
-            ssl_keyfile=key_file,
-            ssl_certfile=cert_file
-        )
+        uvicorn.run(app_target, ssl_keyfile=key_file, ssl_certfile=cert_file, **run_options)
     else:
         logging.info("HTTPS 비활성화됨 (HTTP 모드)")
         logging.info("=" * 70)
         
         # HTTP로 서버 시작
-        uvicorn.run(
-            app,
-            host=host,
-            port=port,
-            log_level="info"
-        )
+        uvicorn.run(app_target, **run_options)
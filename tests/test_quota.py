@@ -0,0 +1,117 @@
+import threading
+
+import pytest
+
+import quota
+from quota import DailyUsage, QuotaExceededError, RateLimiter, SQLiteDailyUsage, TokenBucket
+
+
+class FakeClock:
+    """time.monotonic/time.time 대신 사용하는 시계 (advance로 시간을 진행)"""
+
+    def __init__(self, now: float = 1000.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+    def advance(self, seconds: float):
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(quota.time, "monotonic", fake)
+    monkeypatch.setattr(quota.time, "time", fake)
+    return fake
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return str(tmp_path / "quota.db")
+
+
+def test_bucket_refills_at_rpm_per_minute(clock):
+    bucket = TokenBucket(60)  # 초당 1개
+    for _ in range(60):
+        assert bucket.try_take() == 0.0
+    assert bucket.try_take() == pytest.approx(1.0)
+
+    clock.advance(0.5)
+    assert bucket.available() == pytest.approx(0.5)
+    assert bucket.try_take() == pytest.approx(0.5)
+
+    clock.advance(0.5)
+    assert bucket.try_take() == 0.0
+    assert bucket.available() == pytest.approx(0.0)
+
+
+def test_bucket_never_exceeds_capacity(clock):
+    bucket = TokenBucket(6)
+    bucket.try_take()
+    clock.advance(3600)
+    assert bucket.available() == 6
+
+
+def test_sqlite_bucket_refill_is_shared_between_stores(clock, db_path):
+    # 같은 파일을 쓰는 두 저장소(워커)가 분당 한도 하나를 함께 사용
+    first = SQLiteDailyUsage(db_path).create_bucket("flash", 2)
+    second = SQLiteDailyUsage(db_path).create_bucket("flash", 2)
+    assert first.try_take() == 0.0
+    assert second.try_take() == 0.0
+    assert first.try_take() == pytest.approx(30.0)  # rpm 2 -> 30초마다 1개
+
+    clock.advance(15)
+    assert second.available() == pytest.approx(0.5)
+    clock.advance(15)
+    assert second.try_take() == 0.0
+
+
+@pytest.mark.parametrize("make_usage", [lambda path: DailyUsage(), SQLiteDailyUsage], ids=["memory", "sqlite"])
+def test_try_increment_stops_at_limit(make_usage, db_path):
+    usage = make_usage(db_path)
+    assert [usage.try_increment("flash", 3) for _ in range(4)] == [True, True, True, False]
+    assert usage.get("flash") == 3
+    # 모델마다 따로 집계
+    assert usage.try_increment("pro", 3)
+    assert usage.get("pro") == 1
+
+
+def test_sqlite_try_increment_limit_is_shared_between_stores(db_path):
+    first = SQLiteDailyUsage(db_path)
+    second = SQLiteDailyUsage(db_path)
+    assert first.try_increment("flash", 2)
+    assert second.try_increment("flash", 2)
+    assert not first.try_increment("flash", 2)
+    assert not second.try_increment("flash", 2)
+    assert first.get("flash") == second.get("flash") == 2
+
+
+def test_sqlite_try_increment_is_atomic_across_threads(db_path):
+    usage = SQLiteDailyUsage(db_path)
+    results = []
+    lock = threading.Lock()
+
+    def increment():
+        taken = usage.try_increment("flash", 10)
+        with lock:
+            results.append(taken)
+
+    threads = [threading.Thread(target=increment) for _ in range(30)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert results.count(True) == 10
+    assert usage.get("flash") == 10
+
+
+def test_acquire_rejects_after_daily_limit(db_path):
+    limiter = RateLimiter(SQLiteDailyUsage(db_path), default_limits={"rpm": 1000, "rpd": 2})
+    limiter.acquire("flash")
+    limiter.acquire("flash")
+    with pytest.raises(QuotaExceededError):
+        limiter.acquire("flash")
+    assert limiter.remaining_today("flash") == 0
+    assert limiter.stats()["rejected"] == 1
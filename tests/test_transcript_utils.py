@@ -0,0 +1,53 @@
+from transcript_utils import MIN_OVERLAP_WORDS, find_overlap, split_text, stitch_transcripts
+
+
+def test_stitch_removes_overlap_of_min_words():
+    previous = "오늘 회의는 예산 검토로 시작했습니다"
+    following = "예산 검토로 시작했습니다 다음은 일정입니다"
+    assert MIN_OVERLAP_WORDS == 3
+    assert stitch_transcripts([previous, following]) == f"{previous}\n\n다음은 일정입니다"
+
+
+def test_stitch_keeps_overlap_shorter_than_min_words():
+    # 두 단어만 같으면 우연히 같은 표현일 수 있으므로 제거하지 않음
+    previous = "오늘 회의는 예산 검토로"
+    following = "예산 검토로 넘어가겠습니다"
+    assert find_overlap(previous, following) == 0
+    assert stitch_transcripts([previous, following]) == f"{previous}\n\n{following}"
+
+
+def test_overlap_ignores_case_and_punctuation():
+    assert find_overlap("We agreed on the Budget, then", "the budget then moved on") == 3
+
+
+def test_overlap_prefers_longest_match():
+    previous = "a b c a b c"
+    following = "a b c a b c d"
+    assert find_overlap(previous, following) == 6
+    assert stitch_transcripts([previous, following]) == "a b c a b c\n\nd"
+
+
+def test_stitch_drops_segment_fully_covered_by_overlap_and_empty_segments():
+    previous = "하나 둘 셋 넷"
+    assert stitch_transcripts([previous, "  ", "둘 셋 넷", "다섯"]) == f"{previous}\n\n다섯"
+
+
+def test_split_text_short_text_is_single_chunk():
+    assert split_text("  짧은 텍스트  ", 100) == ["짧은 텍스트"]
+
+
+def test_split_text_prefers_paragraph_boundary():
+    first = "가" * 60
+    second = "나" * 60
+    assert split_text(f"{first}\n\n{second}", 100) == [first, second]
+
+
+def test_split_text_chunks_respect_limit_and_keep_content():
+    text = " ".join(f"문장{index}." for index in range(200))
+    chunks = split_text(text, 50)
+    assert all(len(chunk) <= 50 for chunk in chunks)
+    assert " ".join(chunks).split() == text.split()
+
+
+def test_split_text_cuts_by_length_without_boundary():
+    assert split_text("가" * 250, 100) == ["가" * 100, "가" * 100, "가" * 50]
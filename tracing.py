@@ -0,0 +1,263 @@
+import os
+import json
+import time
+import uuid
+import atexit
+import asyncio
+import logging
+import functools
+import contextvars
+from contextlib import contextmanager
+from logging.handlers import QueueHandler, QueueListener
+from queue import Queue
+from typing import List, Optional
+
+
+# 현재 요청 ID (미들웨어에서 지정, 로그와 span에 기록)
+request_id_var = contextvars.ContextVar("request_id", default=None)
+
+# 현재 실행 중인 span (하위 span의 부모)
+current_span_var = contextvars.ContextVar("current_span", default=None)
+
+# 요청 ID 헤더
+REQUEST_ID_HEADER = "X-Request-ID"
+
+# 클라이언트가 보낸 요청 ID로 허용할 최대 길이
+MAX_REQUEST_ID_LENGTH = 64
+
+# span 기록용 로거 (file 내보내기는 이 로거에만 연결)
+SPAN_LOGGER = "tracing.spans"
+
+
+def new_id() -> str:
+    """16자리 16진수 ID를 생성합니다."""
+    return uuid.uuid4().hex[:16]
+
+
+def current_request_id() -> Optional[str]:
+    return request_id_var.get()
+
+
+def accept_request_id(value: Optional[str]) -> str:
+    """
+    클라이언트가 보낸 요청 ID가 안전한 형식이면 그대로 사용하고, 아니면 새로 생성합니다.
+
+    Args:
+        value: X-Request-ID 헤더 값 (없으면 None)
+
+    Returns:
+        요청 ID
+    """
+    if value and len(value) <= MAX_REQUEST_ID_LENGTH and all(c.isalnum() or c in "-_." for c in value):
+        return value
+    return new_id()
+
+
+def call_with_request_id(request_id: Optional[str], func, *args):
+    """
+    요청 ID를 지정한 뒤 함수를 실행합니다.
+    컨텍스트가 전달되지 않는 별도 프로세스에서도 로그에 요청 ID가 남도록 변환 작업에 사용합니다.
+    """
+    request_id_var.set(request_id)
+    return func(*args)
+
+
+class RequestContextFilter(logging.Filter):
+    """로그 레코드에 현재 요청 ID와 span ID를 추가합니다 (로그를 남기는 스레드에서 실행)."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        request_id = request_id_var.get()
+        span = current_span_var.get()
+        record.request_id = request_id
+        record.span_id = span.span_id if span else None
+        record.request_tag = f"[{request_id}] " if request_id else ""
+        return True
+
+
+class JsonFormatter(logging.Formatter):
+    """로그 레코드를 한 줄의 JSON으로 변환합니다."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": self.formatTime(record, "%Y-%m-%dT%H:%M:%S"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "request_id": getattr(record, "request_id", None),
+            "span_id": getattr(record, "span_id", None)
+        }
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        span = getattr(record, "span", None)
+        if span:
+            entry["span"] = span
+        return json.dumps(entry, ensure_ascii=False)
+
+
+def start_queue_logging(logger: logging.Logger, handlers: List[logging.Handler]) -> QueueListener:
+    """
+    로거가 큐에 레코드만 넣고, 실제 파일/콘솔 기록은 별도 스레드에서 하도록 설정합니다.
+    요청을 처리하는 스레드가 로그 파일 쓰기를 기다리지 않습니다.
+
+    Args:
+        logger: 설정할 로거
+        handlers: 실제로 기록할 핸들러 목록
+
+    Returns:
+        시작된 QueueListener (프로세스 종료 시 남은 로그를 기록하고 멈춥니다)
+    """
+    log_queue = Queue(-1)
+    queue_handler = QueueHandler(log_queue)
+    # 요청 ID는 컨텍스트 변수이므로 로그를 남기는 스레드에서 미리 기록
+    queue_handler.addFilter(RequestContextFilter())
+    logger.addHandler(queue_handler)
+
+    listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+    listener.start()
+    atexit.register(listener.stop)
+    return listener
+
+
+class Span:
+    """
+    처리 구간 하나의 시작/종료 시각과 속성입니다 (OpenTelemetry span과 같은 구조).
+    같은 요청의 span은 요청 ID를 trace_id로 공유하며, parent_span_id로 호출 관계를 나타냅니다.
+    """
+
+    def __init__(self, name: str, attributes: dict):
+        parent = current_span_var.get()
+        self.name = name
+        self.trace_id = parent.trace_id if parent else (request_id_var.get() or new_id())
+        self.span_id = new_id()
+        self.parent_span_id = parent.span_id if parent else None
+        self.attributes = attributes
+        self.status = "ok"
+        self.start_time = time.time()
+        self._start = time.perf_counter()
+        self.duration_ms = None
+
+    def set_attribute(self, key: str, value):
+        self.attributes[key] = value
+
+    def end(self):
+        self.duration_ms = round((time.perf_counter() - self._start) * 1000, 2)
+
+    def to_dict(self) -> dict:
+        return {
+            "name": self.name,
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_span_id": self.parent_span_id,
+            "start_time": round(self.start_time, 6),
+            "duration_ms": self.duration_ms,
+            "status": self.status,
+            "attributes": self.attributes
+        }
+
+
+class Tracer:
+    """
+    span을 만들고, 끝난 span을 설정한 방식으로 내보냅니다.
+    내보내기는 로그 큐를 거치므로 요청 처리 중에 파일 쓰기를 기다리지 않습니다.
+
+    내보내기 방식:
+        console: 서버 로그에 한 줄로 기록
+        file: span마다 JSON 한 줄씩 별도 파일에 기록
+    """
+
+    def __init__(self, enabled: bool = False, exporter: str = "console"):
+        self.enabled = enabled
+        self.exporter = exporter
+        self._logger = logging.getLogger(SPAN_LOGGER)
+
+    @contextmanager
+    def span(self, name: str, **attributes):
+        """
+        with 블록을 span 하나로 기록합니다. 추적이 꺼져 있으면 아무것도 하지 않습니다.
+
+        Args:
+            name: span 이름
+            attributes: span 속성
+        """
+        if not self.enabled:
+            yield None
+            return
+
+        span = Span(name, attributes)
+        token = current_span_var.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.status = "error"
+            span.set_attribute("error", str(e) or type(e).__name__)
+            raise
+        finally:
+            current_span_var.reset(token)
+            span.end()
+            self._export(span)
+
+    def _export(self, span: Span):
+        data = span.to_dict()
+        if self.exporter == "file":
+            self._logger.info(json.dumps(data, ensure_ascii=False))
+        else:
+            self._logger.info(
+                f"[추적] {span.name} {span.duration_ms:.1f}ms ({span.status}, span={span.span_id}, "
+                f"parent={span.parent_span_id or '-'})",
+                extra={"span": data}
+            )
+
+
+# 기본 추적기 (configure_tracing으로 설정)
+tracer = Tracer()
+
+
+def span(name: str, **attributes):
+    """기본 추적기로 span을 기록합니다 (with 문에서 사용)."""
+    return tracer.span(name, **attributes)
+
+
+def traced(name: str):
+    """함수 실행 전체를 span으로 기록하는 데코레이터입니다 (일반 함수와 async 함수 모두 지원)."""
+    def decorator(func):
+        if asyncio.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                with tracer.span(name):
+                    return await func(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with tracer.span(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def configure_tracing(tracing_config: dict):
+    """
+    설정에 따라 기본 추적기를 설정합니다.
+    file 내보내기는 span을 별도 JSONL 파일에 기록하며, 서버 로그에는 남기지 않습니다.
+
+    Args:
+        tracing_config: config.yaml의 tracing 섹션
+    """
+    tracer.enabled = tracing_config.get('enabled', False)
+    tracer.exporter = tracing_config.get('exporter', 'console')
+    if not tracer.enabled or tracer.exporter != 'file':
+        return
+
+    file_path = tracing_config.get('file_path', 'logs/spans.jsonl')
+    file_dir = os.path.dirname(file_path)
+    if file_dir:
+        os.makedirs(file_dir, exist_ok=True)
+    span_logger = logging.getLogger(SPAN_LOGGER)
+    for handler in span_logger.handlers[:]:
+        span_logger.removeHandler(handler)
+    span_logger.propagate = False
+    span_logger.setLevel(logging.INFO)
+    file_handler = logging.FileHandler(file_path, encoding='utf-8')
+    file_handler.setFormatter(logging.Formatter('%(message)s'))
+    start_queue_logging(span_logger, [file_handler])
+    logging.info(f"[추적] span 기록 파일: {file_path}")
@@ -0,0 +1,265 @@
+import os
+import time
+import uuid
+import sqlite3
+import logging
+import threading
+from typing import Optional
+
+
+# 목록/검색 결과에 함께 보여 줄 요약 앞부분 길이 (검색어가 없을 때)
+PREVIEW_CHARS = 200
+
+# 검색 결과 발췌에서 검색어를 표시할 기호와 발췌 길이 (토큰 수)
+SNIPPET_MARK = "**"
+SNIPPET_TOKENS = 16
+
+# 목록/검색 결과 항목에 포함할 열 (원본 텍스트와 요약 전체는 제외)
+SUMMARY_COLUMNS = "t.transcript_id, t.filename, t.mode, t.model, t.duration_seconds, t.created_at"
+
+
+def build_match_query(query: str) -> str:
+    """
+    검색어를 FTS5 검색식으로 변환합니다.
+    단어마다 따옴표로 감싸 검색 문법으로 해석되지 않게 하고, 앞부분 일치로 찾습니다
+    ("회의"로 "회의에서", "회의록"도 찾음). 여러 단어는 모두 포함된 결과만 찾습니다.
+
+    Args:
+        query: 사용자가 입력한 검색어
+
+    Returns:
+        FTS5 MATCH 검색식
+    """
+    return " ".join('"' + term.replace('"', '""') + '"*' for term in query.split())
+
+
+class TranscriptStore:
+    """
+    처리 결과(변환 텍스트와 요약)를 SQLite에 보관하고 FTS5 전문 검색 색인으로 검색합니다.
+    같은 회의를 다시 찾을 때 오디오를 다시 처리하지 않고 보관한 결과를 조회할 수 있습니다.
+    보관 기간(retention_days)이 지나거나 최대 개수(max_entries)를 넘은 오래된 결과는 주기적으로 삭제합니다.
+    여러 워커 프로세스가 같은 파일을 함께 사용할 수 있습니다.
+    """
+
+    def __init__(self, db_path: str, retention_days: float = 90, max_entries: int = 0):
+        db_dir = os.path.dirname(db_path)
+        if db_dir:
+            os.makedirs(db_dir, exist_ok=True)
+        self.db_path = db_path
+        self.retention_seconds = retention_days * 86400
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        # 다른 워커가 쓰는 동안에는 잠금이 풀릴 때까지 기다림
+        self._conn = sqlite3.connect(db_path, timeout=30, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        with self._lock, self._conn:
+            # 전문 검색 색인이 행을 가리키므로 VACUUM 후에도 바뀌지 않는 정수 키 사용
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS transcripts (
+                    id INTEGER PRIMARY KEY,
+                    transcript_id TEXT NOT NULL UNIQUE,
+                    filename TEXT,
+                    mode TEXT,
+                    model TEXT,
+                    duration_seconds REAL,
+                    original_text TEXT NOT NULL,
+                    summary TEXT NOT NULL,
+                    created_at REAL NOT NULL
+                )
+                """
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS transcripts_created_at ON transcripts (created_at)")
+            self.full_text_search = self._create_search_index()
+        logging.info(
+            f"[보관] 처리 결과 보관 사용: {db_path} "
+            f"(보관 기간: {f'{retention_days}일' if retention_days else '제한 없음'}, "
+            f"최대 개수: {max_entries or '제한 없음'}, 전문 검색: {'FTS5' if self.full_text_search else 'LIKE'})"
+        )
+
+    def _create_search_index(self) -> bool:
+        """
+        원본 텍스트, 요약, 파일 이름의 FTS5 전문 검색 색인을 만듭니다.
+        색인은 트리거로 결과 테이블과 함께 갱신됩니다.
+
+        Returns:
+            색인 사용 여부 (SQLite에 FTS5가 없으면 False, 이때는 LIKE로 검색)
+        """
+        try:
+            self._conn.execute(
+                """
+                CREATE VIRTUAL TABLE IF NOT EXISTS transcripts_fts USING fts5(
+                    filename, original_text, summary,
+                    content='transcripts', content_rowid='id', prefix='2 3'
+                )
+                """
+            )
+        except sqlite3.OperationalError as e:
+            logging.warning(f"[보관] SQLite에서 FTS5를 사용할 수 없어 LIKE로 검색합니다 (검색이 느려질 수 있음): {e}")
+            return False
+        self._conn.execute(
+            """
+            CREATE TRIGGER IF NOT EXISTS transcripts_fts_insert AFTER INSERT ON transcripts BEGIN
+                INSERT INTO transcripts_fts (rowid, filename, original_text, summary)
+                VALUES (new.id, new.filename, new.original_text, new.summary);
+            END
+            """
+        )
+        self._conn.execute(
+            """
+            CREATE TRIGGER IF NOT EXISTS transcripts_fts_delete AFTER DELETE ON transcripts BEGIN
+                INSERT INTO transcripts_fts (transcripts_fts, rowid, filename, original_text, summary)
+                VALUES ('delete', old.id, old.filename, old.original_text, old.summary);
+            END
+            """
+        )
+        return True
+
+    def add(self, filename: Optional[str], original_text: str, summary: str, model: Optional[str] = None,
+            mode: Optional[str] = None, duration_seconds: Optional[float] = None) -> str:
+        """
+        처리 결과를 보관합니다.
+
+        Args:
+            filename: 업로드한 파일 이름
+            original_text: 변환된 원본 텍스트
+            summary: 요약
+            model: 사용한 Gemini 모델
+            mode: 분석 방식
+            duration_seconds: 오디오 길이 (초, 확인하지 않았으면 None)
+
+        Returns:
+            보관한 결과의 ID
+        """
+        transcript_id = uuid.uuid4().hex
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT INTO transcripts (transcript_id, filename, mode, model, duration_seconds, "
+                "original_text, summary, created_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (transcript_id, filename, mode, model, duration_seconds, original_text, summary, time.time())
+            )
+        return transcript_id
+
+    def get(self, transcript_id: str) -> Optional[dict]:
+        """보관한 결과 전체를 조회합니다. 없으면 None을 반환합니다."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT transcript_id, filename, mode, model, duration_seconds, original_text, summary, created_at "
+                "FROM transcripts WHERE transcript_id = ?",
+                (transcript_id,)
+            ).fetchone()
+        return dict(row) if row else None
+
+    def delete(self, transcript_id: str) -> bool:
+        """보관한 결과를 삭제합니다. 삭제했으면 True를 반환합니다."""
+        with self._lock, self._conn:
+            cursor = self._conn.execute("DELETE FROM transcripts WHERE transcript_id = ?", (transcript_id,))
+        return cursor.rowcount > 0
+
+    def search(self, query: Optional[str] = None, limit: int = 20, offset: int = 0) -> dict:
+        """
+        보관한 결과를 검색합니다. 검색어가 없으면 최근 결과부터 나열합니다.
+
+        Args:
+            query: 검색어 (원본 텍스트, 요약, 파일 이름에서 찾음, 없으면 전체 목록)
+            limit: 한 번에 반환할 최대 개수
+            offset: 건너뛸 개수 (페이지 이동)
+
+        Returns:
+            {"total": 전체 결과 수, "items": [결과 정보와 발췌]} 딕셔너리
+            (검색어가 있으면 관련도 순, 없으면 최근 순)
+        """
+        query = (query or "").strip()
+        with self._lock:
+            if not query:
+                total = self._conn.execute("SELECT COUNT(*) FROM transcripts").fetchone()[0]
+                rows = self._conn.execute(
+                    f"SELECT {SUMMARY_COLUMNS}, substr(t.summary, 1, {PREVIEW_CHARS}) AS snippet "
+                    "FROM transcripts t ORDER BY t.created_at DESC LIMIT ? OFFSET ?",
+                    (limit, offset)
+                ).fetchall()
+            elif self.full_text_search:
+                match = build_match_query(query)
+                total = self._conn.execute(
+                    "SELECT COUNT(*) FROM transcripts_fts WHERE transcripts_fts MATCH ?", (match,)
+                ).fetchone()[0]
+                rows = self._conn.execute(
+                    f"SELECT {SUMMARY_COLUMNS}, "
+                    f"snippet(transcripts_fts, -1, ?, ?, '…', {SNIPPET_TOKENS}) AS snippet "
+                    "FROM transcripts_fts JOIN transcripts t ON t.id = transcripts_fts.rowid "
+                    "WHERE transcripts_fts MATCH ? ORDER BY transcripts_fts.rank LIMIT ? OFFSET ?",
+                    (SNIPPET_MARK, SNIPPET_MARK, match, limit, offset)
+                ).fetchall()
+            else:
+                terms = query.split()
+                condition = " AND ".join(
+                    "(t.original_text LIKE ? ESCAPE '\\' OR t.summary LIKE ? ESCAPE '\\' "
+                    "OR t.filename LIKE ? ESCAPE '\\')" for _ in terms
+                )
+                params = []
+                for term in terms:
+                    pattern = "%" + term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+                    params.extend([pattern] * 3)
+                total = self._conn.execute(
+                    f"SELECT COUNT(*) FROM transcripts t WHERE {condition}", params
+                ).fetchone()[0]
+                rows = self._conn.execute(
+                    f"SELECT {SUMMARY_COLUMNS}, substr(t.summary, 1, {PREVIEW_CHARS}) AS snippet "
+                    f"FROM transcripts t WHERE {condition} ORDER BY t.created_at DESC LIMIT ? OFFSET ?",
+                    params + [limit, offset]
+                ).fetchall()
+        return {"total": total, "items": [dict(row) for row in rows]}
+
+    def evict_expired(self) -> int:
+        """
+        보관 기간이 지났거나 최대 개수를 넘은 오래된 결과를 삭제합니다.
+
+        Returns:
+            삭제한 결과 수
+        """
+        removed = 0
+        with self._lock, self._conn:
+            if self.retention_seconds:
+                cutoff = time.time() - self.retention_seconds
+                removed += self._conn.execute("DELETE FROM transcripts WHERE created_at < ?", (cutoff,)).rowcount
+            if self.max_entries:
+                removed += self._conn.execute(
+                    "DELETE FROM transcripts WHERE id IN "
+                    "(SELECT id FROM transcripts ORDER BY created_at DESC LIMIT -1 OFFSET ?)",
+                    (self.max_entries,)
+                ).rowcount
+        if removed:
+            logging.info(f"[보관] 보관 기간이 지났거나 최대 개수를 넘은 결과 {removed}개 삭제")
+        return removed
+
+    def stats(self) -> dict:
+        """보관한 결과 수와 설정"""
+        with self._lock:
+            count = self._conn.execute("SELECT COUNT(*) FROM transcripts").fetchone()[0]
+        return {
+            "enabled": True,
+            "count": count,
+            "retention_days": self.retention_seconds / 86400 or None,
+            "max_entries": self.max_entries or None,
+            "full_text_search": self.full_text_search
+        }
+
+
+def create_transcript_store(transcripts_config: dict) -> Optional[TranscriptStore]:
+    """
+    설정에 따라 처리 결과 보관소를 생성합니다.
+
+    Args:
+        transcripts_config: config.yaml의 transcripts 섹션
+
+    Returns:
+        TranscriptStore (보관이 비활성화되어 있으면 None)
+    """
+    if not transcripts_config.get('enabled', False):
+        return None
+    return TranscriptStore(
+        transcripts_config.get('sqlite_path', 'data/transcripts.db'),
+        retention_days=transcripts_config.get('retention_days', 90),
+        max_entries=transcripts_config.get('max_entries', 0)
+    )
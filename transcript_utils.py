@@ -0,0 +1,90 @@
+from typing import List
+
+
+# 구간 경계에서 겹침을 찾을 때 비교할 최대 단어 수
+OVERLAP_SEARCH_WORDS = 80
+
+# 겹침으로 인정할 최소 단어 수 (우연히 같은 짧은 표현은 제거하지 않음)
+MIN_OVERLAP_WORDS = 3
+
+
+def _normalize_word(word: str) -> str:
+    """비교용으로 단어의 문장부호를 제거하고 소문자로 바꿉니다."""
+    return word.strip('.,!?…"\'“”‘’()[]').lower()
+
+
+def find_overlap(previous_text: str, next_text: str) -> int:
+    """
+    앞 구간 텍스트의 끝부분과 다음 구간 텍스트의 앞부분이 겹치는 단어 수를 찾습니다.
+
+    Args:
+        previous_text: 앞 구간 텍스트
+        next_text: 다음 구간 텍스트
+
+    Returns:
+        다음 구간 앞부분에서 제거할 단어 수 (겹침이 없으면 0)
+    """
+    tail = [_normalize_word(word) for word in previous_text.split()[-OVERLAP_SEARCH_WORDS:]]
+    head = [_normalize_word(word) for word in next_text.split()[:OVERLAP_SEARCH_WORDS]]
+
+    for size in range(min(len(tail), len(head)), MIN_OVERLAP_WORDS - 1, -1):
+        if tail[-size:] == head[:size]:
+            return size
+    return 0
+
+
+def stitch_transcripts(texts: List[str]) -> str:
+    """
+    구간별 변환 텍스트를 순서대로 이어 붙입니다.
+    구간이 겹치게 잘린 경우 경계에서 중복된 단어를 제거합니다.
+
+    Args:
+        texts: 구간 순서대로 정렬된 변환 텍스트 목록
+
+    Returns:
+        이어 붙인 전체 텍스트
+    """
+    stitched = []
+    for text in texts:
+        text = text.strip()
+        if not text:
+            continue
+        if stitched:
+            overlap = find_overlap(stitched[-1], text)
+            if overlap:
+                text = " ".join(text.split()[overlap:])
+        if text:
+            stitched.append(text)
+    return "\n\n".join(stitched)
+
+
+def split_text(text: str, max_chars: int) -> List[str]:
+    """
+    긴 텍스트를 max_chars 이하의 조각으로 나눕니다.
+    가능하면 문단, 줄, 문장 경계에서 자르고, 경계가 없으면 글자 수로 자릅니다.
+
+    Args:
+        text: 나눌 텍스트
+        max_chars: 조각당 최대 글자 수
+
+    Returns:
+        순서대로 정렬된 텍스트 조각 목록
+    """
+    chunks = []
+    remaining = text.strip()
+    while len(remaining) > max_chars:
+        window = remaining[:max_chars]
+        cut = -1
+        for separator in ("\n\n", "\n", ". ", "? ", "! ", " "):
+            position = window.rfind(separator)
+            # 너무 앞에서 잘리지 않도록 절반 이후의 경계만 사용
+            if position >= max_chars // 2:
+                cut = position + len(separator)
+                break
+        if cut == -1:
+            cut = max_chars
+        chunks.append(remaining[:cut].strip())
+        remaining = remaining[cut:].strip()
+    if remaining:
+        chunks.append(remaining)
+    return chunks
@@ -0,0 +1,524 @@
+import os
+import time
+import uuid
+import hashlib
+import sqlite3
+import logging
+import tempfile
+import threading
+from typing import List, Optional, Set
+
+
+# 청크 파일을 해시 계산용으로 다시 읽을 때 한 번에 읽을 크기
+HASH_READ_SIZE = 1024 * 1024  # 1MB
+
+
+class UploadSessionError(Exception):
+    """이어받기 업로드 요청이 올바르지 않을 때 발생하는 예외 (status_code는 HTTP 응답 코드)"""
+
+    def __init__(self, message: str, status_code: int = 400):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+class UploadSession:
+    """
+    이어받기 업로드 하나의 상태입니다.
+    파일은 처음부터 전체 크기의 임시 파일로 만들고, 번호가 붙은 청크를 받는 순서와 관계없이 제자리에 기록합니다.
+    앞에서부터 빠짐없이 받은 청크는 업로드가 끝나기 전에 미리 SHA-256 해시에 반영합니다.
+    """
+
+    def __init__(self, filename: str, extension: str, size: int, chunk_size: int, path: str,
+                 upload_id: Optional[str] = None):
+        self.upload_id = upload_id or uuid.uuid4().hex
+        self.filename = filename
+        self.extension = extension
+        self.size = size
+        self.chunk_size = chunk_size
+        self.total_chunks = (size + chunk_size - 1) // chunk_size
+        self.path = path
+        self.received = set()
+        self.completed = False
+        self.created_at = time.time()
+        self.updated_at = self.created_at
+        self.final_sha256 = None  # 완료 시 계산해 둔 해시 (SQLite 저장소에서 불러온 세션)
+        self._digest = hashlib.sha256()
+        self._hashed_chunks = 0
+        self._hash_lock = threading.Lock()
+
+    def chunk_length(self, index: int) -> int:
+        """
+        청크의 크기 (마지막 청크만 작을 수 있음)
+
+        Raises:
+            UploadSessionError: 청크 번호가 범위를 벗어난 경우 (400)
+        """
+        if not 0 <= index < self.total_chunks:
+            raise UploadSessionError(f"청크 번호는 0~{self.total_chunks - 1} 사이여야 합니다: {index}")
+        return min(self.chunk_size, self.size - index * self.chunk_size)
+
+    def missing_chunks(self, received: Optional[Set[int]] = None) -> List[int]:
+        """받지 못한 청크 번호 (received: 저장소 잠금 안에서 복사한 받은 청크 목록, 없으면 현재 목록)"""
+        received = self.received if received is None else received
+        return [index for index in range(self.total_chunks) if index not in received]
+
+    def received_bytes(self, received: Optional[Set[int]] = None) -> int:
+        """받은 바이트 수 (received는 missing_chunks와 같음)"""
+        received = self.received if received is None else received
+        return sum(self.chunk_length(index) for index in received)
+
+    @property
+    def sha256(self) -> Optional[str]:
+        """전체 파일의 해시 (모든 청크를 해시에 반영하기 전에는 None)"""
+        if self.final_sha256:
+            return self.final_sha256
+        if self._hashed_chunks < self.total_chunks:
+            return None
+        return self._digest.hexdigest()
+
+    def advance_hash(self):
+        """앞에서부터 이어서 받은 청크를 디스크에서 읽어 해시에 반영합니다 (여러 스레드에서 호출 가능)."""
+        with self._hash_lock:
+            with open(self.path, 'rb') as f:
+                while self._hashed_chunks in self.received:
+                    f.seek(self._hashed_chunks * self.chunk_size)
+                    remaining = self.chunk_length(self._hashed_chunks)
+                    while remaining:
+                        data = f.read(min(HASH_READ_SIZE, remaining))
+                        if not data:
+                            raise UploadSessionError("저장된 청크를 읽을 수 없습니다.", 500)
+                        self._digest.update(data)
+                        remaining -= len(data)
+                    self._hashed_chunks += 1
+
+    def to_dict(self, ttl_seconds: float, received: Optional[Set[int]] = None) -> dict:
+        """API 응답용 상태 정보 (received는 missing_chunks와 같음)"""
+        received = self.received if received is None else received
+        return {
+            "upload_id": self.upload_id,
+            "filename": self.filename,
+            "size": self.size,
+            "chunk_size": self.chunk_size,
+            "total_chunks": self.total_chunks,
+            "received_bytes": self.received_bytes(received),
+            "missing_chunks": self.missing_chunks(received),
+            "completed": self.completed,
+            "sha256": self.sha256 if self.completed else None,
+            "expires_at": self.updated_at + ttl_seconds
+        }
+
+
+class UploadSessionStore:
+    """
+    메모리 기반 이어받기 업로드 저장소입니다.
+    청크 기록과 해시 계산은 디스크 I/O이므로 스레드에서 호출합니다.
+    ttl_seconds 동안 청크가 도착하지 않은 세션은 evict_expired에서 임시 파일과 함께 삭제합니다.
+    """
+
+    def __init__(self, chunk_size: int, ttl_seconds: float, max_sessions: int, max_bytes: int,
+                 temp_dir: Optional[str] = None):
+        self.chunk_size = chunk_size
+        self.ttl_seconds = ttl_seconds
+        self.max_sessions = max_sessions
+        self.max_bytes = max_bytes
+        self.temp_dir = temp_dir
+        self._sessions = {}
+        self._lock = threading.Lock()
+        if temp_dir:
+            os.makedirs(temp_dir, exist_ok=True)
+
+    def _check_size(self, size: int):
+        if size <= 0:
+            raise UploadSessionError("파일 크기가 올바르지 않습니다.")
+        if size > self.max_bytes:
+            raise UploadSessionError(f"파일 크기는 {self.max_bytes // (1024 * 1024)}MB 이하여야 합니다.", 413)
+
+    def _create_file(self, extension: str, size: int) -> str:
+        temp_file = tempfile.NamedTemporaryFile(suffix=f'.{extension}', dir=self.temp_dir, delete=False)
+        with temp_file:
+            # 청크를 받는 순서와 관계없이 제자리에 쓸 수 있도록 전체 크기로 만듦 (sparse 파일)
+            temp_file.truncate(size)
+        return temp_file.name
+
+    def create(self, filename: str, extension: str, size: int) -> UploadSession:
+        """
+        새 업로드 세션을 만들고 전체 크기의 임시 파일을 준비합니다.
+
+        Args:
+            filename: 원본 파일 이름
+            extension: 파일 확장자 (점 제외, 소문자)
+            size: 전체 파일 크기 (바이트)
+
+        Returns:
+            UploadSession
+
+        Raises:
+            UploadSessionError: 크기가 올바르지 않거나 (400, 413) 진행 중인 업로드가 너무 많은 경우 (503)
+        """
+        self._check_size(size)
+
+        with self._lock:
+            if len(self._sessions) >= self.max_sessions:
+                raise UploadSessionError("진행 중인 업로드가 너무 많습니다. 잠시 후 다시 시도해주세요.", 503)
+            session = UploadSession(filename, extension, size, self.chunk_size, self._create_file(extension, size))
+            self._sessions[session.upload_id] = session
+
+        self._log_created(session)
+        return session
+
+    @staticmethod
+    def _log_created(session: UploadSession):
+        logging.info(
+            f"[업로드] 이어받기 업로드 시작: {session.upload_id} ({session.filename}, "
+            f"{session.size / (1024 * 1024):.2f}MB, 청크 {session.total_chunks}개)"
+        )
+
+    def get(self, upload_id: str) -> UploadSession:
+        """
+        Raises:
+            UploadSessionError: 세션이 없는 경우 (404)
+        """
+        with self._lock:
+            session = self._sessions.get(upload_id)
+        if session is None:
+            raise UploadSessionError("업로드를 찾을 수 없습니다. (만료되었거나 존재하지 않는 업로드)", 404)
+        return session
+
+    def received_chunks(self, session: UploadSession) -> Set[int]:
+        """
+        받은 청크 목록을 복사합니다.
+        다른 스레드가 청크를 기록하며 목록에 추가하는 중에 순회하지 않도록 잠금 안에서 복사합니다.
+        """
+        with self._lock:
+            return set(session.received)
+
+    def status(self, session: UploadSession) -> dict:
+        """API 응답용 상태 정보 (받은 청크 목록을 잠금 안에서 복사해 계산)"""
+        return session.to_dict(self.ttl_seconds, self.received_chunks(session))
+
+    def write_chunk(self, upload_id: str, index: int, data: bytes, checksum: Optional[str] = None) -> UploadSession:
+        """
+        청크를 파일의 제자리에 기록하고, 이어서 받은 부분까지 해시를 계산합니다.
+        이미 받은 청크가 다시 오면 (응답을 받지 못한 재전송) 기록하지 않고 성공으로 처리합니다.
+
+        Args:
+            upload_id: 업로드 ID
+            index: 청크 번호 (0부터)
+            data: 청크 내용
+            checksum: 청크의 SHA-256 해시 (16진수, 선택)
+
+        Returns:
+            청크를 기록한 뒤의 UploadSession
+
+        Raises:
+            UploadSessionError: 청크 번호/크기/해시가 맞지 않거나 (400) 이미 완료된 업로드인 경우 (409)
+        """
+        session = self.get(upload_id)
+        if session.completed:
+            raise UploadSessionError("이미 완료된 업로드입니다.", 409)
+        expected = session.chunk_length(index)
+        if len(data) != expected:
+            raise UploadSessionError(f"청크 {index}의 크기는 {expected}바이트여야 합니다: {len(data)}바이트")
+        if checksum and hashlib.sha256(data).hexdigest() != checksum.strip().lower():
+            raise UploadSessionError(f"청크 {index}의 체크섬이 일치하지 않습니다. 다시 전송해주세요.")
+
+        if index not in session.received:
+            fd = os.open(session.path, os.O_WRONLY)
+            try:
+                os.pwrite(fd, data, index * session.chunk_size)
+            finally:
+                os.close(fd)
+            self._mark_received(session, index)
+        return session
+
+    def _mark_received(self, session: UploadSession, index: int):
+        with self._lock:
+            session.received.add(index)
+            session.updated_at = time.time()
+        session.advance_hash()
+
+    def complete(self, upload_id: str) -> UploadSession:
+        """
+        모든 청크를 받았는지 확인하고 업로드를 완료합니다.
+
+        Raises:
+            UploadSessionError: 받지 못한 청크가 있는 경우 (409)
+        """
+        session = self.get(upload_id)
+        missing = session.missing_chunks(self.received_chunks(session))
+        if missing:
+            raise UploadSessionError(f"받지 못한 청크가 {len(missing)}개 있습니다: {missing[:10]}", 409)
+        session.advance_hash()
+        with self._lock:
+            session.completed = True
+            session.updated_at = time.time()
+        logging.info(f"[업로드] 이어받기 업로드 완료: {upload_id} ({session.filename})")
+        return session
+
+    def take(self, upload_id: str) -> UploadSession:
+        """
+        완료된 업로드를 저장소에서 꺼냅니다. 이후 임시 파일은 꺼낸 쪽에서 삭제합니다.
+
+        Raises:
+            UploadSessionError: 세션이 없거나 (404) 아직 완료되지 않은 경우 (409)
+        """
+        with self._lock:
+            session = self._sessions.get(upload_id)
+            if session is None:
+                raise UploadSessionError("업로드를 찾을 수 없습니다. (만료되었거나 존재하지 않는 업로드)", 404)
+            if not session.completed:
+                raise UploadSessionError("업로드가 완료되지 않았습니다. 먼저 업로드를 완료해주세요.", 409)
+            del self._sessions[upload_id]
+        return session
+
+    def delete(self, upload_id: str):
+        """업로드를 취소하고 임시 파일을 삭제합니다."""
+        with self._lock:
+            session = self._sessions.pop(upload_id, None)
+        if session is None:
+            raise UploadSessionError("업로드를 찾을 수 없습니다. (만료되었거나 존재하지 않는 업로드)", 404)
+        self._remove_file(session)
+
+    def evict_expired(self) -> int:
+        """
+        만료된 업로드를 삭제합니다.
+
+        Returns:
+            삭제된 업로드 수
+        """
+        cutoff = time.time() - self.ttl_seconds
+        with self._lock:
+            expired = [session for session in self._sessions.values() if session.updated_at < cutoff]
+            for session in expired:
+                del self._sessions[session.upload_id]
+        for session in expired:
+            self._remove_file(session)
+        if expired:
+            logging.info(f"[업로드] 만료된 이어받기 업로드 {len(expired)}개 삭제")
+        return len(expired)
+
+    def clear(self):
+        """모든 업로드를 삭제합니다 (서버 종료 시)."""
+        with self._lock:
+            sessions = list(self._sessions.values())
+            self._sessions.clear()
+        for session in sessions:
+            self._remove_file(session)
+
+    def count(self) -> int:
+        with self._lock:
+            return len(self._sessions)
+
+    @staticmethod
+    def _remove_file(session: UploadSession):
+        try:
+            if os.path.exists(session.path):
+                os.remove(session.path)
+        except OSError as e:
+            logging.error(f"[오류] 업로드 임시 파일 삭제 실패: {e}")
+
+
+class SQLiteUploadSessionStore(UploadSessionStore):
+    """
+    SQLite 기반 이어받기 업로드 저장소입니다.
+    세션과 받은 청크 목록을 SQLite 파일에, 청크 내용을 temp_dir의 파일에 저장하므로
+    여러 워커 프로세스 중 어느 곳으로 청크가 가더라도 같은 업로드에 기록되고, 서버가 재시작되어도 이어서 받을 수 있습니다.
+
+    해시 계산 상태는 프로세스 사이에 공유할 수 없으므로, 업로드를 완료할 때 파일 전체를 한 번 읽어 해시를 계산합니다.
+    """
+
+    def __init__(self, db_path: str, chunk_size: int, ttl_seconds: float, max_sessions: int, max_bytes: int,
+                 temp_dir: str = 'data/uploads'):
+        super().__init__(chunk_size, ttl_seconds, max_sessions, max_bytes, temp_dir)
+        db_dir = os.path.dirname(db_path)
+        if db_dir:
+            os.makedirs(db_dir, exist_ok=True)
+        # 다른 워커가 쓰는 동안에는 잠금이 풀릴 때까지 기다림
+        self._conn = sqlite3.connect(db_path, timeout=30, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        with self._lock, self._conn:
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS upload_sessions (
+                    upload_id TEXT PRIMARY KEY,
+                    filename TEXT,
+                    extension TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    chunk_size INTEGER NOT NULL,
+                    path TEXT NOT NULL,
+                    completed INTEGER NOT NULL DEFAULT 0,
+                    sha256 TEXT,
+                    created_at REAL NOT NULL,
+                    updated_at REAL NOT NULL
+                )
+                """
+            )
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS upload_chunks (
+                    upload_id TEXT NOT NULL,
+                    chunk_index INTEGER NOT NULL,
+                    PRIMARY KEY (upload_id, chunk_index)
+                )
+                """
+            )
+        logging.info(f"[업로드] SQLite 이어받기 업로드 저장소 사용: {db_path} (청크 파일: {temp_dir})")
+
+    def _load(self, row) -> UploadSession:
+        session = UploadSession(
+            row["filename"], row["extension"], row["size"], row["chunk_size"], row["path"], row["upload_id"]
+        )
+        session.received = {
+            chunk["chunk_index"] for chunk in self._conn.execute(
+                "SELECT chunk_index FROM upload_chunks WHERE upload_id = ?", (row["upload_id"],)
+            )
+        }
+        session.completed = bool(row["completed"])
+        session.final_sha256 = row["sha256"]
+        session.created_at = row["created_at"]
+        session.updated_at = row["updated_at"]
+        return session
+
+    def _delete_rows(self, upload_id: str, completed_only: bool = False) -> bool:
+        query = "DELETE FROM upload_sessions WHERE upload_id = ?" + (" AND completed = 1" if completed_only else "")
+        cursor = self._conn.execute(query, (upload_id,))
+        self._conn.execute("DELETE FROM upload_chunks WHERE upload_id = ?", (upload_id,))
+        return cursor.rowcount > 0
+
+    def create(self, filename: str, extension: str, size: int) -> UploadSession:
+        self._check_size(size)
+
+        with self._lock:
+            count = self._conn.execute("SELECT COUNT(*) FROM upload_sessions").fetchone()[0]
+            if count >= self.max_sessions:
+                raise UploadSessionError("진행 중인 업로드가 너무 많습니다. 잠시 후 다시 시도해주세요.", 503)
+            session = UploadSession(filename, extension, size, self.chunk_size, self._create_file(extension, size))
+            with self._conn:
+                self._conn.execute(
+                    "INSERT INTO upload_sessions (upload_id, filename, extension, size, chunk_size, path, "
+                    "created_at, updated_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    (session.upload_id, filename, extension, size, session.chunk_size, session.path,
+                     session.created_at, session.updated_at)
+                )
+
+        self._log_created(session)
+        return session
+
+    def get(self, upload_id: str) -> UploadSession:
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM upload_sessions WHERE upload_id = ?", (upload_id,)).fetchone()
+            session = self._load(row) if row else None
+        if session is None:
+            raise UploadSessionError("업로드를 찾을 수 없습니다. (만료되었거나 존재하지 않는 업로드)", 404)
+        return session
+
+    def received_chunks(self, session: UploadSession) -> Set[int]:
+        """다른 요청(다른 워커 포함)이 기록한 청크까지 반영한 받은 청크 목록"""
+        with self._lock:
+            return {
+                chunk["chunk_index"] for chunk in self._conn.execute(
+                    "SELECT chunk_index FROM upload_chunks WHERE upload_id = ?", (session.upload_id,)
+                )
+            }
+
+    def _mark_received(self, session: UploadSession, index: int):
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR IGNORE INTO upload_chunks (upload_id, chunk_index) VALUES (?, ?)",
+                (session.upload_id, index)
+            )
+            self._conn.execute(
+                "UPDATE upload_sessions SET updated_at = ? WHERE upload_id = ?", (now, session.upload_id)
+            )
+        session.received.add(index)
+        session.updated_at = now
+
+    def complete(self, upload_id: str) -> UploadSession:
+        session = self.get(upload_id)
+        if session.completed:
+            return session
+        missing = session.missing_chunks()
+        if missing:
+            raise UploadSessionError(f"받지 못한 청크가 {len(missing)}개 있습니다: {missing[:10]}", 409)
+        session.advance_hash()
+        session.final_sha256 = session.sha256
+        session.completed = True
+        session.updated_at = time.time()
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE upload_sessions SET completed = 1, sha256 = ?, updated_at = ? WHERE upload_id = ?",
+                (session.final_sha256, session.updated_at, upload_id)
+            )
+        logging.info(f"[업로드] 이어받기 업로드 완료: {upload_id} ({session.filename})")
+        return session
+
+    def take(self, upload_id: str) -> UploadSession:
+        session = self.get(upload_id)
+        if not session.completed:
+            raise UploadSessionError("업로드가 완료되지 않았습니다. 먼저 업로드를 완료해주세요.", 409)
+        with self._lock, self._conn:
+            # 같은 업로드로 동시에 요청한 다른 워커가 먼저 꺼낸 경우
+            if not self._delete_rows(upload_id, completed_only=True):
+                raise UploadSessionError("업로드를 찾을 수 없습니다. (만료되었거나 존재하지 않는 업로드)", 404)
+        return session
+
+    def delete(self, upload_id: str):
+        session = self.get(upload_id)
+        with self._lock, self._conn:
+            if not self._delete_rows(upload_id):
+                raise UploadSessionError("업로드를 찾을 수 없습니다. (만료되었거나 존재하지 않는 업로드)", 404)
+        self._remove_file(session)
+
+    def evict_expired(self) -> int:
+        cutoff = time.time() - self.ttl_seconds
+        with self._lock, self._conn:
+            expired = self._conn.execute(
+                "SELECT upload_id, path FROM upload_sessions WHERE updated_at < ?", (cutoff,)
+            ).fetchall()
+            for row in expired:
+                self._delete_rows(row["upload_id"])
+        for row in expired:
+            try:
+                if os.path.exists(row["path"]):
+                    os.remove(row["path"])
+            except OSError as e:
+                logging.error(f"[오류] 업로드 임시 파일 삭제 실패: {e}")
+        if expired:
+            logging.info(f"[업로드] 만료된 이어받기 업로드 {len(expired)}개 삭제")
+        return len(expired)
+
+    def clear(self):
+        """다른 워커가 사용 중일 수 있으므로 종료 시에는 삭제하지 않습니다 (만료되면 evict_expired에서 삭제)."""
+
+    def count(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM upload_sessions").fetchone()[0]
+
+
+def create_upload_session_store(upload_config: dict, max_bytes: int) -> UploadSessionStore:
+    """
+    설정에 따라 이어받기 업로드 저장소를 생성합니다.
+
+    Args:
+        upload_config: config.yaml의 upload 섹션
+        max_bytes: 업로드 최대 크기 (바이트)
+
+    Returns:
+        UploadSessionStore 또는 SQLiteUploadSessionStore
+    """
+    resumable_config = upload_config.get('resumable', {})
+    options = {
+        "chunk_size": int(resumable_config.get('chunk_size_mb', 4) * 1024 * 1024),
+        "ttl_seconds": resumable_config.get('session_ttl_seconds', 3600),
+        "max_sessions": resumable_config.get('max_sessions', 20),
+        "max_bytes": max_bytes
+    }
+    if resumable_config.get('store', 'memory') == 'sqlite':
+        return SQLiteUploadSessionStore(
+            resumable_config.get('sqlite_path', 'data/uploads.db'),
+            temp_dir=resumable_config.get('temp_dir', 'data/uploads'),
+            **options
+        )
+    return UploadSessionStore(**options)